@@ -28,18 +28,21 @@ PACKAGE_STATUS_COMPLETE: PackageStatus
 PACKAGE_STATUS_PROCESSING: PackageStatus
 
 class SubmitRequest(_message.Message):
-    __slots__ = ("name", "url", "config")
+    __slots__ = ("name", "url", "config", "submitter")
     NAME_FIELD_NUMBER: _ClassVar[int]
     URL_FIELD_NUMBER: _ClassVar[int]
     CONFIG_FIELD_NUMBER: _ClassVar[int]
+    SUBMITTER_FIELD_NUMBER: _ClassVar[int]
     name: str
     url: str
     config: ProcessingConfig
+    submitter: str
     def __init__(
         self,
         name: _Optional[str] = ...,
         url: _Optional[str] = ...,
         config: _Optional[_Union[ProcessingConfig, _Mapping]] = ...,
+        submitter: _Optional[str] = ...,
     ) -> None: ...
 
 class SubmitResponse(_message.Message):
@@ -49,10 +52,12 @@ class SubmitResponse(_message.Message):
     def __init__(self, id: _Optional[str] = ...) -> None: ...
 
 class ReadRequest(_message.Message):
-    __slots__ = ("id",)
+    __slots__ = ("id", "include_jobs")
     ID_FIELD_NUMBER: _ClassVar[int]
+    INCLUDE_JOBS_FIELD_NUMBER: _ClassVar[int]
     id: str
-    def __init__(self, id: _Optional[str] = ...) -> None: ...
+    include_jobs: bool
+    def __init__(self, id: _Optional[str] = ..., include_jobs: bool = ...) -> None: ...
 
 class ReadResponse(_message.Message):
     __slots__ = ("status", "job", "jobs")
@@ -83,6 +88,38 @@ class ListTasksResponse(_message.Message):
         self, tasks: _Optional[_Iterable[_Union[Task, _Mapping]]] = ...
     ) -> None: ...
 
+class WatchRequest(_message.Message):
+    __slots__ = ("id",)
+    ID_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    def __init__(self, id: _Optional[str] = ...) -> None: ...
+
+class WatchResponse(_message.Message):
+    __slots__ = ("type", "job", "status")
+    class Type(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+        __slots__ = ()
+        TYPE_UNSPECIFIED: _ClassVar[WatchResponse.Type]
+        TYPE_JOB_STARTED: _ClassVar[WatchResponse.Type]
+        TYPE_JOB_FINISHED: _ClassVar[WatchResponse.Type]
+        TYPE_PACKAGE_FINISHED: _ClassVar[WatchResponse.Type]
+
+    TYPE_UNSPECIFIED: WatchResponse.Type
+    TYPE_JOB_STARTED: WatchResponse.Type
+    TYPE_JOB_FINISHED: WatchResponse.Type
+    TYPE_PACKAGE_FINISHED: WatchResponse.Type
+    TYPE_FIELD_NUMBER: _ClassVar[int]
+    JOB_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    type: WatchResponse.Type
+    job: Job
+    status: PackageStatus
+    def __init__(
+        self,
+        type: _Optional[_Union[WatchResponse.Type, str]] = ...,
+        job: _Optional[_Union[Job, _Mapping]] = ...,
+        status: _Optional[_Union[PackageStatus, str]] = ...,
+    ) -> None: ...
+
 class EmptyRequest(_message.Message):
     __slots__ = ()
     def __init__(self) -> None: ...
@@ -35,6 +35,12 @@ class TransferServiceStub(object):
             response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksResponse.FromString,
             _registered_method=True,
         )
+        self.Watch = channel.unary_stream(
+            "/a3m.api.transferservice.v1beta1.TransferService/Watch",
+            request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.FromString,
+            _registered_method=True,
+        )
         self.Empty = channel.unary_unary(
             "/a3m.api.transferservice.v1beta1.TransferService/Empty",
             request_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.EmptyRequest.SerializeToString,
@@ -64,6 +70,12 @@ class TransferServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def Watch(self, request, context):
+        """Streams the progress of a given transfer until processing is complete."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def Empty(self, request, context):
         """Delete all contents from a3m's shared folders. Should only be called once processing is complete."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -88,6 +100,11 @@ def add_TransferServiceServicer_to_server(servicer, server):
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksRequest.FromString,
             response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.ListTasksResponse.SerializeToString,
         ),
+        "Watch": grpc.unary_stream_rpc_method_handler(
+            servicer.Watch,
+            request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.FromString,
+            response_serializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.SerializeToString,
+        ),
         "Empty": grpc.unary_unary_rpc_method_handler(
             servicer.Empty,
             request_deserializer=a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.EmptyRequest.FromString,
@@ -197,6 +214,36 @@ class TransferService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def Watch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/a3m.api.transferservice.v1beta1.TransferService/Watch",
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchRequest.SerializeToString,
+            a3m_dot_api_dot_transferservice_dot_v1beta1_dot_request__response__pb2.WatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def Empty(
         request,
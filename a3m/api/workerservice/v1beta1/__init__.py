@@ -0,0 +1,12 @@
+from . import request_response_pb2
+from . import request_response_pb2_grpc
+from . import service_pb2
+from . import service_pb2_grpc
+
+
+__all__ = [
+    "request_response_pb2_grpc",
+    "request_response_pb2",
+    "service_pb2_grpc",
+    "service_pb2",
+]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: a3m/api/workerservice/v1beta1/request_response.proto
+# Protobuf Python Version: 5.28.2
+"""Generated protocol buffer code."""
+
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    28,
+    2,
+    "",
+    "a3m/api/workerservice/v1beta1/request_response.proto",
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n4a3m/api/workerservice/v1beta1/request_response.proto\x12\x1d\x61\x33m.api.workerservice.v1beta1\x1a\x1fgoogle/protobuf/timestamp.proto"0\n\x11LeaseBatchRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId"P\n\x12LeaseBatchResponse\x12:\n\x05lease\x18\x01 \x01(\x0b\x32$.a3m.api.workerservice.v1beta1.LeaseR\x05lease"J\n\x10HeartbeatRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12\x19\n\x08lease_id\x18\x02 \x01(\tR\x07leaseId"\x13\n\x11HeartbeatResponse"\xea\x01\n\x14\x43ompleteBatchRequest\x12\x1b\n\tworker_id\x18\x01 \x01(\tR\x08workerId\x12\x19\n\x08lease_id\x18\x02 \x01(\tR\x07leaseId\x12\x43\n\x07results\x18\x03 \x03(\x0b\x32).a3m.api.workerservice.v1beta1.TaskResultR\x07results\x12\x1a\n\x08\x64uration\x18\x04 \x01(\x01R\x08\x64uration\x12\x39\n\x05spans\x18\x05 \x03(\x0b\x32#.a3m.api.workerservice.v1beta1.SpanR\x05spans"\x17\n\x15\x43ompleteBatchResponse"\x89\x01\n\x05Lease\x12\x0e\n\x02id\x18\x01 \x01(\tR\x02id\x12\x19\n\x08job_name\x18\x02 \x01(\tR\x07jobName\x12\x39\n\x05tasks\x18\x03 \x03(\x0b\x32#.a3m.api.workerservice.v1beta1.TaskR\x05tasks\x12\x1a\n\x08\x64uration\x18\x04 \x01(\x05R\x08\x64uration"\xe5\x01\n\x04Task\x12\x0e\n\x02id\x18\x01 \x01(\tR\x02id\x12!\n\x0c\x63reated_date\x18\x02 \x01(\tR\x0b\x63reatedDate\x12\x1c\n\targuments\x18\x03 \x01(\tR\targuments\x12!\n\x0cwants_output\x18\x04 \x01(\x08R\x0bwantsOutput\x12\x18\n\x07\x65xecute\x18\x05 \x01(\tR\x07\x65xecute\x12\x15\n\x06job_id\x18\x06 \x01(\tR\x05jobId\x12\x1b\n\tfile_uuid\x18\x07 \x01(\tR\x08\x66ileUuid\x12\x1b\n\tfile_name\x18\x08 \x01(\tR\x08\x66ileName"\xaa\x01\n\nTaskResult\x12\x0e\n\x02id\x18\x01 \x01(\tR\x02id\x12\x1b\n\texit_code\x18\x02 \x01(\x05R\x08\x65xitCode\x12\x16\n\x06stdout\x18\x03 \x01(\tR\x06stdout\x12\x16\n\x06stderr\x18\x04 \x01(\tR\x06stderr\x12?\n\rfinished_time\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.TimestampR\x0c\x66inishedTime"\x88\x02\n\x04Span\x12\x12\n\x04name\x18\x01 \x01(\tR\x04name\x12\x1a\n\x08\x63\x61tegory\x18\x02 \x01(\tR\x08\x63\x61tegory\x12\x14\n\x05start\x18\x03 \x01(\x03R\x05start\x12\x1a\n\x08\x64uration\x18\x04 \x01(\x03R\x08\x64uration\x12\x10\n\x03pid\x18\x05 \x01(\x03R\x03pid\x12\x10\n\x03tid\x18\x06 \x01(\x03R\x03tid\x12\x41\n\x04\x61rgs\x18\x07 \x03(\x0b\x32-.a3m.api.workerservice.v1beta1.Span.ArgsEntryR\x04\x61rgs\x1a\x37\n\tArgsEntry\x12\x10\n\x03key\x18\x01 \x01(\tR\x03key\x12\x14\n\x05value\x18\x02 \x01(\tR\x05value:\x02\x38\x01\x42\xa3\x02\n!com.a3m.api.workerservice.v1beta1B\x14RequestResponseProtoP\x01ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\xa2\x02\x03\x41\x41W\xaa\x02\x1d\x41\x33m.Api.Workerservice.V1beta1\xca\x02\x1d\x41\x33m\\Api\\Workerservice\\V1beta1\xe2\x02)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\xea\x02 A3m::Api::Workerservice::V1beta1b\x06proto3'
+)
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(
+    DESCRIPTOR, "a3m.api.workerservice.v1beta1.request_response_pb2", _globals
+)
+if not _descriptor._USE_C_DESCRIPTORS:
+    _globals["DESCRIPTOR"]._loaded_options = None
+    _globals[
+        "DESCRIPTOR"
+    ]._serialized_options = b"\n!com.a3m.api.workerservice.v1beta1B\024RequestResponseProtoP\001ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\242\002\003AAW\252\002\035A3m.Api.Workerservice.V1beta1\312\002\035A3m\\Api\\Workerservice\\V1beta1\342\002)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\352\002 A3m::Api::Workerservice::V1beta1"
+    _globals["_SPAN_ARGSENTRY"]._loaded_options = None
+    _globals["_SPAN_ARGSENTRY"]._serialized_options = b"8\001"
+    _globals["_LEASEBATCHREQUEST"]._serialized_start = 120
+    _globals["_LEASEBATCHREQUEST"]._serialized_end = 168
+    _globals["_LEASEBATCHRESPONSE"]._serialized_start = 170
+    _globals["_LEASEBATCHRESPONSE"]._serialized_end = 250
+    _globals["_HEARTBEATREQUEST"]._serialized_start = 252
+    _globals["_HEARTBEATREQUEST"]._serialized_end = 326
+    _globals["_HEARTBEATRESPONSE"]._serialized_start = 328
+    _globals["_HEARTBEATRESPONSE"]._serialized_end = 347
+    _globals["_COMPLETEBATCHREQUEST"]._serialized_start = 350
+    _globals["_COMPLETEBATCHREQUEST"]._serialized_end = 584
+    _globals["_COMPLETEBATCHRESPONSE"]._serialized_start = 586
+    _globals["_COMPLETEBATCHRESPONSE"]._serialized_end = 609
+    _globals["_LEASE"]._serialized_start = 612
+    _globals["_LEASE"]._serialized_end = 749
+    _globals["_TASK"]._serialized_start = 752
+    _globals["_TASK"]._serialized_end = 981
+    _globals["_TASKRESULT"]._serialized_start = 984
+    _globals["_TASKRESULT"]._serialized_end = 1154
+    _globals["_SPAN"]._serialized_start = 1157
+    _globals["_SPAN"]._serialized_end = 1421
+    _globals["_SPAN_ARGSENTRY"]._serialized_start = 1366
+    _globals["_SPAN_ARGSENTRY"]._serialized_end = 1421
+# @@protoc_insertion_point(module_scope)
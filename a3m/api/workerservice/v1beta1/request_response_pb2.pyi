@@ -0,0 +1,179 @@
+from google.protobuf import timestamp_pb2 as _timestamp_pb2
+from google.protobuf.internal import containers as _containers
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import (
+    ClassVar as _ClassVar,
+    Iterable as _Iterable,
+    Mapping as _Mapping,
+    Optional as _Optional,
+    Union as _Union,
+)
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class LeaseBatchRequest(_message.Message):
+    __slots__ = ("worker_id",)
+    WORKER_ID_FIELD_NUMBER: _ClassVar[int]
+    worker_id: str
+    def __init__(self, worker_id: _Optional[str] = ...) -> None: ...
+
+class LeaseBatchResponse(_message.Message):
+    __slots__ = ("lease",)
+    LEASE_FIELD_NUMBER: _ClassVar[int]
+    lease: Lease
+    def __init__(self, lease: _Optional[_Union[Lease, _Mapping]] = ...) -> None: ...
+
+class HeartbeatRequest(_message.Message):
+    __slots__ = ("worker_id", "lease_id")
+    WORKER_ID_FIELD_NUMBER: _ClassVar[int]
+    LEASE_ID_FIELD_NUMBER: _ClassVar[int]
+    worker_id: str
+    lease_id: str
+    def __init__(
+        self, worker_id: _Optional[str] = ..., lease_id: _Optional[str] = ...
+    ) -> None: ...
+
+class HeartbeatResponse(_message.Message):
+    __slots__ = ()
+    def __init__(self) -> None: ...
+
+class CompleteBatchRequest(_message.Message):
+    __slots__ = ("worker_id", "lease_id", "results", "duration", "spans")
+    WORKER_ID_FIELD_NUMBER: _ClassVar[int]
+    LEASE_ID_FIELD_NUMBER: _ClassVar[int]
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    DURATION_FIELD_NUMBER: _ClassVar[int]
+    SPANS_FIELD_NUMBER: _ClassVar[int]
+    worker_id: str
+    lease_id: str
+    results: _containers.RepeatedCompositeFieldContainer[TaskResult]
+    duration: float
+    spans: _containers.RepeatedCompositeFieldContainer[Span]
+    def __init__(
+        self,
+        worker_id: _Optional[str] = ...,
+        lease_id: _Optional[str] = ...,
+        results: _Optional[_Iterable[_Union[TaskResult, _Mapping]]] = ...,
+        duration: _Optional[float] = ...,
+        spans: _Optional[_Iterable[_Union[Span, _Mapping]]] = ...,
+    ) -> None: ...
+
+class CompleteBatchResponse(_message.Message):
+    __slots__ = ()
+    def __init__(self) -> None: ...
+
+class Lease(_message.Message):
+    __slots__ = ("id", "job_name", "tasks", "duration")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    JOB_NAME_FIELD_NUMBER: _ClassVar[int]
+    TASKS_FIELD_NUMBER: _ClassVar[int]
+    DURATION_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    job_name: str
+    tasks: _containers.RepeatedCompositeFieldContainer[Task]
+    duration: int
+    def __init__(
+        self,
+        id: _Optional[str] = ...,
+        job_name: _Optional[str] = ...,
+        tasks: _Optional[_Iterable[_Union[Task, _Mapping]]] = ...,
+        duration: _Optional[int] = ...,
+    ) -> None: ...
+
+class Task(_message.Message):
+    __slots__ = (
+        "id",
+        "created_date",
+        "arguments",
+        "wants_output",
+        "execute",
+        "job_id",
+        "file_uuid",
+        "file_name",
+    )
+    ID_FIELD_NUMBER: _ClassVar[int]
+    CREATED_DATE_FIELD_NUMBER: _ClassVar[int]
+    ARGUMENTS_FIELD_NUMBER: _ClassVar[int]
+    WANTS_OUTPUT_FIELD_NUMBER: _ClassVar[int]
+    EXECUTE_FIELD_NUMBER: _ClassVar[int]
+    JOB_ID_FIELD_NUMBER: _ClassVar[int]
+    FILE_UUID_FIELD_NUMBER: _ClassVar[int]
+    FILE_NAME_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    created_date: str
+    arguments: str
+    wants_output: bool
+    execute: str
+    job_id: str
+    file_uuid: str
+    file_name: str
+    def __init__(
+        self,
+        id: _Optional[str] = ...,
+        created_date: _Optional[str] = ...,
+        arguments: _Optional[str] = ...,
+        wants_output: bool = ...,
+        execute: _Optional[str] = ...,
+        job_id: _Optional[str] = ...,
+        file_uuid: _Optional[str] = ...,
+        file_name: _Optional[str] = ...,
+    ) -> None: ...
+
+class TaskResult(_message.Message):
+    __slots__ = ("id", "exit_code", "stdout", "stderr", "finished_time")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    EXIT_CODE_FIELD_NUMBER: _ClassVar[int]
+    STDOUT_FIELD_NUMBER: _ClassVar[int]
+    STDERR_FIELD_NUMBER: _ClassVar[int]
+    FINISHED_TIME_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    exit_code: int
+    stdout: str
+    stderr: str
+    finished_time: _timestamp_pb2.Timestamp
+    def __init__(
+        self,
+        id: _Optional[str] = ...,
+        exit_code: _Optional[int] = ...,
+        stdout: _Optional[str] = ...,
+        stderr: _Optional[str] = ...,
+        finished_time: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ...,
+    ) -> None: ...
+
+class Span(_message.Message):
+    __slots__ = ("name", "category", "start", "duration", "pid", "tid", "args")
+    class ArgsEntry(_message.Message):
+        __slots__ = ("key", "value")
+        KEY_FIELD_NUMBER: _ClassVar[int]
+        VALUE_FIELD_NUMBER: _ClassVar[int]
+        key: str
+        value: str
+        def __init__(
+            self, key: _Optional[str] = ..., value: _Optional[str] = ...
+        ) -> None: ...
+
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    CATEGORY_FIELD_NUMBER: _ClassVar[int]
+    START_FIELD_NUMBER: _ClassVar[int]
+    DURATION_FIELD_NUMBER: _ClassVar[int]
+    PID_FIELD_NUMBER: _ClassVar[int]
+    TID_FIELD_NUMBER: _ClassVar[int]
+    ARGS_FIELD_NUMBER: _ClassVar[int]
+    name: str
+    category: str
+    start: int
+    duration: int
+    pid: int
+    tid: int
+    args: _containers.ScalarMap[str, str]
+    def __init__(
+        self,
+        name: _Optional[str] = ...,
+        category: _Optional[str] = ...,
+        start: _Optional[int] = ...,
+        duration: _Optional[int] = ...,
+        pid: _Optional[int] = ...,
+        tid: _Optional[int] = ...,
+        args: _Optional[_Mapping[str, str]] = ...,
+    ) -> None: ...
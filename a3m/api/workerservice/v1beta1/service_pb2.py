@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: a3m/api/workerservice/v1beta1/service.proto
+# Protobuf Python Version: 5.28.2
+"""Generated protocol buffer code."""
+
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    28,
+    2,
+    "",
+    "a3m/api/workerservice/v1beta1/service.proto",
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from a3m.api.workerservice.v1beta1 import (
+    request_response_pb2 as a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2,
+)
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
+    b'\n+a3m/api/workerservice/v1beta1/service.proto\x12\x1d\x61\x33m.api.workerservice.v1beta1\x1a\x34\x61\x33m/api/workerservice/v1beta1/request_response.proto2\xf4\x02\n\rWorkerService\x12s\n\nLeaseBatch\x12\x30.a3m.api.workerservice.v1beta1.LeaseBatchRequest\x1a\x31.a3m.api.workerservice.v1beta1.LeaseBatchResponse"\x00\x12p\n\tHeartbeat\x12/.a3m.api.workerservice.v1beta1.HeartbeatRequest\x1a\x30.a3m.api.workerservice.v1beta1.HeartbeatResponse"\x00\x12|\n\rCompleteBatch\x12\x33.a3m.api.workerservice.v1beta1.CompleteBatchRequest\x1a\x34.a3m.api.workerservice.v1beta1.CompleteBatchResponse"\x00\x42\x9b\x02\n!com.a3m.api.workerservice.v1beta1B\x0cServiceProtoP\x01ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\xa2\x02\x03\x41\x41W\xaa\x02\x1d\x41\x33m.Api.Workerservice.V1beta1\xca\x02\x1d\x41\x33m\\Api\\Workerservice\\V1beta1\xe2\x02)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\xea\x02 A3m::Api::Workerservice::V1beta1b\x06proto3'
+)
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(
+    DESCRIPTOR, "a3m.api.workerservice.v1beta1.service_pb2", _globals
+)
+if not _descriptor._USE_C_DESCRIPTORS:
+    _globals["DESCRIPTOR"]._loaded_options = None
+    _globals[
+        "DESCRIPTOR"
+    ]._serialized_options = b"\n!com.a3m.api.workerservice.v1beta1B\014ServiceProtoP\001ZQgithub.com/artefactual-labs/a3m/proto/a3m/api/workerservice/v1beta1;workerservice\242\002\003AAW\252\002\035A3m.Api.Workerservice.V1beta1\312\002\035A3m\\Api\\Workerservice\\V1beta1\342\002)A3m\\Api\\Workerservice\\V1beta1\\GPBMetadata\352\002 A3m::Api::Workerservice::V1beta1"
+    _globals["_WORKERSERVICE"]._serialized_start = 133
+    _globals["_WORKERSERVICE"]._serialized_end = 505
+# @@protoc_insertion_point(module_scope)
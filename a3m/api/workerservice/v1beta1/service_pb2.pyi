@@ -0,0 +1,5 @@
+from a3m.api.workerservice.v1beta1 import request_response_pb2 as _request_response_pb2
+from google.protobuf import descriptor as _descriptor
+from typing import ClassVar as _ClassVar
+
+DESCRIPTOR: _descriptor.FileDescriptor
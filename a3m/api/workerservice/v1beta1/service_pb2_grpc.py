@@ -0,0 +1,181 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+
+import grpc
+
+from a3m.api.workerservice.v1beta1 import (
+    request_response_pb2 as a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2,
+)
+
+
+class WorkerServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.LeaseBatch = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/LeaseBatch",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchResponse.FromString,
+            _registered_method=True,
+        )
+        self.Heartbeat = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/Heartbeat",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.FromString,
+            _registered_method=True,
+        )
+        self.CompleteBatch = channel.unary_unary(
+            "/a3m.api.workerservice.v1beta1.WorkerService/CompleteBatch",
+            request_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchRequest.SerializeToString,
+            response_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchResponse.FromString,
+            _registered_method=True,
+        )
+
+
+class WorkerServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def LeaseBatch(self, request, context):
+        """Leases the next batch of tasks waiting to be processed, if any."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Heartbeat(self, request, context):
+        """Renews a lease. Leases that are not renewed expire and their batches are dispatched again."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def CompleteBatch(self, request, context):
+        """Reports the results of a leased batch."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+
+def add_WorkerServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+        "LeaseBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.LeaseBatch,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchResponse.SerializeToString,
+        ),
+        "Heartbeat": grpc.unary_unary_rpc_method_handler(
+            servicer.Heartbeat,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.SerializeToString,
+        ),
+        "CompleteBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.CompleteBatch,
+            request_deserializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchRequest.FromString,
+            response_serializer=a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchResponse.SerializeToString,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "a3m.api.workerservice.v1beta1.WorkerService", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers(
+        "a3m.api.workerservice.v1beta1.WorkerService", rpc_method_handlers
+    )
+
+
+# This class is part of an EXPERIMENTAL API.
+class WorkerService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def LeaseBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/LeaseBatch",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.LeaseBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def Heartbeat(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/Heartbeat",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.HeartbeatResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def CompleteBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/a3m.api.workerservice.v1beta1.WorkerService/CompleteBatch",
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchRequest.SerializeToString,
+            a3m_dot_api_dot_workerservice_dot_v1beta1_dot_request__response__pb2.CompleteBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
@@ -23,7 +23,7 @@ def fallback_option(fn):
         try:
             return fn(*args, **kwargs)
         except (configparser.NoSectionError, configparser.NoOptionError):
-            if fallback:
+            if fallback is not None:
                 return fallback
             raise
 
@@ -10,6 +10,7 @@ from rich.panel import Panel
 from rich.table import Table
 
 from a3m.api.transferservice import v1beta1 as transfer_service_api
+from a3m.cli.client import ephemeral
 from a3m.cli.client.wrapper import ClientWrapper
 from a3m.cli.common import configure_xml_catalog_files
 from a3m.cli.common import init_django
@@ -37,8 +38,46 @@ from a3m.server.rpc.client import Client
     help='Processing configuration pair (form "name:value"), e.g.: "normalize=no".',
 )
 @click.option("--no-input", is_flag=True, help="Disable interactive mode.")
+@click.option(
+    "--ephemeral",
+    "is_ephemeral",
+    is_flag=True,
+    help="Keep the database in memory and the processing files in a scratch directory, both discarded on exit.",
+)
+@click.option(
+    "--scratch-dir",
+    type=click.Path(file_okay=False, exists=True),
+    help="Scratch directory of --ephemeral, defaults to /dev/shm if available.",
+    metavar="DIR",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default=".",
+    show_default=True,
+    help="Where --ephemeral moves the AIP.",
+    metavar="DIR",
+)
+@click.option(
+    "--dump-db",
+    type=click.Path(dir_okay=False),
+    help="Copy the database to PATH once processing is done.",
+    metavar="PATH",
+)
 @click.pass_context
-def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
+def main(
+    ctx,
+    uri,
+    name,
+    address,
+    processing_config,
+    wait_for_ready,
+    no_input,
+    is_ephemeral,
+    scratch_dir,
+    output_dir,
+    dump_db,
+):
     """a3m - Lightweight Archivematica.
 
     Creates an Archival Information Package (AIP) from the contents in URI.
@@ -50,7 +89,21 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
     used to refer to a remote instance. Use `--wait-for-ready` if you want the
     client to block until the server becomes available. If you are running this
     tool in an automated fashion, use `--no-input` to avoid prompts.
+
+    With `--ephemeral`, the embedded instance keeps its database in memory and
+    its processing files in a scratch directory, removed on exit. Only the AIP
+    is kept, in `--output-dir`, and the database if `--dump-db` is used.
     """
+    if address is not None and (is_ephemeral or dump_db):
+        raise click.UsageError(
+            "--ephemeral and --dump-db require the embedded instance."
+        )
+
+    if is_ephemeral:
+        # Settings are read when Django is set up.
+        scratch_path = ephemeral.configure(scratch_dir)
+        ctx.call_on_close(lambda: ephemeral.cleanup(scratch_path))
+
     init_django()
     suppress_warnings()
     configure_xml_catalog_files()
@@ -70,9 +123,15 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
 
     with ClientWrapper(address, wait_for_ready) as cw:
         resp = cw.client.submit(uri, name, processing_config)
-        click.secho(f"AIP {resp.id} is being generated...")
+        package_id = resp.id
+        click.secho(f"AIP {package_id} is being generated...")
 
-        resp = cw.client.wait_until_complete(resp.id)
+        resp = cw.client.wait_until_complete(package_id)
+
+        if dump_db:
+            from a3m.server.db import dump
+
+            dump(dump_db)
 
         if (status := resp.status) in (
             transfer_service_api.request_response_pb2.PACKAGE_STATUS_FAILED,
@@ -87,6 +146,10 @@ def main(ctx, uri, name, address, processing_config, wait_for_ready, no_input):
 
         click.secho("Processing completed successfully!", fg="green")
 
+        if is_ephemeral:
+            for path in ephemeral.keep_aips(scratch_path, package_id, output_dir):
+                click.secho(f"AIP stored at {path}")
+
 
 def _to_int(value: str) -> int | None:
     try:
@@ -0,0 +1,74 @@
+"""Ephemeral mode of the embedded server.
+
+For one-shot runs, e.g. a3m used as a converter in a pipeline, nothing but the
+AIP is worth keeping. In this mode, the database is kept in memory and the
+shared directory is created in a scratch directory, on tmpfs when available,
+so that processing does not wait on disk writes. The AIP is moved out of the
+scratch directory before it is removed.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# tmpfs on most Linux distributions.
+DEFAULT_SCRATCH_DIRECTORY = "/dev/shm"  # noqa: S108
+
+
+def default_scratch_directory():
+    """Return the tmpfs directory if usable, None for the system default."""
+    if os.path.isdir(DEFAULT_SCRATCH_DIRECTORY) and os.access(
+        DEFAULT_SCRATCH_DIRECTORY, os.W_OK
+    ):
+        return DEFAULT_SCRATCH_DIRECTORY
+    return None
+
+
+def configure(scratch_directory=None):
+    """Configure the settings of an ephemeral server.
+
+    Settings are set through the environment, i.e. this must run before
+    Django is set up. Returns the new directory created under
+    ``scratch_directory``, which the caller removes with `cleanup`.
+    """
+    if scratch_directory is None:
+        scratch_directory = default_scratch_directory()
+    path = Path(tempfile.mkdtemp(prefix="a3m-", dir=scratch_directory))
+    shared_directory = path / "share"
+
+    def format_path(subdir):
+        return os.path.join(str(shared_directory / subdir), "")
+
+    os.environ.update(
+        {
+            "A3M_SHARED_DIRECTORY": format_path(""),
+            "A3M_TEMP_DIR": format_path("tmp"),
+            "A3M_PROCESSING_DIRECTORY": format_path("currentlyProcessing"),
+            "A3M_REJECTED_DIRECTORY": format_path("rejected"),
+            "A3M_DB_ENGINE": "a3m.main.backends.sqlite3",
+            "A3M_DB_NAME": f"file:/{path.name}?vfs=memdb",
+            # Other processes cannot see the database.
+            "A3M_TASK_BACKEND": "pool",
+            "A3M_WORKER_PROCESSES": "0",
+        }
+    )
+    return path
+
+
+def keep_aips(path, package_id, output_directory):
+    """Move the AIPs of a package out of the scratch directory.
+
+    Returns the new paths.
+    """
+    kept = []
+    os.makedirs(output_directory, exist_ok=True)
+    for aip in sorted((path / "share" / "completed").glob(f"*-{package_id}*")):
+        target = Path(output_directory, aip.name)
+        shutil.move(str(aip), str(target))
+        kept.append(target)
+    return kept
+
+
+def cleanup(path):
+    shutil.rmtree(path, ignore_errors=True)
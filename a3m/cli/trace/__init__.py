@@ -0,0 +1 @@
+"""a3m trace report."""
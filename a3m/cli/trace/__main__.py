@@ -0,0 +1,73 @@
+import click
+from rich.console import Console
+from rich.table import Table
+
+from a3m.tracing import Trace
+from a3m.tracing import build_tree
+from a3m.tracing import critical_path
+from a3m.tracing import job_times
+
+
+def _seconds(microseconds):
+    return f"{microseconds / 1_000_000:.3f}"
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--depth",
+    default=1,
+    show_default=True,
+    help="Levels of nested spans shown in the critical path.",
+)
+@click.option(
+    "--top", default=10, show_default=True, help="Number of jobs listed by self time."
+)
+def main(path, depth, top):
+    """a3m trace - summarizes the timing trace of a package.
+
+    PATH is a trace written by the server with `package_traces` enabled. It
+    prints the critical path of the package, i.e. the spans that determined
+    how long it took, and the jobs with the most self time, i.e. time not
+    spent running tasks or writing records.
+    """
+    roots = build_tree(Trace.load(path).events)
+    if not roots:
+        raise click.ClickException("The trace is empty.")
+    start = min(span.start for span in roots)
+    end = max(span.end for span in roots)
+
+    console = Console()
+    console.print(f"Total: {_seconds(end - start)}s")
+
+    table = Table(title="Critical path", expand=True)
+    table.add_column("Span")
+    table.add_column("Category")
+    table.add_column("Start (s)", justify="right")
+    table.add_column("Duration (s)", justify="right")
+    table.add_column("Self (s)", justify="right")
+    for level, span in critical_path(roots):
+        if level > depth:
+            continue
+        table.add_row(
+            "  " * level + span.name,
+            span.category,
+            _seconds(span.start - start),
+            _seconds(span.duration),
+            _seconds(span.self_time),
+        )
+    console.print(table)
+
+    table = Table(title="Jobs by self time", expand=True)
+    table.add_column("Job")
+    table.add_column("Count", justify="right")
+    table.add_column("Wall (s)", justify="right")
+    table.add_column("Self (s)", justify="right")
+    times = sorted(job_times(roots).items(), key=lambda item: item[1][2], reverse=True)
+    for name, (count, wall, self_time) in times[:top]:
+        table.add_row(name, str(count), _seconds(wall), _seconds(self_time))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import logging
+import os
+import platform
+import signal
+
+import click
+import grpc
+
+from a3m import __version__
+from a3m.cli.common import configure_xml_catalog_files
+from a3m.cli.common import init_django
+from a3m.cli.common import suppress_warnings
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "--address",
+    default="127.0.0.1:7000",
+    show_default=True,
+    help='a3m server address (form "host:port").',
+    metavar="ADDRESS",
+)
+@click.option("--worker-id", help="Worker identifier, e.g. for logging.")
+def main(address, worker_id):
+    """a3m worker - processes tasks of an a3m server.
+
+    The server must be configured with the remote task backend. Workers need
+    access to the same database and shared directory than the server. Run as
+    many workers as needed, on one or more hosts.
+    """
+    init_django()
+    suppress_warnings()
+    configure_xml_catalog_files()
+
+    from a3m.client.worker import Worker
+
+    logger.info(
+        f"Starting a3m worker... (version={__version__} pid={os.getpid()} "
+        f"uid={os.getuid()} python={platform.python_version()} "
+        f"server={address})"
+    )
+
+    with grpc.insecure_channel(address) as channel:
+        worker = Worker(channel, worker_id)
+
+        def signal_handler(signo, frame):
+            logger.info("Received termination signal (%s)", signal.Signals(signo).name)
+            worker.stop()
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+
+        worker.work()
+
+    logger.info("a3m worker shutdown complete.")
+
+
+if __name__ == "__main__":
+    main()
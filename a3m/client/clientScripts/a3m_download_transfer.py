@@ -1,5 +1,6 @@
 """Download transfer object from storage."""
 
+import logging
 import shutil
 import sys
 from contextlib import contextmanager
@@ -14,6 +15,10 @@ from django.conf import settings
 from a3m.bag import is_bag
 from a3m.client import metrics
 from a3m.executeOrRunSubProcess import executeOrRun
+from a3m.inventory import measure_path
+from a3m.main.models import PackageState
+
+logger = logging.getLogger(__name__)
 
 HTTP_SCHEMES = ("http", "https")
 FILE_SCHEMES = "file"
@@ -158,10 +163,25 @@ def main(job, transfer_id, transfer_path, url):
         return 1
 
 
+def _record_size(transfer_id, transfer_path):
+    """Record the size of the transfer for the scheduler, see `Package.measure`."""
+    try:
+        size = measure_path(transfer_path)
+    except OSError as err:
+        logger.warning("Unable to measure %s: %s", transfer_path, err)
+        return
+    PackageState.objects.filter(transfer_id=transfer_id).update(
+        size=size.bytes, file_count=size.files
+    )
+
+
 def call(jobs):
     job = jobs[0]
     with job.JobContext():
         transfer_id = job.args[1]
         transfer_path = job.args[2]
         url = job.args[3]
-        job.set_status(main(job, transfer_id, transfer_path, url))
+        status = main(job, transfer_id, transfer_path, url)
+        if not status:
+            _record_size(transfer_id, transfer_path)
+        job.set_status(status)
@@ -37,6 +37,7 @@ from django.db import transaction
 from a3m.archivematicaFunctions import chunk_iterable
 from a3m.fileOperations import addFileToSIP
 from a3m.fileOperations import addFileToTransfer
+from a3m.inventory import get_inventory
 from a3m.main.models import File
 
 logger = logging.getLogger(__name__)
@@ -143,7 +144,8 @@ def assign_uuids_to_files_in_dir(**kwargs):
     """
     target_dir = kwargs["target_dir"]
     transfer_uuid = kwargs["transfer_uuid"]
-    for root, _, filenames in os.walk(target_dir):
+    inventory = get_inventory(kwargs["sip_directory"])
+    for root, _, filenames in inventory.walk(target_dir):
         for file_chunk in chunk_iterable(filenames):
             with transaction.atomic():
                 for filename in file_chunk:
@@ -22,11 +22,13 @@ import shutil
 from bagit import make_bag
 from django.conf import settings as mcpclient_settings
 
+from a3m.inventory import get_inventory
+
 
 def get_sip_directories(job, sip_dir):
     """Get a list of directories in the SIP, to be created after bagged."""
     directory_list = []
-    for directory, subdirs, _ in os.walk(sip_dir):
+    for directory, subdirs, _ in get_inventory(sip_dir).walk(sip_dir):
         for subdir in subdirs:
             path = os.path.join(directory, subdir).replace(sip_dir + "/", "", 1)
             directory_list.append(path)
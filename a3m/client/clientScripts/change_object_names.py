@@ -225,6 +225,10 @@ class NameChanger:
         """
         Iterate over the filesystem, changing names as we go. Updates made on disk
         are batched and then applied to the database in chunks of BATCH_SIZE.
+
+        The tree is not read from the package inventory: it is listed once with
+        ``os.scandir`` while renaming, and the renames update the modification
+        times of the parent directories, which the next inventory refresh uses.
         """
         for old_path, new_path, is_dir, was_changed in change_names.change_tree(
             self.objects_directory, self.objects_directory
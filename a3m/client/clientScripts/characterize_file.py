@@ -5,6 +5,8 @@
 #
 # If a tool has no defined characterization commands, then the default
 # will be run instead (currently FITS).
+import logging
+
 from django.db import transaction
 from lxml import etree
 
@@ -17,6 +19,8 @@ from a3m.fpr.registry import Rule
 from a3m.fpr.registry import RulePurpose
 from a3m.main.models import FPCommandOutput
 
+logger = logging.getLogger(__name__)
+
 
 def _insert_command_output(file_uuid, rule_uuid, content):
     return FPCommandOutput.objects.create(
@@ -27,7 +31,7 @@ def _insert_command_output(file_uuid, rule_uuid, content):
 def _get_rules(file_uuid) -> list[Rule]:
     # Check to see whether the file has already been characterized; don't try
     # to characterize it a second time if so.
-    if FPCommandOutput.objects.filter(file_id=file_uuid).count() > 0:
+    if FPCommandOutput.objects.filter(file_id=file_uuid).exists():
         return []
 
     return FPR.get_file_rules(
@@ -38,16 +42,45 @@ def _get_rules(file_uuid) -> list[Rule]:
     )
 
 
-def main(job, file_path, file_uuid, sip_uuid):
-    setup_dicts()
+def _get_rules_for_files(file_uuids) -> dict[str, list[Rule]]:
+    """Like `_get_rules` for a batch of files, keyed by file identifier.
 
+    Files not found are left out.
+    """
+    rules = FPR.get_rules_for_files(
+        file_uuids, purpose=RulePurpose.CHARACTERIZATION, fallback=False
+    )
+    for file_uuid in FPCommandOutput.objects.filter(file_id__in=file_uuids).values_list(
+        "file_id", flat=True
+    ):
+        if str(file_uuid) in rules:
+            rules[str(file_uuid)] = []
+    return rules
+
+
+def _get_batch_rules(file_uuids):
+    """Return `_get_rules_for_files`, or an empty mapping if it fails.
+
+    Rules missing from the mapping are looked up by file, so that errors are
+    recorded by the jobs they concern instead of failing the whole batch.
+    """
+    try:
+        # A savepoint when in a transaction, which stays usable on failure.
+        with transaction.atomic():
+            return _get_rules_for_files(file_uuids)
+    except Exception:
+        logger.warning("Unable to load the rules of the batch", exc_info=True)
+        return {}
+
+
+def characterize(job, file_uuid, sip_uuid, rules):
+    """Run the characterization commands of a file.
+
+    Returns whether a command failed and the XML outputs to save.
+    """
     failed = False
     state = []
 
-    rules = _get_rules(file_uuid)
-    if not rules:
-        return 0
-
     for rule in rules:
         if (
             rule.command.script_type == "bashScript"
@@ -109,23 +142,24 @@ def main(job, file_path, file_uuid, sip_uuid):
                 )
             )
 
-    with transaction.atomic():
-        # Get again and compare rules during transaction
-        tx_rules = _get_rules(file_uuid)
-        if not tx_rules or list(rules) != list(tx_rules):
-            job.write_error(
-                f'Rules for file "{file_path}" changed during characterization'
-            )
-            return 255
+    return failed, state
 
-        # Save outputs if they are the same
-        for file_uuid, rule, stdout in state:
-            _insert_command_output(file_uuid, rule.id, stdout)
-            job.write_output(
-                'Saved XML output for command "{}" ({})'.format(
-                    rule.command.description, rule.command.id
-                )
+
+def save_outputs(job, file_path, file_uuid, failed, state):
+    """Save the outputs of `characterize` unless the file was characterized
+    by someone else in the meantime, which is the only way its rules change.
+    """
+    if FPCommandOutput.objects.filter(file_id=file_uuid).exists():
+        job.write_error(f'Rules for file "{file_path}" changed during characterization')
+        return 255
+
+    for file_uuid, rule, stdout in state:
+        _insert_command_output(file_uuid, rule.id, stdout)
+        job.write_output(
+            'Saved XML output for command "{}" ({})'.format(
+                rule.command.description, rule.command.id
             )
+        )
 
     if failed:
         return 255
@@ -134,6 +168,20 @@ def main(job, file_path, file_uuid, sip_uuid):
 
 
 def call(jobs):
+    setup_dicts()
+
+    # Resolve the rules of all the files in the batch at once.
+    rules = _get_batch_rules([job.args[2] for job in jobs if len(job.args) > 2])
+
     for job in jobs:
         with job.JobContext():
-            job.set_status(main(job, *job.args[1:]))
+            file_path, file_uuid, sip_uuid = job.args[1:4]
+            file_rules = rules.get(file_uuid)
+            if file_rules is None:
+                file_rules = _get_rules(file_uuid)
+            if not file_rules:
+                job.set_status(0)
+                continue
+            failed, state = characterize(job, file_uuid, sip_uuid, file_rules)
+            with transaction.atomic():
+                job.set_status(save_outputs(job, file_path, file_uuid, failed, state))
@@ -37,6 +37,7 @@ from a3m import namespaces as ns
 from a3m.archivematicaFunctions import escape
 from a3m.archivematicaFunctions import normalizeNonDcElementName
 from a3m.archivematicaFunctions import strToUnicode
+from a3m.inventory import get_inventory
 from a3m.main.models import SIP
 from a3m.main.models import Agent
 from a3m.main.models import Derivation
@@ -1252,7 +1253,8 @@ def get_paths_as_fsitems(baseDirectoryPath, objectsDirectoryPath):
     :returns: list of ``FSItem`` instances representing paths
     """
     all_fsitems = []
-    for root, dirs, files in os.walk(objectsDirectoryPath):
+    inventory = get_inventory(baseDirectoryPath)
+    for root, dirs, files in inventory.walk(objectsDirectoryPath):
         root = root.replace(baseDirectoryPath, "", 1)
         if files or dirs:
             all_fsitems.append(FSItem("dir", root, is_empty=False))
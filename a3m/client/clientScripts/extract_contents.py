@@ -120,6 +120,11 @@ def main(job, transfer_uuid, sip_directory, date, task_uuid, delete=False):
 
     transfer_mdl = Transfer.objects.get(uuid=transfer_uuid)
 
+    # Resolve the rules of all the files at once.
+    rules_by_file = FPR.get_rules_for_files(
+        [file_obj.uuid for file_obj in files], purpose=RulePurpose.EXTRACT
+    )
+
     # We track whether or not anything was extracted because that controls what
     # the next microservice chain link will be.
     # If something was extracted, then a new identification step has to be
@@ -142,7 +147,7 @@ def main(job, transfer_uuid, sip_directory, date, task_uuid, delete=False):
             )
             continue
 
-        rules = FPR.get_file_rules(file_obj, purpose=RulePurpose.EXTRACT)
+        rules = rules_by_file.get(file_obj.uuid, [])
         if not rules:
             job.pyprint(
                 f"Not extracting contents from {location} - no rule found to extract.",
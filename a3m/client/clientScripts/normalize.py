@@ -1,5 +1,6 @@
 import argparse
 import csv
+import logging
 import os
 import traceback
 import uuid
@@ -20,6 +21,8 @@ from a3m.main.models import File
 from a3m.main.models import FileFormatVersion
 from a3m.main.models import FileID
 
+logger = logging.getLogger(__name__)
+
 # Return codes
 SUCCESS = 0
 RULE_FAILED = 1
@@ -381,7 +384,7 @@ def insert_derivation_event(
     )
 
 
-def main(job, opts):
+def main(job, opts, preloaded_rules=None):
     """Find and execute normalization commands on input file."""
     setup_dicts()
 
@@ -443,7 +446,9 @@ def main(job, opts):
         return NO_RULE_FOUND
     path = os.path.basename(file_.currentlocation)
 
-    rules = FPR.get_file_rules(opts.file_uuid, purpose=RulePurpose.PRESERVATION)
+    rules = preloaded_rules
+    if rules is None:
+        rules = FPR.get_file_rules(opts.file_uuid, purpose=RulePurpose.PRESERVATION)
     if not rules:
         job.print_output(
             f"Not normalizing {path} - no rule or default rule found to normalize for preservation"
@@ -478,12 +483,25 @@ def call(jobs):
         help='"service", "original", "submissionDocumentation", etc',
     )
 
+    # Resolve the rules of all the files in the batch at once. On failure,
+    # they are looked up by file so that each job records its own error.
+    try:
+        rules = FPR.get_rules_for_files(
+            [job.args[1] for job in jobs if len(job.args) > 1],
+            purpose=RulePurpose.PRESERVATION,
+        )
+    except Exception:
+        logger.warning("Unable to load the rules of the batch", exc_info=True)
+        rules = {}
+
     with transaction.atomic():
         for job in jobs:
             with job.JobContext():
                 opts = parser.parse_args(job.args[1:])
                 try:
-                    job.set_status(main(job, opts))
+                    job.set_status(
+                        main(job, opts, preloaded_rules=rules.get(opts.file_uuid))
+                    )
                 except Exception as e:
                     job.print_error(str(e))
                     job.set_status(1)
@@ -37,10 +37,20 @@ NO_RULES_CODE = 0
 DERIVATIVE_TYPES = ("preservation", "access")
 
 
-def main(job, file_path, file_uuid, sip_uuid, shared_path, file_type):
+def main(
+    job, file_path, file_uuid, sip_uuid, shared_path, file_type, preloaded_rules=None
+):
     setup_dicts()
 
-    validator = Validator(job, file_path, file_uuid, sip_uuid, shared_path, file_type)
+    validator = Validator(
+        job,
+        file_path,
+        file_uuid,
+        sip_uuid,
+        shared_path,
+        file_type,
+        preloaded_rules=preloaded_rules,
+    )
     return validator.validate()
 
 
@@ -62,7 +72,16 @@ class Validator:
 
     purpose: Final[RulePurpose] = RulePurpose.VALIDATION
 
-    def __init__(self, job, file_path, file_uuid, sip_uuid, shared_path, file_type):
+    def __init__(
+        self,
+        job,
+        file_path,
+        file_uuid,
+        sip_uuid,
+        shared_path,
+        file_type,
+        preloaded_rules=None,
+    ):
         self.job = job
         self.file_path = file_path
         self.file_uuid = file_uuid
@@ -71,6 +90,7 @@ class Validator:
         self.file_type = file_type
         self._sip_logs_dir = None
         self._sip_pres_val_dir = None
+        self._preloaded_rules = preloaded_rules
 
     def validate(self):
         """Validate the file identified by ``self.file_uuid``, using all rules
@@ -99,6 +119,8 @@ class Validator:
 
     def _get_rules(self):
         """Return all FPR rules that apply to files of this type."""
+        if self._preloaded_rules is not None:
+            return self._preloaded_rules
         return FPR.get_file_rules(self.file_uuid, self.purpose, fallback=True)
 
     def _execute_rule_command(self, rule: Rule):
@@ -315,6 +337,18 @@ def _get_file_type(argv):
 
 
 def call(jobs):
+    # Resolve the rules of all the files in the batch at once. On failure,
+    # they are looked up by file so that each job records its own error.
+    try:
+        rules = FPR.get_rules_for_files(
+            [job.args[2] for job in jobs if len(job.args) > 2],
+            Validator.purpose,
+            fallback=True,
+        )
+    except Exception:
+        logger.warning("Unable to load the rules of the batch", exc_info=True)
+        rules = {}
+
     with transaction.atomic():
         for job in jobs:
             with job.JobContext(logger=logger):
@@ -324,5 +358,13 @@ def call(jobs):
                 shared_path = _get_shared_path(job.args)
                 file_type = _get_file_type(job.args)
                 job.set_status(
-                    main(job, file_path, file_uuid, sip_uuid, shared_path, file_type)
+                    main(
+                        job,
+                        file_path,
+                        file_uuid,
+                        sip_uuid,
+                        shared_path,
+                        file_type,
+                        preloaded_rules=rules.get(file_uuid),
+                    )
                 )
@@ -38,6 +38,7 @@ import uuid
 from django.db import transaction
 
 from a3m.archivematicaFunctions import strToUnicode
+from a3m.inventory import get_inventory
 from a3m.main.models import Event
 from a3m.main.models import File
 from a3m.main.models import Transfer
@@ -104,14 +105,14 @@ class Hashsum:
             )
         )
 
-    def count_and_compare_lines(self, objects_dir):
+    def count_and_compare_lines(self, transfer_dir, objects_dir):
         """Count the number of lines in a checksum file and compare with the
         number of objects being transferred. The requirement of hashsum as
         this microservice job is written is that the mapping is 1:1. There
         isn't space for an empty line at the end of the file.
         """
         lines = self._count_lines(self.hashfile)
-        objects = self._count_files(objects_dir)
+        objects = self._count_files(transfer_dir, objects_dir)
         if lines == objects:
             return True
         self.job.pyprint(
@@ -124,7 +125,7 @@ class Hashsum:
     def compare_hashes(self, transfer_dir):
         """Compare transfer files with the checksum file provided."""
         objects_dir = os.path.join(transfer_dir, "objects")
-        if not self.count_and_compare_lines(objects_dir):
+        if not self.count_and_compare_lines(transfer_dir, objects_dir):
             return 1
         try:
             self._call("-c", "--strict", self.hashfile, transfer_dir=objects_dir)
@@ -198,9 +199,11 @@ class Hashsum:
         return count + 1
 
     @staticmethod
-    def _count_files(path):
-        """Walk the directories on a given path and count the number of files."""
-        return sum(len(files) for _, _, files in os.walk(path))
+    def _count_files(transfer_dir, path):
+        """Count the number of files under a directory of the transfer."""
+        # Same inventory as the other scripts, keyed on the transfer.
+        inventory = get_inventory(transfer_dir)
+        return sum(len(files) for _, _, files in inventory.walk(path))
 
 
 def get_file_queryset(transfer_uuid):
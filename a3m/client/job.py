@@ -5,12 +5,17 @@ batches by clientScript modules and populated with an exit code, standard out
 and standard error information.
 """
 
+import collections
+import gzip
 import logging
 import os
 import sys
 import traceback
 from contextlib import contextmanager
 
+from a3m.common_metrics import QueryCounter
+from a3m.common_metrics import count_queries
+
 STANDARD_FORMAT = (
     "%(levelname)-8s  %(asctime)s  %(name)s.%(funcName)s:%(lineno)d  %(message)s"
 )
@@ -31,16 +36,133 @@ class CallbackHandler(logging.Handler):
         self.callback(self.format(record))
 
 
+class OutputBuffer:
+    """Output of a job, kept in chunks and bounded to ``limit`` characters.
+
+    Over the limit, only the first and the last half of the limit are kept
+    with a note about the truncation in between. If ``log_path`` is given,
+    the full output of a truncated buffer is written to that file,
+    gzip-compressed. A limit of zero keeps everything.
+    """
+
+    def __init__(self, limit=0, log_path=None):
+        self.limit = limit
+        self.log_path = log_path
+        self.size = 0
+        self.chunks = []
+
+        # Set once truncated.
+        self.head = None
+        self.tail = collections.deque()
+        self.tail_size = 0
+        self.unlogged = []
+        self.unlogged_size = 0
+
+    def write(self, s):
+        if not s:
+            return
+        self.size += len(s)
+        if self.head is None:
+            self.chunks.append(s)
+            if self.limit and self.size > self.limit:
+                self._truncate()
+            return
+
+        self.tail.append(s)
+        self.tail_size += len(s)
+        tail_limit = self.limit - len(self.head)
+        while self.tail_size - len(self.tail[0]) >= tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+
+        if self.log_path:
+            self.unlogged.append(s)
+            self.unlogged_size += len(s)
+            if self.unlogged_size >= self.limit:
+                self._flush_log()
+
+    def getvalue(self):
+        if self.head is None:
+            if len(self.chunks) > 1:
+                self.chunks = ["".join(self.chunks)]
+            return "".join(self.chunks)
+
+        self._flush_log()
+        tail = "".join(self.tail)[len(self.head) - self.limit :]
+        note = f"[... {self.size - len(self.head) - len(tail)} characters truncated"
+        if self.log_path:
+            note += f", see {self.log_path}"
+        return f"{self.head}\n{note} ...]\n{tail}"
+
+    def _truncate(self):
+        text = "".join(self.chunks)
+        self.chunks = []
+        self.head = text[: self.limit // 2]
+        self.tail.append(text[len(self.head) :])
+        self.tail_size = len(self.tail[0])
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            self.unlogged = [text]
+            self._flush_log(mode="wt")
+
+    def _flush_log(self, mode="at"):
+        if not self.unlogged:
+            return
+        # Appending adds a gzip member, readers see a single stream.
+        with gzip.open(self.log_path, mode, encoding="utf-8") as f:
+            f.writelines(self.unlogged)
+        self.unlogged = []
+        self.unlogged_size = 0
+
+
 class Job:
-    def __init__(self, name, uuid, args, caller_wants_output=False):
+    def __init__(
+        self,
+        name,
+        uuid,
+        args,
+        caller_wants_output=False,
+        output_limit=0,
+        output_log_dir=None,
+        start_time=None,
+    ):
         self.name = name
         self.UUID = uuid
         self.args = [name] + args
         self.caller_wants_output = caller_wants_output
         self.int_code = 0
         self.status_code = "success"
+        self.output_limit = output_limit
+        self.output_log_dir = output_log_dir
         self.output = ""
         self.error = ""
+        # Database statements made in `JobContext`.
+        self.queries = QueryCounter()
+        # When the batch of the job started, recorded in its task.
+        self.start_time = start_time
+
+    @property
+    def output(self):
+        return self._output.getvalue()
+
+    @output.setter
+    def output(self, value):
+        self._output = self._output_buffer("stdout")
+        self._output.write(value)
+
+    @property
+    def error(self):
+        return self._error.getvalue()
+
+    @error.setter
+    def error(self, value):
+        self._error = self._output_buffer("stderr")
+        self._error.write(value)
+
+    def _output_buffer(self, stream):
+        log_path = None
+        if self.output_log_dir:
+            log_path = os.path.join(self.output_log_dir, f"{self.UUID}.{stream}.gz")
+        return OutputBuffer(self.output_limit, log_path)
 
     def dump(self):
         return (
@@ -71,10 +193,10 @@ class Job:
         self.status_code = status_code
 
     def write_output(self, s):
-        self.output += s
+        self._output.write(s)
 
     def write_error(self, s):
-        self.error += s
+        self._error.write(s)
 
     def print_output(self, *args):
         self.write_output(" ".join([self._to_str(x) for x in args]) + "\n")
@@ -118,7 +240,8 @@ class Job:
             logger.addHandler(handler)
 
         try:
-            yield
+            with count_queries(self.queries):
+                yield
         except Exception as e:
             self.write_error(str(e))
             self.write_error(traceback.format_exc())
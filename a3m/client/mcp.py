@@ -49,20 +49,26 @@ task to run next).
 #
 # You should have received a copy of the GNU General Public License
 # along with Archivematica.  If not, see <http://www.gnu.org/licenses/>.
+import datetime
 import importlib
 import logging
+import os
 import shlex
 
 from django.conf import settings as django_settings
-from django.db import transaction
+from django.db import connection
 
+from a3m import inventory
+from a3m import tracing
 from a3m.client import ASSETS_DIR
 from a3m.client import metrics
 from a3m.client.job import Job
+from a3m.common_metrics import count_queries
 from a3m.databaseFunctions import auto_close_db
 from a3m.databaseFunctions import getUTCDate
 from a3m.databaseFunctions import retryOnFailure
 from a3m.main.models import Task
+from a3m.replacements import compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -79,41 +85,40 @@ def handle_batch_task(task_name, batch_payload):
     mod = ""
     utc_date = getUTCDate()
     jobs = []
+    output_log_dir = None
+    if django_settings.CLIENT_SCRIPT_OUTPUT_LOG:
+        output_log_dir = os.path.join(django_settings.SHARED_DIRECTORY, "logs", "tasks")
+    date = utc_date.isoformat()
     for task_uuid in tasks:
         task_data = tasks[task_uuid]
-        arguments = task_data["arguments"]
         mod = task_data["execute"]
 
-        replacements = list(replacement_dict.items()) + list(
+        # Values inserted by the server may use these variables too, e.g.
+        # %sharedPath%, so the expanded arguments are compiled, once per
+        # distinct string, here rather than on the server.
+        arguments = compile_template(task_data["arguments"]).expand(
             {
-                r"%date%": utc_date.isoformat(),
+                r"%date%": date,
                 r"%taskUUID%": task_uuid,
                 r"%jobCreatedDate%": task_data["createdDate"],
-            }.items()
+            },
+            replacement_dict,
         )
 
-        for var, val in replacements:
-            arguments = arguments.replace(var, val)
-
         job = Job(
             task_name,
             task_data["uuid"],
             _parse_command_line(arguments),
             caller_wants_output=task_data["wants_output"],
+            output_limit=django_settings.CLIENT_SCRIPT_OUTPUT_LIMIT,
+            output_log_dir=output_log_dir,
+            start_time=utc_date,
         )
         jobs.append(job)
 
-    # Set their start times.  If we collide with the MCP Server inserting new
-    # Tasks (which can happen under heavy concurrent load), retry as needed.
-    def set_start_times():
-        Task.objects.filter(taskuuid__in=[item.UUID for item in jobs]).update(
-            starttime=utc_date
-        )
-
-    retryOnFailure("Set task start times", set_start_times)
-
     module = importlib.import_module(f"a3m.client.clientScripts.{mod}")
-    module.call(jobs)
+    with inventory.batch():
+        module.call(jobs)
 
     return jobs
 
@@ -129,6 +134,89 @@ def _shlex_unescape(s):
     return "".join(c1 for c1, c2 in zip(s, s[1:] + ".") if (c1, c2) != ("\\", "`"))
 
 
+def write_task_results(batch_payload, jobs, end_time):
+    """Write the start time and the results of a batch of jobs to their tasks.
+
+    Tasks are written in bulk with a single statement. Output columns are
+    left empty unless the output is captured or the job failed.
+    """
+    tasks = []
+    for job in jobs:
+        task = _task_record(
+            batch_payload["tasks"][job.UUID],
+            exitcode=job.get_exit_code(),
+            starttime=job.start_time,
+            endtime=end_time,
+            querycount=job.queries.count,
+            querytime=job.queries.duration,
+        )
+        if django_settings.CAPTURE_CLIENT_SCRIPT_OUTPUT or task.exitcode > 0:
+            task.stdout = job.get_stdout()
+            task.stderror = job.get_stderr()
+        tasks.append(task)
+
+    _save_task_records(
+        tasks,
+        [
+            "exitcode",
+            "starttime",
+            "endtime",
+            "querycount",
+            "querytime",
+            "stdout",
+            "stderror",
+        ],
+    )
+
+
+def _task_record(task_data, **fields):
+    """Return the `Task` of an item of the batch payload."""
+    return Task(
+        taskuuid=task_data["uuid"],
+        job_id=task_data["jobUUID"],
+        fileuuid=task_data["fileUUID"],
+        filename=task_data["fileName"],
+        execution=task_data["execute"],
+        arguments=task_data["arguments"],
+        createdtime=datetime.datetime.fromisoformat(task_data["createdDate"]),
+        **fields,
+    )
+
+
+def _save_task_records(tasks, fields):
+    """Write ``fields`` of the tasks given.
+
+    The server queues the creation of the tasks, see `a3m.server.bookkeeping`,
+    so they are inserted unless they are written already.
+    """
+    unique_fields = None
+    if connection.features.supports_update_conflicts_with_target:
+        unique_fields = ["taskuuid"]
+    Task.objects.bulk_create(
+        tasks,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=fields,
+    )
+
+
+def charge_batch_queries(jobs, queries):
+    """Charge the database statements of a batch to its jobs.
+
+    Statements made in `Job.JobContext` are already counted for their job.
+    The others, e.g. made to prepare the whole batch or by scripts that do not
+    use the context, are shared evenly so that the jobs add up to the batch.
+    """
+    if not jobs:
+        return
+    count = max(queries.count - sum(job.queries.count for job in jobs), 0)
+    duration = max(queries.duration - sum(job.queries.duration for job in jobs), 0)
+    share, remainder = divmod(count, len(jobs))
+    for index, job in enumerate(jobs):
+        job.queries.count += share + (index < remainder)
+        job.queries.duration += duration / len(jobs)
+
+
 def fail_all_tasks(batch_payload, reason):
     tasks = batch_payload["tasks"]
 
@@ -138,10 +226,16 @@ def fail_all_tasks(batch_payload, reason):
     try:
 
         def fail_all_tasks_callback():
-            for task_uuid in tasks:
-                Task.objects.filter(taskuuid=task_uuid).update(
-                    stderror=str(reason), exitcode=1, endtime=getUTCDate()
-                )
+            end_time = getUTCDate()
+            _save_task_records(
+                [
+                    _task_record(
+                        task_data, stderror=str(reason), exitcode=1, endtime=end_time
+                    )
+                    for task_data in tasks.values()
+                ],
+                ["stderror", "exitcode", "endtime"],
+            )
 
         retryOnFailure("Fail all tasks", fail_all_tasks_callback)
     except Exception as e:
@@ -155,55 +249,58 @@ def fail_all_tasks(batch_payload, reason):
 def execute_command(task_name: str, batch_payload):
     """Execute the command encoded in ``batch_payload`` and return its exit
     code, standard output and standard error as a dictionary.
+
+    With ``PACKAGE_TRACES`` enabled, the spans recorded while running the
+    batch are returned too, the server adds them to the trace of the package.
     """
+    if not django_settings.PACKAGE_TRACES:
+        return _execute_command(task_name, batch_payload)
+
+    with tracing.activate(tracing.Trace()) as trace:
+        with tracing.span(task_name, tracing.BATCH, tasks=len(batch_payload["tasks"])):
+            results = _execute_command(task_name, batch_payload)
+    results["spans"] = trace.events
+    return results
+
+
+def _execute_command(task_name: str, batch_payload):
     logger.debug("\n\n*** RUNNING TASK: %s", task_name)
 
     with metrics.task_execution_time_histogram.labels(script_name=task_name).time():
         try:
-            jobs = handle_batch_task(task_name, batch_payload)
+            with count_queries() as queries:
+                jobs = handle_batch_task(task_name, batch_payload)
+            charge_batch_queries(jobs, queries)
             results = {}
+            end_time = getUTCDate()
+            retryOnFailure(
+                "Write task results",
+                lambda: write_task_results(batch_payload, jobs, end_time),
+            )
 
-            def write_task_results_callback():
-                with transaction.atomic():
-                    for job in jobs:
-                        logger.debug("Completed job: %s\n", job.dump())
-
-                        exit_code = job.get_exit_code()
-                        end_time = getUTCDate()
-
-                        kwargs = {"exitcode": exit_code, "endtime": end_time}
-                        if (
-                            django_settings.CAPTURE_CLIENT_SCRIPT_OUTPUT
-                            or kwargs["exitcode"] > 0
-                        ):
-                            kwargs.update(
-                                {
-                                    "stdout": job.get_stdout(),
-                                    "stderror": job.get_stderr(),
-                                }
-                            )
-                        Task.objects.filter(taskuuid=job.UUID).update(**kwargs)
-
-                        results[job.UUID] = {
-                            "exitCode": exit_code,
-                            "finishedTimestamp": end_time,
-                        }
-
-                        if job.caller_wants_output:
-                            # Send back stdout/stderr so it can be written to files.
-                            # Most cases don't require this (logging to the database is
-                            # enough), but the ones that do are coordinated through the
-                            # MCP Server so that multiple MCP Client instances don't try
-                            # to write the same file at the same time.
-                            results[job.UUID]["stdout"] = job.get_stdout()
-                            results[job.UUID]["stderror"] = job.get_stderr()
-
-                        if exit_code == 0:
-                            metrics.job_completed(task_name)
-                        else:
-                            metrics.job_failed(task_name)
-
-            retryOnFailure("Write task results", write_task_results_callback)
+            for job in jobs:
+                logger.debug("Completed job: %s\n", job.dump())
+
+                exit_code = job.get_exit_code()
+                results[job.UUID] = {
+                    "exitCode": exit_code,
+                    "finishedTimestamp": end_time,
+                }
+
+                if job.caller_wants_output:
+                    # Send back stdout/stderr so it can be written to files.
+                    # Most cases don't require this (logging to the database is
+                    # enough), but the ones that do are coordinated through the
+                    # MCP Server so that multiple MCP Client instances don't try
+                    # to write the same file at the same time.
+                    results[job.UUID]["stdout"] = job.get_stdout()
+                    results[job.UUID]["stderror"] = job.get_stderr()
+
+                metrics.job_queries(task_name, job.queries)
+                if exit_code == 0:
+                    metrics.job_completed(task_name)
+                else:
+                    metrics.job_failed(task_name)
 
             return {"task_results": results}
         except SystemExit:
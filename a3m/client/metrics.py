@@ -14,6 +14,8 @@ from prometheus_client import Gauge
 from prometheus_client import Histogram
 
 from a3m.client import clientScripts
+from a3m.common_metrics import DB_QUERY_COUNT_BUCKETS
+from a3m.common_metrics import DB_QUERY_TIME_BUCKETS
 from a3m.common_metrics import PACKAGE_FILE_COUNT_BUCKETS
 from a3m.common_metrics import PACKAGE_SIZE_BUCKETS
 from a3m.common_metrics import PROCESSING_TIME_BUCKETS
@@ -48,6 +50,18 @@ task_execution_time_histogram = Histogram(
     ["script_name"],
     buckets=TASK_DURATION_BUCKETS,
 )
+job_db_queries_histogram = Histogram(
+    "mcpclient_job_db_queries",
+    "Histogram of database statements made per job, labeled by script",
+    ["script_name"],
+    buckets=DB_QUERY_COUNT_BUCKETS,
+)
+job_db_query_time_histogram = Histogram(
+    "mcpclient_job_db_query_time_seconds",
+    "Histogram of time spent in database statements per job, labeled by script",
+    ["script_name"],
+    buckets=DB_QUERY_TIME_BUCKETS,
+)
 
 transfer_started_counter = Counter(
     "mcpclient_transfer_started_total", "Number of Transfers started"
@@ -149,6 +163,8 @@ def init_counter_labels():
         job_error_counter.labels(script_name=modname)
         job_error_timestamp.labels(script_name=modname)
         task_execution_time_histogram.labels(script_name=modname)
+        job_db_queries_histogram.labels(script_name=modname)
+        job_db_query_time_histogram.labels(script_name=modname)
 
     for failure_type in PACKAGE_FAILURE_TYPES:
         transfer_error_counter.labels(failure_type=failure_type)
@@ -172,6 +188,14 @@ def job_failed(script_name):
     job_error_timestamp.labels(script_name=script_name).set_to_current_time()
 
 
+@skip_if_prometheus_disabled
+def job_queries(script_name, queries):
+    job_db_queries_histogram.labels(script_name=script_name).observe(queries.count)
+    job_db_query_time_histogram.labels(script_name=script_name).observe(
+        queries.duration
+    )
+
+
 @skip_if_prometheus_disabled
 def aip_stored(sip_uuid, size):
     aips_stored_counter.inc()
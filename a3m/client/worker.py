@@ -0,0 +1,158 @@
+"""
+Remote worker.
+
+Workers lease batches of tasks from an a3m server configured with the remote
+task backend, run them like the server would run them locally (see
+`execute_command`) and report the results back. Workers are stateless, but
+they need access to the database and the shared directory of the server.
+
+While a batch is being processed, a background thread renews its lease. If the
+worker dies, the lease expires and the server dispatches the batch again.
+"""
+
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+
+import grpc
+
+from a3m.api.workerservice import v1beta1 as worker_service_api
+from a3m.client.mcp import execute_command
+
+logger = logging.getLogger(__name__)
+
+
+def payload_from_proto(lease):
+    """Decode the batch of a lease into the payload of `execute_command`."""
+    return {
+        "tasks": {
+            task.id: {
+                "uuid": task.id,
+                "createdDate": task.created_date,
+                "arguments": task.arguments,
+                "wants_output": task.wants_output,
+                "execute": task.execute,
+                "jobUUID": task.job_id,
+                "fileUUID": task.file_uuid,
+                "fileName": task.file_name,
+            }
+            for task in lease.tasks
+        }
+    }
+
+
+def results_to_proto(results):
+    """Encode the task results returned by `execute_command`."""
+    messages = []
+    for task_id, result in results["task_results"].items():
+        message = worker_service_api.request_response_pb2.TaskResult(
+            id=task_id,
+            exit_code=result["exitCode"],
+            stdout=result.get("stdout", ""),
+            stderr=result.get("stderror", ""),
+        )
+        finished_timestamp = result.get("finishedTimestamp")
+        if isinstance(finished_timestamp, datetime.datetime):
+            message.finished_time.FromDatetime(finished_timestamp)
+        messages.append(message)
+    return messages
+
+
+def spans_to_proto(spans):
+    """Encode the trace events returned by `execute_command`."""
+    return [
+        worker_service_api.request_response_pb2.Span(
+            name=span["name"],
+            category=span["cat"],
+            start=span["ts"],
+            duration=span["dur"],
+            pid=span["pid"],
+            tid=span["tid"],
+            args={key: str(value) for key, value in span.get("args", {}).items()},
+        )
+        for span in spans
+    ]
+
+
+class Worker:
+    """Processes batches of tasks leased from an a3m server."""
+
+    # Seconds to wait before asking again when there are no batches.
+    POLL_INTERVAL = 1
+
+    def __init__(self, channel, worker_id=None, poll_interval=POLL_INTERVAL):
+        self.stub = worker_service_api.service_pb2_grpc.WorkerServiceStub(channel)
+        if worker_id is None:
+            worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.shutdown_event = threading.Event()
+
+    def work(self):
+        """Process batches until `stop` is called."""
+        logger.info("Worker %s started", self.worker_id)
+        while not self.shutdown_event.is_set():
+            if not self.process_one_batch():
+                self.shutdown_event.wait(self.poll_interval)
+
+    def stop(self):
+        self.shutdown_event.set()
+
+    def process_one_batch(self):
+        """Lease a batch and process it. Return False if there was none."""
+        request = worker_service_api.request_response_pb2.LeaseBatchRequest(
+            worker_id=self.worker_id
+        )
+        try:
+            resp = self.stub.LeaseBatch(request)
+        except grpc.RpcError as err:
+            logger.warning("Unable to lease a batch: %s", err.details())
+            return False
+        if not resp.HasField("lease"):
+            return False
+
+        lease = resp.lease
+        logger.debug("Processing lease %s (%s)", lease.id, lease.job_name)
+
+        lease_done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._send_heartbeats, args=(lease, lease_done), daemon=True
+        )
+        heartbeat.start()
+        try:
+            start_time = time.monotonic()
+            results = execute_command(lease.job_name, payload_from_proto(lease))
+            duration = time.monotonic() - start_time
+        finally:
+            lease_done.set()
+            heartbeat.join()
+
+        request = worker_service_api.request_response_pb2.CompleteBatchRequest(
+            worker_id=self.worker_id,
+            lease_id=lease.id,
+            results=results_to_proto(results),
+            duration=duration,
+            spans=spans_to_proto(results.get("spans", [])),
+        )
+        try:
+            self.stub.CompleteBatch(request)
+        except grpc.RpcError as err:
+            logger.warning("Unable to complete lease %s: %s", lease.id, err.details())
+
+        return True
+
+    def _send_heartbeats(self, lease, lease_done):
+        """Renew the lease given until the batch is done."""
+        request = worker_service_api.request_response_pb2.HeartbeatRequest(
+            worker_id=self.worker_id, lease_id=lease.id
+        )
+        while not lease_done.wait(lease.duration / 3):
+            try:
+                self.stub.Heartbeat(request)
+            except grpc.RpcError as err:
+                logger.warning("Unable to renew lease %s: %s", lease.id, err.details())
+                if err.code() == grpc.StatusCode.NOT_FOUND:
+                    return  # Expired, the batch was given to another worker.
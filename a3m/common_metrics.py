@@ -2,6 +2,8 @@ import math
 import time
 from contextlib import contextmanager
 
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
 from prometheus_client import Counter
 
 # We need to balance reasonably accurate tracking with high cardinality here, as
@@ -64,6 +66,34 @@ PACKAGE_SIZE_BUCKETS = (
     math.inf,
 )
 
+# Histograms of the number of database statements of jobs and tasks, and of
+# the time spent running them. Used with script_name labels.
+DB_QUERY_COUNT_BUCKETS = (
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    20.0,
+    50.0,
+    100.0,
+    200.0,
+    500.0,
+    1000.0,
+    math.inf,
+)
+DB_QUERY_TIME_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    math.inf,
+)
+
 
 db_retry_time_counter = Counter(
     "common_db_retry_time_seconds",
@@ -83,3 +113,39 @@ def db_retry_timer(*args, **kwargs):
     finally:
         duration = time.time() - start_time
         db_retry_time_counter.labels(**kwargs).inc(duration)
+
+
+class QueryCounter:
+    """Counts database statements and the time spent running them.
+
+    It is a Django execute wrapper, see `count_queries`. With ``record``, the
+    SQL of the statements is kept too, e.g. to report them in tests.
+    """
+
+    def __init__(self, record=False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if record else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start_time
+            self.count += 1
+            if self.statements is not None:
+                self.statements.append(sql)
+
+
+@contextmanager
+def count_queries(counter=None, using=DEFAULT_DB_ALIAS):
+    """Count the statements run by the current thread in the context.
+
+    Counters can be nested, statements are counted by all of them. Pass an
+    existing ``counter`` to add to it.
+    """
+    if counter is None:
+        counter = QueryCounter()
+    with connections[using].execute_wrapper(counter):
+        yield counter
@@ -24,6 +24,8 @@ from a3m.main import models
 
 config = {}
 
+UPPERCASE_PATTERN = re.compile(r"([A-Z]+)")
+
 
 def setup_dicts():
     config["shared_directory"] = django_settings.SHARED_DIRECTORY
@@ -183,10 +185,14 @@ class ReplacementDict(dict):
         ['The value of the foo variable is: bar']
         """
         ret = []
+        pattern = None
         for orig in strings:
-            if orig is not None:
-                for key, value in self.items():
-                    orig = orig.replace(key, value)
+            if orig is not None and self:
+                if pattern is None:
+                    # Longer keys first, a key may be a prefix of another.
+                    keys = sorted(self, key=len, reverse=True)
+                    pattern = re.compile("|".join(re.escape(key) for key in keys))
+                orig = pattern.sub(lambda match: self[match.group()], orig)
             ret.append(orig)
         return ret
 
@@ -202,7 +208,7 @@ class ReplacementDict(dict):
         """
         args = []
         for key, value in self.items():
-            optname = re.sub(r"([A-Z]+)", r"-\1", key[1:-1]).lower()
+            optname = UPPERCASE_PATTERN.sub(r"-\1", key[1:-1]).lower()
             opt = f"--{optname}={value}"
             args.append(opt)
 
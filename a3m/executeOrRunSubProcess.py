@@ -26,6 +26,7 @@ import tempfile
 from typing import Any
 from typing import Union
 
+from a3m import tracing
 from a3m.fpr.registry import CommandScriptType
 
 ExecutionResult = tuple[int, str, str]
@@ -219,6 +220,38 @@ def executeOrRun(
             type = CommandScriptType(type)
         except ValueError:
             raise ValueError(f"unknown type {type}")
+    with tracing.span(_span_name(type, command), tracing.SUBPROCESS):
+        return _run(
+            type,
+            command,
+            stdIn=stdIn,
+            printing=printing,
+            arguments=arguments,
+            env_updates=env_updates,
+            capture_output=capture_output,
+        )
+
+
+def _span_name(type: CommandScriptType, command: SubprocessCommand) -> str:
+    """Name of the executable of a command, or the type of a script."""
+    if type != CommandScriptType.COMMAND:
+        return type.value
+    try:
+        executable = shlex.split(command)[0] if isinstance(command, str) else command[0]
+    except (IndexError, ValueError):
+        return type.value
+    return os.path.basename(executable)
+
+
+def _run(
+    type: CommandScriptType,
+    command: SubprocessCommand,
+    stdIn: StandardInputType,
+    printing: bool,
+    arguments: list,
+    env_updates: dict,
+    capture_output: bool,
+) -> ExecutionResult:
     if type == CommandScriptType.COMMAND:
         return launchSubProcess(
             command,
@@ -33,10 +33,18 @@ digital files.
 
 from __future__ import annotations
 
+import collections
+import functools
+import hashlib
 import json
+import logging
+import marshal
+import os
+import tempfile
 import uuid
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterable
 from datetime import datetime
 from enum import Enum
 from importlib.resources import files
@@ -48,6 +56,9 @@ from typing import TypedDict
 from typing import TypeVar
 
 from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 # Avoid issues with circular imports.
 if TYPE_CHECKING:
@@ -106,6 +117,8 @@ class FormatGroup:
     }
     """
 
+    __slots__ = ("id", "slug", "description")
+
     id: uuid.UUID
     slug: str
     description: str
@@ -121,6 +134,8 @@ class Format:
     }
     """
 
+    __slots__ = ("id", "group", "slug", "description")
+
     id: uuid.UUID
     group: FormatGroup
     slug: str
@@ -144,6 +159,20 @@ class FormatVersion:
     }
     """
 
+    __slots__ = (
+        "id",
+        "replaces",
+        "format",
+        "last_modified",
+        "enabled",
+        "access_format",
+        "preservation_format",
+        "version",
+        "slug",
+        "pronom_id",
+        "description",
+    )
+
     id: uuid.UUID
     replaces: uuid.UUID | None
     format: Format
@@ -168,6 +197,8 @@ class Tool:
     },
     """
 
+    __slots__ = ("id", "slug", "version", "enabled", "description")
+
     id: uuid.UUID
     slug: str
     version: str
@@ -194,6 +225,22 @@ class Command:
     }
     """
 
+    __slots__ = (
+        "id",
+        "replaces",
+        "last_modified",
+        "enabled",
+        "output_location",
+        "command_usage",
+        "command",
+        "script_type",
+        "description",
+        "tool",
+        "output_format",
+        "verification_command",
+        "event_detail_command",
+    )
+
     id: uuid.UUID
     replaces: uuid.UUID | None
     last_modified: datetime
@@ -222,6 +269,16 @@ class Rule:
     }
     """
 
+    __slots__ = (
+        "id",
+        "replaces",
+        "purpose",
+        "command",
+        "format",
+        "last_modified",
+        "enabled",
+    )
+
     id: uuid.UUID
     replaces: uuid.UUID | None
     purpose: RulePurpose
@@ -298,8 +355,21 @@ class JSONBackend(Backend):
     replaced_commands: dict[uuid.UUID, uuid.UUID]
     replaced_rules: dict[uuid.UUID, uuid.UUID]
 
+    # Lookup indexes of objects in service, built once after loading.
+    versions_by_puid: dict[str, FormatVersion]
+    rules_by_version_and_purpose: dict[tuple[uuid.UUID, RulePurpose], list[Rule]]
+
     def __init__(self, blob):
         self._load(json.loads(blob))
+        self._index()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict[str, list[tuple]]) -> JSONBackend:
+        """Build a backend from the plain data returned by `snapshot`."""
+        backend = cls.__new__(cls)
+        backend._load_snapshot(snapshot)
+        backend._index()
+        return backend
 
     def _load(self, data: DjangoDatabaseDumpList):
         self.formats = {}
@@ -309,126 +379,331 @@ class JSONBackend(Backend):
         self.rules = {}
         self.tools = {}
 
-        # Load format groups.
+        # Group the items by model in a single pass.
+        items: dict[str, list[dict[str, Any]]] = collections.defaultdict(list)
         for item in data:
-            model, fields = item["model"], item["fields"]
+            items[item["model"]].append(item["fields"])
+
+        # Load format groups.
+        for fields in items["fpr.formatgroup"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.formatgroup":
-                group = FormatGroup()
-                self.groups[id] = group
-                group.id = id
-                group.slug = fields["slug"]
-                group.description = fields["description"]
+            group = FormatGroup()
+            self.groups[id] = group
+            group.id = id
+            group.slug = fields["slug"]
+            group.description = fields["description"]
 
         # Load formats.
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.format"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.format":
-                format = Format()
-                self.formats[id] = format
-                format.id = id
-                format.slug = fields["slug"]
-                format.description = fields["description"]
-                format.group = self.groups[uuid.UUID(fields["group"])]
+            format = Format()
+            self.formats[id] = format
+            format.id = id
+            format.slug = fields["slug"]
+            format.description = fields["description"]
+            format.group = self.groups[uuid.UUID(fields["group"])]
 
         # Load format versions.
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.formatversion"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.formatversion":
-                version = FormatVersion()
-                self.versions[id] = version
-                version.id = id
-                version.replaces = (
-                    uuid.UUID(fields["replaces"]) if fields["replaces"] else None
-                )
-                version.last_modified = convert_django_date_to_datetime(
-                    fields["lastmodified"]
-                )
-                version.enabled = fields["enabled"]
-                version.access_format = fields["access_format"]
-                version.preservation_format = fields["preservation_format"]
-                version.version = fields["version"]
-                version.slug = fields["slug"]
-                version.pronom_id = fields["pronom_id"]
-                version.description = fields["description"]
-                version.format = self.formats[uuid.UUID(fields["format"])]
+            version = FormatVersion()
+            self.versions[id] = version
+            version.id = id
+            version.replaces = (
+                uuid.UUID(fields["replaces"]) if fields["replaces"] else None
+            )
+            version.last_modified = convert_django_date_to_datetime(
+                fields["lastmodified"]
+            )
+            version.enabled = fields["enabled"]
+            version.access_format = fields["access_format"]
+            version.preservation_format = fields["preservation_format"]
+            version.version = fields["version"]
+            version.slug = fields["slug"]
+            version.pronom_id = fields["pronom_id"]
+            version.description = fields["description"]
+            version.format = self.formats[uuid.UUID(fields["format"])]
         self.replaced_versions = get_replaced_objects(self.versions)
 
         # Load tools.
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.fptool"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.fptool":
-                tool = Tool()
-                self.tools[id] = tool
-                tool.id = id
-                tool.slug = fields["slug"]
-                tool.description = fields["description"]
-                tool.version = fields["version"]
+            tool = Tool()
+            self.tools[id] = tool
+            tool.id = id
+            tool.slug = fields["slug"]
+            tool.description = fields["description"]
+            tool.version = fields["version"]
+            tool.enabled = fields["enabled"]
 
         # Load commands.
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.fpcommand"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.fpcommand":
-                command = Command()
-                self.commands[id] = command
-                command.id = id
-                command.replaces = (
-                    uuid.UUID(fields["replaces"]) if fields["replaces"] else None
-                )
-                command.enabled = fields["enabled"]
-                command.last_modified = convert_django_date_to_datetime(
-                    fields["lastmodified"]
-                )
-                command.output_location = fields["output_location"]
-                command.command = fields["command"]
-                command.command_usage = CommandUsage(fields["command_usage"].casefold())
-                command.script_type = CommandScriptType(fields["script_type"])
-                command.description = fields["description"]
-                command.tool = self.tools[uuid.UUID(fields["tool"])]
-                if fields["output_format"]:
-                    format_version_id = uuid.UUID(fields["output_format"])
-                    command.output_format = self.versions.get(format_version_id)
+            command = Command()
+            self.commands[id] = command
+            command.id = id
+            command.replaces = (
+                uuid.UUID(fields["replaces"]) if fields["replaces"] else None
+            )
+            command.enabled = fields["enabled"]
+            command.last_modified = convert_django_date_to_datetime(
+                fields["lastmodified"]
+            )
+            command.output_location = fields["output_location"]
+            command.command = fields["command"]
+            command.command_usage = CommandUsage(fields["command_usage"].casefold())
+            command.script_type = CommandScriptType(fields["script_type"])
+            command.description = fields["description"]
+            command.tool = self.tools[uuid.UUID(fields["tool"])]
+            command.output_format = None
+            if fields["output_format"]:
+                format_version_id = uuid.UUID(fields["output_format"])
+                command.output_format = self.versions.get(format_version_id)
         self.replaced_commands = get_replaced_objects(self.commands)
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.fpcommand"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.fpcommand":
-                command = self.commands[id]
-                command.verification_command = self.commands.get(
-                    fields["verification_command"]
-                )
-                command.event_detail_command = self.commands.get(
-                    fields["event_detail_command"]
-                )
+            command = self.commands[id]
+            command.verification_command = self.commands.get(
+                fields["verification_command"]
+            )
+            command.event_detail_command = self.commands.get(
+                fields["event_detail_command"]
+            )
 
         # Load rules.
-        for item in data:
-            model, fields = item["model"], item["fields"]
+        for fields in items["fpr.fprule"]:
             id = uuid.UUID(fields["uuid"])
-            if model == "fpr.fprule":
-                rule = Rule()
-                rule.id = id
-                rule.last_modified = convert_django_date_to_datetime(
-                    fields["lastmodified"]
+            rule = Rule()
+            rule.id = id
+            rule.last_modified = convert_django_date_to_datetime(fields["lastmodified"])
+            rule.replaces = (
+                uuid.UUID(fields["replaces"]) if fields["replaces"] else None
+            )
+            rule.enabled = fields["enabled"]
+            rule.purpose = RulePurpose(fields["purpose"])
+            try:
+                rule.format = self.versions[uuid.UUID(fields["format"])]
+                rule.command = self.commands[uuid.UUID(fields["command"])]
+            except KeyError:
+                pass
+            else:
+                self.rules[id] = rule
+        self.replaced_rules = get_replaced_objects(self.rules)
+
+    def snapshot(self) -> dict[str, list[tuple]]:
+        """Return the objects as tuples of strings, numbers and bytes.
+
+        UUIDs are kept as bytes, dates as tuples of integers and references
+        to other objects as the UUID of the object, i.e. what `marshal` can
+        serialize.
+        """
+        return {
+            "groups": [
+                (group.id.bytes, group.slug, group.description)
+                for group in self.groups.values()
+            ],
+            "formats": [
+                (
+                    format.id.bytes,
+                    format.group.id.bytes,
+                    format.slug,
+                    format.description,
+                )
+                for format in self.formats.values()
+            ],
+            "versions": [
+                (
+                    version.id.bytes,
+                    _uuid_to_bytes(version.replaces),
+                    version.format.id.bytes,
+                    _datetime_to_tuple(version.last_modified),
+                    version.enabled,
+                    version.access_format,
+                    version.preservation_format,
+                    version.version,
+                    version.slug,
+                    version.pronom_id,
+                    version.description,
+                )
+                for version in self.versions.values()
+            ],
+            "tools": [
+                (tool.id.bytes, tool.slug, tool.version, tool.enabled, tool.description)
+                for tool in self.tools.values()
+            ],
+            "commands": [
+                (
+                    command.id.bytes,
+                    _uuid_to_bytes(command.replaces),
+                    _datetime_to_tuple(command.last_modified),
+                    command.enabled,
+                    command.output_location,
+                    command.command_usage.value,
+                    command.command,
+                    command.script_type.value,
+                    command.description,
+                    command.tool.id.bytes,
+                    _object_id(command.output_format),
+                    _object_id(command.verification_command),
+                    _object_id(command.event_detail_command),
                 )
-                rule.replaces = (
-                    uuid.UUID(fields["replaces"]) if fields["replaces"] else None
+                for command in self.commands.values()
+            ],
+            "rules": [
+                (
+                    rule.id.bytes,
+                    _uuid_to_bytes(rule.replaces),
+                    rule.purpose.value,
+                    rule.command.id.bytes,
+                    rule.format.id.bytes,
+                    _datetime_to_tuple(rule.last_modified),
+                    rule.enabled,
                 )
-                rule.enabled = fields["enabled"]
-                rule.purpose = RulePurpose(fields["purpose"])
-                try:
-                    rule.format = self.versions[uuid.UUID(fields["format"])]
-                    rule.command = self.commands[uuid.UUID(fields["command"])]
-                except KeyError:
-                    pass
-                else:
-                    self.rules[id] = rule
+                for rule in self.rules.values()
+            ],
+        }
+
+    def _load_snapshot(self, snapshot: dict[str, list[tuple]]):
+        self.groups = {}
+        for id, slug, description in snapshot["groups"]:
+            group = FormatGroup()
+            group.id = uuid.UUID(bytes=id)
+            group.slug = slug
+            group.description = description
+            self.groups[group.id] = group
+
+        self.formats = {}
+        for id, group_id, slug, description in snapshot["formats"]:
+            format = Format()
+            format.id = uuid.UUID(bytes=id)
+            format.group = self.groups[uuid.UUID(bytes=group_id)]
+            format.slug = slug
+            format.description = description
+            self.formats[format.id] = format
+
+        self.versions = {}
+        for (
+            id,
+            replaces,
+            format_id,
+            last_modified,
+            enabled,
+            access_format,
+            preservation_format,
+            version_string,
+            slug,
+            pronom_id,
+            description,
+        ) in snapshot["versions"]:
+            version = FormatVersion()
+            version.id = uuid.UUID(bytes=id)
+            version.replaces = _uuid_from_bytes(replaces)
+            version.format = self.formats[uuid.UUID(bytes=format_id)]
+            version.last_modified = datetime(*last_modified)
+            version.enabled = enabled
+            version.access_format = access_format
+            version.preservation_format = preservation_format
+            version.version = version_string
+            version.slug = slug
+            version.pronom_id = pronom_id
+            version.description = description
+            self.versions[version.id] = version
+        self.replaced_versions = get_replaced_objects(self.versions)
+
+        self.tools = {}
+        for id, slug, version, enabled, description in snapshot["tools"]:
+            tool = Tool()
+            tool.id = uuid.UUID(bytes=id)
+            tool.slug = slug
+            tool.version = version
+            tool.enabled = enabled
+            tool.description = description
+            self.tools[tool.id] = tool
+
+        self.commands = {}
+        references = []
+        for (
+            id,
+            replaces,
+            last_modified,
+            enabled,
+            output_location,
+            command_usage,
+            command_string,
+            script_type,
+            description,
+            tool_id,
+            output_format_id,
+            verification_command_id,
+            event_detail_command_id,
+        ) in snapshot["commands"]:
+            command = Command()
+            command.id = uuid.UUID(bytes=id)
+            command.replaces = _uuid_from_bytes(replaces)
+            command.last_modified = datetime(*last_modified)
+            command.enabled = enabled
+            command.output_location = output_location
+            command.command_usage = CommandUsage(command_usage)
+            command.command = command_string
+            command.script_type = CommandScriptType(script_type)
+            command.description = description
+            command.tool = self.tools[uuid.UUID(bytes=tool_id)]
+            command.output_format = (
+                self.versions[uuid.UUID(bytes=output_format_id)]
+                if output_format_id
+                else None
+            )
+            self.commands[command.id] = command
+            references.append(
+                (command, verification_command_id, event_detail_command_id)
+            )
+        self.replaced_commands = get_replaced_objects(self.commands)
+        for command, verification_command_id, event_detail_command_id in references:
+            command.verification_command = (
+                self.commands[uuid.UUID(bytes=verification_command_id)]
+                if verification_command_id
+                else None
+            )
+            command.event_detail_command = (
+                self.commands[uuid.UUID(bytes=event_detail_command_id)]
+                if event_detail_command_id
+                else None
+            )
+
+        self.rules = {}
+        for (
+            id,
+            replaces,
+            purpose,
+            command_id,
+            format_id,
+            last_modified,
+            enabled,
+        ) in snapshot["rules"]:
+            rule = Rule()
+            rule.id = uuid.UUID(bytes=id)
+            rule.replaces = _uuid_from_bytes(replaces)
+            rule.purpose = RulePurpose(purpose)
+            rule.command = self.commands[uuid.UUID(bytes=command_id)]
+            rule.format = self.versions[uuid.UUID(bytes=format_id)]
+            rule.last_modified = datetime(*last_modified)
+            rule.enabled = enabled
+            self.rules[rule.id] = rule
         self.replaced_rules = get_replaced_objects(self.rules)
 
+    def _index(self):
+        self.versions_by_puid = {}
+        for version in self.versions.values():
+            if version.enabled and version.id not in self.replaced_versions:
+                # The first version found wins, as in a sequential search.
+                self.versions_by_puid.setdefault(version.pronom_id, version)
+
+        self.rules_by_version_and_purpose = {}
+        for rule in self.rules.values():
+            if rule.enabled and rule.id not in self.replaced_rules:
+                key = (rule.format.id, rule.purpose)
+                self.rules_by_version_and_purpose.setdefault(key, []).append(rule)
+
     def get_format_version_by_id(self, id: uuid.UUID) -> FormatVersion | None:
         version = self.versions.get(id)
         if (
@@ -440,14 +715,7 @@ class JSONBackend(Backend):
         return version
 
     def get_format_version_by_puid(self, puid: str) -> FormatVersion | None:
-        for version in self.versions.values():
-            if (
-                version.pronom_id == puid
-                and version.enabled
-                and version.id not in self.replaced_versions
-            ):
-                return version
-        return None
+        return self.versions_by_puid.get(puid)
 
     def get_rule_by_id(self, id: uuid.UUID) -> Rule | None:
         return self.rules.get(id)
@@ -455,16 +723,12 @@ class JSONBackend(Backend):
     def get_rules(
         self, format_version_id: uuid.UUID, purpose: RulePurpose
     ) -> list[Rule]:
-        rules: list[Rule] = []
-        format_version = self.versions.get(format_version_id)
-        if not format_version:
+        if format_version_id not in self.versions:
             raise ValueError(f"Format version f{format_version_id} not found.")
-        for rule in self.rules.values():
-            if rule.format.id == format_version_id:
-                if rule.purpose == purpose:
-                    if rule.enabled and rule.id not in self.replaced_rules:
-                        rules.append(rule)
-        return rules
+        # Copied so callers cannot alter the index.
+        return list(
+            self.rules_by_version_and_purpose.get((format_version_id, purpose), ())
+        )
 
 
 def convert_django_date_to_datetime(date: str) -> datetime:
@@ -484,18 +748,147 @@ def convert_to_uuid(id: uuid.UUID | str) -> uuid.UUID:
     return id
 
 
+def _uuid_to_bytes(id: uuid.UUID | None) -> bytes | None:
+    return id.bytes if id is not None else None
+
+
+def _uuid_from_bytes(value: bytes | None) -> uuid.UUID | None:
+    return uuid.UUID(bytes=value) if value is not None else None
+
+
+def _object_id(obj: FormatVersion | Command | None) -> bytes | None:
+    return obj.id.bytes if obj is not None else None
+
+
+def _datetime_to_tuple(value: datetime) -> tuple[int, ...]:
+    return (
+        value.year,
+        value.month,
+        value.day,
+        value.hour,
+        value.minute,
+        value.second,
+        value.microsecond,
+    )
+
+
+# Bump when the data returned by `JSONBackend.snapshot` changes.
+SNAPSHOT_VERSION = 3
+
+
+def _snapshot_directory(snapshot_dir: str) -> str | None:
+    """Return the directory of the snapshots, created private to a3m.
+
+    Snapshots are not used from a directory other users can write to.
+    Returns None in that case.
+    """
+    path = os.path.join(snapshot_dir, "fpr")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        logger.warning("Not using FPR snapshots in %s, it is not private", path)
+        return None
+    return path
+
+
+def _read_snapshot(path: str, digest: str) -> JSONBackend | None:
+    """Load a snapshot after checking the hash of its contents."""
+    with open(path, "rb") as f:
+        content = f.read()
+    snapshot_digest, payload = content[:32], content[32:]
+    if snapshot_digest != hashlib.sha256(payload).digest():
+        return None
+    # Only plain values are loaded, no code runs. Snapshots are written by a3m
+    # into its own private directory and checked against the hash anyway.
+    blob_digest, snapshot = marshal.loads(payload)  # noqa: S302
+    if blob_digest != digest:
+        return None
+    return JSONBackend.from_snapshot(snapshot)
+
+
+def _write_snapshot(path: str, digest: str, backend: JSONBackend) -> None:
+    """Write a snapshot, prefixed with the hash of its contents."""
+    payload = marshal.dumps((digest, backend.snapshot()))
+    # Write to a temporary file first, other processes may be loading it.
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), prefix=".fpr-", delete=False
+    ) as f:
+        f.write(hashlib.sha256(payload).digest())
+        f.write(payload)
+    os.replace(f.name, path)
+
+
+def load_backend(blob: bytes, snapshot_dir: str | None = None) -> JSONBackend:
+    """Load a `JSONBackend`, from a compiled snapshot when available.
+
+    Parsing the JSON dump is slow, so the objects of the loaded backend are
+    written with `marshal` into a private ``fpr`` directory of
+    ``snapshot_dir`` the first time, see `JSONBackend.snapshot`. Snapshots
+    are named after a hash of ``blob``, a snapshot is only used if its hash
+    matches and its contents match the hash they are prefixed with.
+    """
+    if not snapshot_dir:
+        return JSONBackend(blob)
+
+    try:
+        snapshot_dir = _snapshot_directory(snapshot_dir)
+    except OSError as err:
+        logger.warning("Unable to create the FPR snapshot directory: %s", err)
+        snapshot_dir = None
+    if snapshot_dir is None:
+        return JSONBackend(blob)
+
+    digest = hashlib.sha256(blob).hexdigest()
+    path = os.path.join(snapshot_dir, f"fpr-{SNAPSHOT_VERSION}-{digest}.marshal")
+
+    try:
+        backend = _read_snapshot(path, digest)
+        if backend is not None:
+            return backend
+        logger.warning("Ignoring invalid FPR snapshot %s", path)
+    except FileNotFoundError:
+        pass
+    except Exception as err:
+        logger.warning("Ignoring unreadable FPR snapshot %s: %s", path, err)
+
+    backend = JSONBackend(blob)
+
+    try:
+        _write_snapshot(path, digest, backend)
+    except OSError as err:
+        logger.warning("Unable to write FPR snapshot %s: %s", path, err)
+
+    return backend
+
+
+@functools.cache
+def get_default_backend() -> JSONBackend:
+    """Return the backend of the FPR data shipped with a3m."""
+    blob = files("a3m.fpr.migrations").joinpath("initial-data.json").read_bytes()
+    return load_backend(blob, getattr(settings, "TEMP_DIRECTORY", None))
+
+
 class Registry:
     """FPR registry with pluggable data sources (backends).
 
     It omits objects not in service (disabled or replaced).
 
     It does not import Django models to avoid circular dependency issues.
+
+    The default backend is loaded on first use, see `get_default_backend`.
     """
 
-    backend: Backend
+    # Files looked up per query by `get_rules_for_files`.
+    QUERY_CHUNK_SIZE = 500
 
     def __init__(self, backend: Backend | None = None):
-        self.backend = backend or default_backend
+        self._backend = backend
+
+    @property
+    def backend(self) -> Backend:
+        if self._backend is None:
+            self._backend = get_default_backend()
+        return self._backend
 
     def _file_model(self) -> File:
         return apps.get_model("main.File")  # type: ignore
@@ -553,20 +946,51 @@ class Registry:
         for format_version_id in file_obj.fileformatversion_set.values_list(
             "format_version_id", flat=True
         ):
-            rules = self.get_rules(format_version_id, purpose)
-            if len(rules):
-                result.extend(rules)
-            elif fallback:
-                if (fallback_purpose := purpose.get_fallback()) is not None:
-                    result.extend(
-                        self.get_rules(format_version_id, purpose=fallback_purpose)
-                    )
+            result.extend(
+                self._get_rules_with_fallback(format_version_id, purpose, fallback)
+            )
         return result
 
+    def get_rules_for_files(
+        self,
+        file_ids: Iterable[uuid.UUID | str],
+        purpose: RulePurpose | str,
+        fallback=False,
+    ) -> dict[str, list[Rule]]:
+        """Return the rules for a batch of files, keyed by file identifier.
+
+        It is equivalent to calling `get_file_rules` for each file, but the
+        format versions of all the files are loaded with a single query.
+        Files not found are left out.
+        """
+        if isinstance(purpose, str):
+            purpose = RulePurpose(purpose)
+        file_ids = [str(file_id) for file_id in file_ids]
+        result: dict[str, list[Rule]] = {}
+        # Chunked to stay within the limits of query parameters in SQLite.
+        for start in range(0, len(file_ids), self.QUERY_CHUNK_SIZE):
+            for file_id, format_version_id in (
+                self._file_model()
+                .objects.filter(pk__in=file_ids[start : start + self.QUERY_CHUNK_SIZE])
+                .values_list("uuid", "fileformatversion__format_version_id")
+            ):
+                rules = result.setdefault(file_id, [])
+                if format_version_id is not None:
+                    rules.extend(
+                        self._get_rules_with_fallback(
+                            format_version_id, purpose, fallback
+                        )
+                    )
+        return result
 
-default_backend = JSONBackend(
-    files("a3m.fpr.migrations").joinpath("initial-data.json").read_bytes()
-)
+    def _get_rules_with_fallback(
+        self, format_version_id: uuid.UUID, purpose: RulePurpose, fallback: bool
+    ) -> list[Rule]:
+        rules = self.get_rules(format_version_id, purpose)
+        if not rules and fallback:
+            if (fallback_purpose := purpose.get_fallback()) is not None:
+                rules = self.get_rules(format_version_id, purpose=fallback_purpose)
+        return rules
 
 
-FPR = Registry(default_backend)
+FPR = Registry()
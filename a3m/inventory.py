@@ -0,0 +1,431 @@
+"""
+Inventory of the files and directories of a package.
+
+Microservices used to walk the package tree again and again, which is slow
+when the shared directory is on a network file system. `get_inventory` scans
+the tree once with ``os.scandir`` and keeps the result, i.e. the size,
+modification time and inode of every file, in ``TEMP_DIRECTORY``. Consumers
+read from it instead of walking the disk::
+
+    inventory = get_inventory(sip_directory)
+    for dirpath, dirnames, filenames in inventory.walk(objects_directory):
+        ...
+
+Before it is used, the inventory is brought up to date incrementally: a
+directory is scanned again only when its modification time changed, which
+happens whenever entries are added to it, removed or renamed. Changes to the
+contents of existing files do not touch the directory, scripts that make them
+and rely on the recorded sizes should call `invalidate` with their paths.
+
+Checking the modification times still costs a ``stat`` per directory, so it is
+done once per batch of tasks: within `batch`, the first `get_inventory` of a
+package checks it and the others reuse it.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the persisted format changes.
+INVENTORY_VERSION = 1
+
+# Directories modified this close to the scan may have changed after they were
+# listed without their modification time changing, they are scanned again.
+RACY_INTERVAL_NS = 2 * 10**9
+
+
+class FileInfo(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class Inventory:
+    """Files and directories under ``root``, indexed by directory.
+
+    ``directories`` maps the path of every directory relative to the root
+    (``""`` for the root itself) to its modification time, its inode, the
+    names of its subdirectories and a `FileInfo` for each of its files.
+    """
+
+    def __init__(self, root, directories=None, scanned_at_ns=0):
+        self.root = os.path.normpath(root)
+        self.directories = directories if directories is not None else {}
+        self.scanned_at_ns = scanned_at_ns
+
+    @classmethod
+    def scan(cls, root):
+        inventory = cls(root)
+        inventory.refresh()
+        return inventory
+
+    def refresh(self):
+        """Scan the directories that changed since the last scan.
+
+        Returns whether anything changed.
+        """
+        scanned_at_ns = time.time_ns()
+        if "" not in self.directories:
+            changed = self._scan_tree("")
+            self.scanned_at_ns = scanned_at_ns
+            return changed
+
+        changed = False
+        for relpath in sorted(self.directories):
+            entry = self.directories.get(relpath)
+            if entry is None:
+                continue  # Dropped with its parent.
+            try:
+                st = os.stat(self._abspath(relpath))
+            except OSError:
+                self._drop_tree(relpath)
+                changed = True
+                continue
+            if (
+                st.st_mtime_ns != entry["mtime"]
+                or st.st_ino != entry["inode"]
+                or entry["mtime"] >= self.scanned_at_ns - RACY_INTERVAL_NS
+            ):
+                changed = self._scan_tree(relpath) or changed
+        self.scanned_at_ns = scanned_at_ns
+        return changed
+
+    def invalidate(self, *paths):
+        """Record the current state of the given files or directories."""
+        for path in paths:
+            relpath = self._relpath(path)
+            if relpath is None:
+                continue
+            if relpath not in self.directories:
+                relpath = os.path.dirname(relpath)
+            self._scan_tree(relpath)
+
+    def walk(self, top=None):
+        """Generate the file names in a directory tree, like ``os.walk``.
+
+        Symbolic links to directories are listed but not followed.
+        """
+        top = self.root if top is None else top
+        relpath = self._relpath(top)
+        if relpath is None or relpath not in self.directories:
+            return
+        yield from self._walk(top, relpath)
+
+    def _walk(self, path, relpath):
+        entry = self.directories[relpath]
+        dirnames = list(entry["dirs"])
+        yield path, dirnames, list(entry["files"])
+        for name in dirnames:
+            child = os.path.join(relpath, name)
+            if child in self.directories:
+                yield from self._walk(os.path.join(path, name), child)
+
+    def files(self, top=None):
+        """Generate the paths of the files in a directory tree."""
+        for dirpath, _, filenames in self.walk(top):
+            for filename in filenames:
+                yield os.path.join(dirpath, filename)
+
+    def stat(self, path):
+        """Return the `FileInfo` of a file, or None if there is no such file."""
+        relpath = self._relpath(path)
+        if not relpath:
+            return None
+        entry = self.directories.get(os.path.dirname(relpath))
+        if entry is None:
+            return None
+        return entry["files"].get(os.path.basename(relpath))
+
+    def __contains__(self, path):
+        relpath = self._relpath(path)
+        if relpath is None:
+            return False
+        if relpath in self.directories:
+            return True
+        entry = self.directories.get(os.path.dirname(relpath))
+        if entry is None:
+            return False
+        name = os.path.basename(relpath)
+        return name in entry["files"] or name in entry["dirs"]
+
+    def exists(self, path):
+        """Like ``os.path.exists``, the disk is checked outside of the root."""
+        if self._relpath(path) is None:
+            return os.path.exists(path)
+        return path in self
+
+    def _relpath(self, path):
+        """Path relative to the root, None if it is not under the root."""
+        path = os.path.normpath(path)
+        if path == self.root:
+            return ""
+        if not path.startswith(os.path.join(self.root, "")):
+            return None
+        return path[len(self.root) + 1 :]
+
+    def _abspath(self, relpath):
+        return os.path.join(self.root, relpath) if relpath else self.root
+
+    def _scan_tree(self, relpath):
+        """Scan a directory and the subdirectories not scanned yet."""
+        changed = False
+        pending = [relpath]
+        while pending:
+            directory_changed, new_subdirs = self._scan_directory(pending.pop())
+            changed = changed or directory_changed
+            pending.extend(new_subdirs)
+        return changed
+
+    def _scan_directory(self, relpath):
+        """List a directory and drop the subdirectories that are gone.
+
+        Returns whether the directory changed and the subdirectories that are
+        not in the inventory yet, symbolic links aside.
+        """
+        try:
+            st = os.stat(self._abspath(relpath))
+            with os.scandir(self._abspath(relpath)) as it:
+                dir_entries = list(it)
+        except OSError:
+            previous = self.directories.get(relpath)
+            self._drop_tree(relpath)
+            return previous is not None, []
+
+        dirs, files, new_subdirs = [], {}, []
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir():
+                dirs.append(dir_entry.name)
+                child = os.path.join(relpath, dir_entry.name)
+                if child not in self.directories and not dir_entry.is_symlink():
+                    new_subdirs.append(child)
+                continue
+            try:
+                file_st = dir_entry.stat()
+            except OSError:
+                # E.g. broken symbolic links, listed as files by ``os.walk``.
+                file_st = dir_entry.stat(follow_symlinks=False)
+            files[dir_entry.name] = FileInfo(
+                file_st.st_size, file_st.st_mtime_ns, file_st.st_ino
+            )
+
+        previous = self.directories.get(relpath)
+        self.directories[relpath] = {
+            "mtime": st.st_mtime_ns,
+            "inode": st.st_ino,
+            "dirs": dirs,
+            "files": files,
+        }
+        if previous is None:
+            return True, new_subdirs
+        for name in set(previous["dirs"]) - set(dirs):
+            self._drop_tree(os.path.join(relpath, name))
+        return (previous["dirs"], previous["files"]) != (dirs, files), new_subdirs
+
+    def _drop_tree(self, relpath):
+        prefix = os.path.join(relpath, "")
+        for key in [key for key in self.directories if key.startswith(prefix)]:
+            del self.directories[key]
+        self.directories.pop(relpath, None)
+
+    def to_json(self):
+        return {
+            "version": INVENTORY_VERSION,
+            "root": self.root,
+            "scanned_at_ns": self.scanned_at_ns,
+            "directories": self.directories,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get("version") != INVENTORY_VERSION:
+            raise ValueError("Unsupported inventory version")
+        directories = data["directories"]
+        for entry in directories.values():
+            entry["files"] = {
+                name: FileInfo(*info) for name, info in entry["files"].items()
+            }
+        return cls(data["root"], directories, data["scanned_at_ns"])
+
+
+@dataclass
+class PackageSize:
+    """Size of the contents of a package."""
+
+    bytes: int = 0
+    files: int = 0
+
+
+def measure_path(path):
+    """Return the `PackageSize` of a file or directory tree."""
+    size = PackageSize()
+    if os.path.isfile(path):
+        size.bytes, size.files = os.path.getsize(path), 1
+        return size
+
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    size.bytes += entry.stat(follow_symlinks=False).st_size
+                    size.files += 1
+
+    return size
+
+
+def _inventories_directory():
+    return os.path.join(settings.TEMP_DIRECTORY, "inventories")
+
+
+def _inventory_path(root):
+    digest = hashlib.sha256(os.path.realpath(root).encode("utf-8")).hexdigest()
+    return os.path.join(_inventories_directory(), f"{digest}.json")
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """Serialize the updates of an inventory across processes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_path = f"{path}.lock"
+    while True:
+        with open(lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # The lock file may have been removed with the inventory while
+                # we were waiting, then the lock is taken on the new one.
+                try:
+                    locked = os.fstat(lock.fileno()).st_ino == os.stat(lock_path).st_ino
+                except FileNotFoundError:
+                    locked = False
+                if locked:
+                    yield
+                    return
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _remove(path):
+    """Remove an inventory and its lock file, the lock must be held."""
+    for name in (path, f"{path}.lock"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(name)
+
+
+def _load(path, root):
+    try:
+        with open(path) as f:
+            inventory = Inventory.from_json(json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        logger.warning("Ignoring inventory %s: %s", path, err)
+        return None
+    if inventory.root != os.path.normpath(root):
+        return None
+    return inventory
+
+
+def _save(path, inventory):
+    # Never leave a partially written inventory behind.
+    with tempfile.NamedTemporaryFile(
+        "w", dir=os.path.dirname(path), prefix=".inventory-", delete=False
+    ) as f:
+        json.dump(inventory.to_json(), f)
+    os.replace(f.name, path)
+
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def batch():
+    """Check each inventory for changes once for the duration of the block.
+
+    The jobs of a batch run the same client script one after the other and
+    often ask for the inventory of the same package. Changes made to the tree
+    within the block must be recorded with `invalidate`.
+    """
+    _local.inventories = {}
+    try:
+        yield
+    finally:
+        del _local.inventories
+
+
+def get_inventory(root):
+    """Return the up-to-date `Inventory` of a package directory."""
+    inventories = getattr(_local, "inventories", None)
+    if inventories is not None and os.path.normpath(root) in inventories:
+        return inventories[os.path.normpath(root)]
+
+    path = _inventory_path(root)
+    with _locked(path):
+        inventory = _load(path, root)
+        if inventory is None:
+            inventory = Inventory.scan(root)
+            changed = True
+        else:
+            changed = inventory.refresh()
+        if changed:
+            _save(path, inventory)
+    if inventories is not None:
+        inventories[inventory.root] = inventory
+    return inventory
+
+
+def invalidate(root, *paths):
+    """Record changes made to files or directories of a package directory.
+
+    Only needed for changes that leave the directories untouched, e.g. files
+    rewritten in place. Without paths, the inventory is removed.
+    """
+    inventories = getattr(_local, "inventories", {})
+    path = _inventory_path(root)
+    with _locked(path):
+        inventory = None
+        if paths:
+            inventory = inventories.get(os.path.normpath(root)) or _load(path, root)
+        if inventory is None:
+            inventories.pop(os.path.normpath(root), None)
+            _remove(path)
+            return
+        inventory.invalidate(*paths)
+        _save(path, inventory)
+
+
+def remove_stale():
+    """Remove the inventories of directories that no longer exist.
+
+    Inventories are keyed by path, the inventory of a package is left behind
+    whenever the package is moved.
+    """
+    try:
+        names = os.listdir(_inventories_directory())
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(_inventories_directory(), name)
+        with _locked(path):
+            try:
+                with open(path) as f:
+                    root = json.load(f)["root"]
+            except (OSError, ValueError, KeyError, TypeError):
+                root = None
+            if root is None or not os.path.isdir(root):
+                _remove(path)
@@ -0,0 +1,114 @@
+"""
+SQLite database backend tuned for concurrent packages.
+
+It extends Django's backend so that several packages can be processed at once
+without fighting over the database:
+
+* Connections are set up with write-ahead logging, which lets readers run
+  while a transaction is being written, and with the ``synchronous``, memory
+  map and page cache sizes given in ``OPTIONS``, see the ``sqlite_*``
+  settings.
+
+* Transactions are started with ``BEGIN IMMEDIATE``. With the default
+  deferred transactions, a transaction that reads before it writes fails
+  with "database is locked" when another connection wrote in between, without
+  waiting for the busy timeout. Immediate transactions take the write lock
+  upfront and wait for it instead.
+
+* Write transactions of this process are serialized by a lock, the single
+  writer: threads queue for it instead of polling the database file until the
+  busy timeout expires. A transaction is not started without the lock, it
+  fails with "database is locked" like SQLite would. Connections of other
+  processes still rely on the busy timeout (the ``timeout`` option).
+
+Client scripts keep a transaction open for a whole batch of tasks, so packages
+are still processed one at a time by default, see ``concurrent_packages``.
+
+* Databases of the ``memdb`` VFS of SQLite, e.g. ``file:/a3m?vfs=memdb``, are
+  kept in memory and shared by the connections of the process, unlike
+  ``:memory:`` databases, and with the same locking as files, unlike shared
+  cache ones. They do not support write-ahead logging. The backend keeps a
+  connection to them open so that they outlive the connections that Django
+  closes.
+"""
+
+import threading
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+# Options of the pragmas set on every new connection.
+PRAGMA_OPTIONS = ("synchronous", "mmap_size", "cache_size")
+
+# Held by the connection writing a transaction, see `DatabaseWrapper`.
+write_lock = threading.Lock()
+
+# Connections keeping in-memory databases alive, by name.
+memory_databases = {}
+memory_databases_lock = threading.Lock()
+
+
+def is_memdb(name):
+    return "vfs=memdb" in str(name)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.holds_write_lock = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not arguments of ``sqlite3.connect``.
+        self.pragmas = {
+            name: params.pop(name) for name in PRAGMA_OPTIONS if name in params
+        }
+        return params
+
+    def get_new_connection(self, conn_params):
+        name = conn_params["database"]
+        if is_memdb(name):
+            with memory_databases_lock:
+                if name not in memory_databases:
+                    memory_databases[name] = base.Database.connect(**conn_params)
+        conn = super().get_new_connection(conn_params)
+        conn.execute("PRAGMA journal_mode = WAL")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # Wait as long as SQLite would, then let SQLite wait again: a thread
+        # holding the lock while it waits on another one must not hang.
+        timeout = self.settings_dict["OPTIONS"].get("timeout", 5)
+        if not write_lock.acquire(timeout=timeout):
+            raise OperationalError("database is locked")
+        self.holds_write_lock = True
+        try:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._release_write_lock()
+            raise
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_lock()
+
+    def _release_write_lock(self):
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            write_lock.release()
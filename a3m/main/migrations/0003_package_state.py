@@ -0,0 +1,53 @@
+# Generated by Django 4.2.6 on 2026-10-18 10:15
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0002_initial_data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageState",
+            fields=[
+                (
+                    "sip",
+                    models.OneToOneField(
+                        db_column="sipUUID",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="main.sip",
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("url", models.TextField()),
+                ("submitter", models.TextField(blank=True)),
+                ("config", models.BinaryField()),
+                ("stage", models.CharField(max_length=16)),
+                (
+                    "link_id",
+                    models.UUIDField(db_column="linkID", default=None, null=True),
+                ),
+                (
+                    "createdtime",
+                    models.DateTimeField(auto_now_add=True, db_column="createdTime"),
+                ),
+                (
+                    "transfer",
+                    models.ForeignKey(
+                        db_column="transferUUID",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="main.transfer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "PackageStates",
+            },
+        ),
+    ]
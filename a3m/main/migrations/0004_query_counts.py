@@ -0,0 +1,33 @@
+# Generated by Django 4.2.6 on 2026-10-18 13:45
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0003_package_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="querycount",
+            field=models.IntegerField(db_column="queryCount", default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="querytime",
+            field=models.FloatField(db_column="queryTime", default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="querycount",
+            field=models.IntegerField(db_column="queryCount", default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="querytime",
+            field=models.FloatField(db_column="queryTime", default=None, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-18 15:30
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0004_query_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packagestate",
+            name="size",
+            field=models.BigIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="packagestate",
+            name="file_count",
+            field=models.IntegerField(db_column="fileCount", default=None, null=True),
+        ),
+    ]
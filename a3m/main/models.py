@@ -17,6 +17,7 @@
 # This Django model module was auto-generated and then updated manually
 # Needs some cleanups, make sure each model has its primary_key=True
 # Feel free to rename the models, but don't rename db_table values or field names.
+import json
 import logging
 import re
 import uuid
@@ -595,6 +596,10 @@ class Job(models.Model):
     microservicechainlink = models.UUIDField(
         null=True, blank=True, db_column="MicroServiceChainLinksPK", default=uuid.uuid4
     )
+    # Database statements made by the server to run the job, and their time
+    # in seconds. Those of the tasks are recorded in the tasks.
+    querycount = models.IntegerField(db_column="queryCount", null=True, default=None)
+    querytime = models.FloatField(db_column="queryTime", null=True, default=None)
 
     objects = JobQuerySet.as_manager()
 
@@ -659,11 +664,45 @@ class Task(models.Model):
     stdout = models.TextField(db_column="stdOut", blank=True)
     stderror = models.TextField(db_column="stdError", blank=True)
     exitcode = models.BigIntegerField(db_column="exitCode", null=True, blank=True)
+    # Database statements made by the client script for the task, and their
+    # time in seconds, see `a3m.client.mcp.charge_batch_queries`.
+    querycount = models.IntegerField(db_column="queryCount", null=True, default=None)
+    querytime = models.FloatField(db_column="queryTime", null=True, default=None)
 
     class Meta:
         db_table = "Tasks"
 
 
+class PackageState(models.Model):
+    """Workflow state of a package being processed.
+
+    It is kept until the package reaches the end of its workflow, so packages
+    interrupted by a shutdown can be resumed when the server starts again.
+    """
+
+    sip = models.OneToOneField(
+        "SIP", primary_key=True, db_column="sipUUID", on_delete=models.CASCADE
+    )
+    transfer = models.ForeignKey(
+        "Transfer", db_column="transferUUID", on_delete=models.CASCADE
+    )
+    name = models.TextField()
+    url = models.TextField()
+    submitter = models.TextField(blank=True)
+    # Serialized ProcessingConfig message.
+    config = models.BinaryField()
+    stage = models.CharField(max_length=16)
+    # Link of the latest job created for the package.
+    link_id = models.UUIDField(db_column="linkID", null=True, default=None)
+    # Size of the transfer, recorded once it is downloaded.
+    size = models.BigIntegerField(null=True, default=None)
+    file_count = models.IntegerField(db_column="fileCount", null=True, default=None)
+    createdtime = models.DateTimeField(db_column="createdTime", auto_now_add=True)
+
+    class Meta:
+        db_table = "PackageStates"
+
+
 class AgentManager(models.Manager):
     # These are set in the 0002_initial_data.py migration of the dashboard
     DEFAULT_SYSTEM_AGENT_PK = 1
@@ -1227,6 +1266,9 @@ class RightsStatementLinkingAgentIdentifier(models.Model):
 
 
 class UnitVariableManager(models.Manager):
+    # Variable holding the replacement variables of a unit, as JSON.
+    PACKAGE_CONTEXT = "packageContext"
+
     def update_variable(self, unit_type, unit_uuid, variable, value, link_id=None):
         """Persist unit variable."""
         defaults = {"variablevalue": value, "microservicechainlink": link_id}
@@ -1234,6 +1276,16 @@ class UnitVariableManager(models.Manager):
             unittype=unit_type, unituuid=unit_uuid, variable=variable, defaults=defaults
         )
 
+    def get_package_context(self, unit_uuid):
+        """Return the replacement variables recorded for a unit."""
+        value = (
+            self.get_queryset()
+            .filter(unituuid=unit_uuid, variable=self.PACKAGE_CONTEXT)
+            .values_list("variablevalue", flat=True)
+            .first()
+        )
+        return json.loads(value) if value else {}
+
 
 class UnitVariable(models.Model):
     id = models.UUIDField(
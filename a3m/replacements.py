@@ -0,0 +1,48 @@
+"""
+Replacement of ``%variables%`` in the commands of the workflow.
+
+The arguments of a link are the same for every task of a job, only the values
+of the variables change. `CommandTemplate` splits a string into literal text
+and variables once so that expanding it is a single join.
+"""
+
+import functools
+import re
+
+# Variables look like ``%fileUUID%`` or ``%config:aip_compression_level%``.
+VARIABLE_PATTERN = re.compile(r"(%[A-Za-z][\w:.]*%)")
+
+
+class CommandTemplate:
+    """A string with variables, split into literal text and variables.
+
+    >>> template = CommandTemplate('"%fileUUID%" "%SIPUUID%"')
+    >>> template.expand({"%fileUUID%": "1"}, {"%fileUUID%": "2", "%SIPUUID%": "3"})
+    '"1" "3"'
+
+    Values are looked up in the mappings given, in order. Variables without
+    a value are left as they are. Values are not scanned for variables again.
+    """
+
+    __slots__ = ("segments", "variables")
+
+    def __init__(self, template):
+        self.segments = VARIABLE_PATTERN.split(template)
+        # Segments alternate between literal text and variables.
+        self.variables = frozenset(self.segments[1::2])
+
+    def expand(self, *mappings):
+        segments = self.segments.copy()
+        for index in range(1, len(segments), 2):
+            for mapping in mappings:
+                value = mapping.get(segments[index])
+                if value is not None:
+                    segments[index] = value
+                    break
+        return "".join(segments)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_template(template):
+    """Return the `CommandTemplate` of a string, compiled once."""
+    return CommandTemplate(template)
@@ -0,0 +1,210 @@
+"""
+Write-behind of the job and task records of the workflow engine.
+
+The engine records every job it runs, the tasks of each job and the link
+each package is processing, see `a3m.main.models.PackageState`. Instead of
+writing to the database on every hop of the job chain, records are queued
+and written by a background thread in a single transaction every
+``BOOKKEEPING_FLUSH_INTERVAL`` seconds. Status updates of the same job are
+coalesced, as are the database statements counted for it and the workflow
+states of the same package.
+
+`BookkeepingWriter.flush` writes everything queued so far and blocks until
+it is done. It is used whenever others depend on the records, e.g. before
+the tasks of a job are handed over to the client scripts, which record them
+with their results if they are not written yet, or when a package completes. Failed writes are retried, records that still cannot be
+written are queued again for the next flush.
+"""
+
+import collections
+import functools
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from a3m import tracing
+from a3m.databaseFunctions import retryOnFailure
+from a3m.main import models
+from a3m.server.db import auto_close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BookkeepingWriter:
+    # Retries of a failed write before the records are queued again.
+    WRITE_RETRIES = 3
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+
+        self.lock = threading.Lock()
+        # Held while writing so that writes are applied in order.
+        self.write_lock = threading.Lock()
+
+        self.jobs = []  # models.Job
+        self.tasks = []  # models.Task
+        self.job_statuses = {}  # jobuuid: currentstep
+        self.job_queries = {}  # jobuuid: (querycount, querytime)
+        self.package_states = {}  # sip_id: (stage, link_id), None to delete
+
+        self.shutdown_event = threading.Event()
+        self.thread = None
+        if self.flush_interval > 0:
+            self.thread = threading.Thread(
+                target=self._work, name="bookkeeping", daemon=True
+            )
+            self.thread.start()
+
+    def create_job(self, job):
+        """Queue the creation of a `models.Job`."""
+        with self.lock:
+            self.jobs.append(job)
+        self._written()
+
+    def create_tasks(self, tasks):
+        """Queue the creation of a list of `models.Task`."""
+        with self.lock:
+            self.tasks.extend(tasks)
+        self._written()
+
+    def update_job_status(self, job_uuid, status, queries=None):
+        """Queue an update of the ``currentstep`` of a job.
+
+        ``queries``, a `QueryCounter`, records the database statements made
+        to run the job too.
+        """
+        with self.lock:
+            self.job_statuses[str(job_uuid)] = status
+            if queries is not None:
+                self.job_queries[str(job_uuid)] = (queries.count, queries.duration)
+        self._written()
+
+    def update_package_state(self, sip_id, stage, link_id):
+        """Queue an update of the workflow state of a package."""
+        with self.lock:
+            self.package_states[str(sip_id)] = (stage, link_id)
+        self._written()
+
+    def delete_package_state(self, sip_id):
+        """Queue the deletion of the workflow state of a package."""
+        with self.lock:
+            self.package_states[str(sip_id)] = None
+        self._written()
+
+    def flush(self):
+        """Write the records queued so far."""
+        with self.write_lock:
+            with self.lock:
+                jobs, self.jobs = self.jobs, []
+                tasks, self.tasks = self.tasks, []
+                job_statuses, self.job_statuses = self.job_statuses, {}
+                job_queries, self.job_queries = self.job_queries, {}
+                package_states, self.package_states = self.package_states, {}
+            if not (jobs or tasks or job_statuses or package_states):
+                return
+            try:
+                with tracing.span("Flush", tracing.DB, records=len(jobs) + len(tasks)):
+                    retryOnFailure(
+                        "Write job and task records",
+                        functools.partial(
+                            self._write,
+                            jobs,
+                            tasks,
+                            job_statuses,
+                            job_queries,
+                            package_states,
+                        ),
+                        retries=self.WRITE_RETRIES,
+                    )
+            except Exception:
+                self._requeue(jobs, tasks, job_statuses, job_queries, package_states)
+                raise
+
+    def _requeue(self, jobs, tasks, job_statuses, job_queries, package_states):
+        """Queue records that could not be written before the newer ones."""
+        with self.lock:
+            self.jobs = jobs + self.jobs
+            self.tasks = tasks + self.tasks
+            # Newer updates of the same job win.
+            self.job_statuses = {**job_statuses, **self.job_statuses}
+            self.job_queries = {**job_queries, **self.job_queries}
+            self.package_states = {**package_states, **self.package_states}
+
+    def stop(self):
+        """Stop the background thread and write what is left."""
+        self.shutdown_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            # Records queued from now on are written right away.
+            self.thread = None
+        self.flush()
+
+    def _written(self):
+        if self.thread is None:
+            self.flush()
+
+    def _work(self):
+        while not self.shutdown_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unable to write job and task records")
+
+    @staticmethod
+    @auto_close_old_connections()
+    def _write(jobs, tasks, job_statuses, job_queries, package_states):
+        updates = collections.defaultdict(list)
+        for job_uuid, status in job_statuses.items():
+            updates[status].append(job_uuid)
+
+        with transaction.atomic():
+            if jobs:
+                models.Job.objects.bulk_create(jobs)
+            if tasks:
+                # The client scripts may have recorded them already.
+                models.Task.objects.bulk_create(tasks, ignore_conflicts=True)
+            for status, job_uuids in updates.items():
+                models.Job.objects.filter(jobuuid__in=job_uuids).update(
+                    currentstep=status
+                )
+            if job_queries:
+                models.Job.objects.bulk_update(
+                    [
+                        models.Job(
+                            jobuuid=job_uuid, querycount=count, querytime=duration
+                        )
+                        for job_uuid, (count, duration) in job_queries.items()
+                    ],
+                    ["querycount", "querytime"],
+                )
+            for sip_id, state in package_states.items():
+                package_state = models.PackageState.objects.filter(sip_id=sip_id)
+                if state is None:
+                    package_state.delete()
+                else:
+                    stage, link_id = state
+                    package_state.update(stage=stage, link_id=link_id)
+
+        logger.debug(
+            "Wrote %d jobs, %d tasks, %d job status and %d package state updates",
+            len(jobs),
+            len(tasks),
+            len(job_statuses),
+            len(package_states),
+        )
+
+
+# Writer is shared across all threads.
+writer_global = None
+writer_lock = threading.Lock()
+
+
+def get_bookkeeping_writer():
+    """Return the writer, see the BOOKKEEPING_FLUSH_INTERVAL setting."""
+    global writer_global
+    with writer_lock:
+        if writer_global is None:
+            writer_global = BookkeepingWriter(settings.BOOKKEEPING_FLUSH_INTERVAL)
+        return writer_global
@@ -15,15 +15,30 @@ it is much preferred to having an unwrapped function, which may cause errors.
 To debug connection timeouts, turn DEBUG on in Django settings, which will log
 all SQL queries and allow us to check that all logged queries occur within the
 wrapper. Note though, this will result in _very_ verbose logs.
+
+`count_queries` counts the statements of a block of code and the time spent
+running them without logging them, jobs record theirs in the database.
+
+`dump` copies an SQLite database to a file, e.g. to keep an in-memory one.
+`migrate` copies new SQLite databases from templates when it can, see
+``DB_TEMPLATE_DIRECTORY``.
 """
 
+import hashlib
 import logging
+import os
+import sqlite3
+import sys
+import tempfile
 import threading
 import traceback
 from contextlib import ContextDecorator
+from contextlib import closing
 from importlib import import_module
+from pathlib import Path
 from typing import Any
 
+import django
 from django.apps import apps
 from django.conf import settings
 from django.core.management.sql import emit_post_migrate_signal
@@ -35,6 +50,8 @@ from django.db.migrations.executor import MigrationExecutor
 from django.db.migrations.state import ModelState
 from django.utils.module_loading import module_has_submodule
 
+from a3m.common_metrics import count_queries
+
 logger = logging.getLogger(__name__)
 thread_locals = threading.local()
 
@@ -107,12 +124,40 @@ def migration_progress_callback(action, migration=None, fake=False):
         logger.info("Rendering model states...")
 
 
-def migrate():
+def migration_hash(loader):
+    """Return a hash of the migrations known to ``loader``.
+
+    It covers every file of the migration packages, i.e. the data files that
+    migrations load too, and the versions of Django and SQLite.
+    """
+    digest = hashlib.sha256(f"{django.get_version()} {sqlite3.sqlite_version}".encode())
+    directories = set()
+    for key in sorted(loader.graph.nodes):
+        digest.update(repr(key).encode())
+        path = getattr(
+            sys.modules[loader.graph.nodes[key].__module__], "__file__", None
+        )
+        if path:
+            directories.add(Path(path).parent)
+    for directory in sorted(directories):
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or "__pycache__" in path.parts:
+                continue
+            digest.update(str(path.relative_to(directory)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def migrate(template_directory=None):
     """Migrate the database.
 
     This is a simplified version of Django's ``migrate`` management command
     that does not require ``management.call_command`` which is not functional
     in the native binary environment.
+
+    With ``template_directory``, a new SQLite database is copied from a
+    template migrated by a previous run, keyed by `migration_hash`, instead of
+    being migrated. The template is created on first use.
     """
     # Import the 'management' module within each installed app, to register
     # dispatcher events.
@@ -125,12 +170,32 @@ def migrate():
     connection = connections[DEFAULT_DB_ALIAS]
     connection.prepare_database()
     executor = MigrationExecutor(connection, migration_progress_callback)
+
+    template = None
+    if (
+        template_directory
+        and connection.vendor == "sqlite"
+        and not connection.introspection.table_names()
+    ):
+        template = Path(
+            template_directory, f"db-{migration_hash(executor.loader)}.sqlite"
+        )
+        if template.exists():
+            with closing(sqlite3.connect(template)) as source:
+                source.backup(connection.connection)
+            logger.info("Database configured from template %s.", template)
+            return
+
     executor.loader.check_consistent_history(connection)
     conflicts = executor.loader.detect_conflicts()
     if conflicts:
         raise Exception("Conflicting mgirations detected.")
     targets = executor.loader.graph.leaf_nodes()
     plan = executor.migration_plan(targets)
+    if not plan:
+        # No receivers of the migrate signals need them when nothing changed.
+        logger.info("Database configured.")
+        return
     pre_migrate_state = executor._create_project_state(with_applied_migrations=True)
     pre_migrate_apps = pre_migrate_state.apps
     emit_pre_migrate_signal(
@@ -167,6 +232,37 @@ def migrate():
     )
     logger.info("Database configured.")
 
+    if template is not None:
+        _save_template(connection, template)
+
+
+def _save_template(connection, template):
+    """Copy the just migrated database to ``template``."""
+    template.parent.mkdir(parents=True, exist_ok=True)
+    # Concurrent runs may create the same template.
+    fd, path = tempfile.mkstemp(dir=template.parent, prefix=".db-")
+    os.close(fd)
+    try:
+        with closing(sqlite3.connect(path)) as target:
+            connection.connection.backup(target)
+            # Copies keep the journal mode, WAL is not available in memory.
+            target.execute("PRAGMA journal_mode = DELETE")
+        os.replace(path, template)
+    except BaseException:
+        os.unlink(path)
+        raise
+    logger.info("Database template saved to %s.", template)
+
+
+def dump(path, using=DEFAULT_DB_ALIAS):
+    """Copy the SQLite database to ``path``, overwriting it."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        raise ValueError("Only SQLite databases can be dumped.")
+    connection.ensure_connection()
+    with closing(sqlite3.connect(path)) as target:
+        connection.connection.backup(target)
+
 
 auto_close_old_connections: type[Any]
 if settings.DEBUG:
@@ -182,4 +278,4 @@ else:
     auto_close_old_connections = AutoCloseOldConnections
 
 
-__all__ = ("auto_close_old_connections",)
+__all__ = ("auto_close_old_connections", "count_queries", "dump")
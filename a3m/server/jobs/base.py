@@ -9,6 +9,7 @@ import uuid
 from django.utils import timezone
 
 from a3m.main import models
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.db import auto_close_old_connections
 
 logger = logging.getLogger(__name__)
@@ -42,14 +43,16 @@ class Job(metaclass=abc.ABCMeta):
 
         # always zero for non task jobs
         self.exit_code = 0
+        # Kept in sync with the job model.
+        self.status = self.STATUS_UNKNOWN
 
     @classmethod
     @auto_close_old_connections()
     def cleanup_old_db_entries(cls):
         """Update the status of any in progress jobs.
 
-        This command is run on startup.
-        TODO: we could try to recover, instead of just failing.
+        This command is run on startup, before the interrupted packages are
+        resumed (see `Package.resume_packages`) with new jobs.
         """
         models.Job.objects.filter(currentstep=cls.STATUS_EXECUTING_COMMANDS).update(
             currentstep=cls.STATUS_FAILED
@@ -64,22 +67,24 @@ class Job(metaclass=abc.ABCMeta):
         to process.
         """
 
-    @auto_close_old_connections()
     def save_to_db(self):
-        return models.Job.objects.create(
-            jobuuid=self.uuid,
-            jobtype=self.description,
-            directory=self.package.current_path_for_db,
-            sipuuid=self.package.subid,
-            currentstep=self.STATUS_EXECUTING_COMMANDS,
-            unittype=self.package.unit_type,
-            microservicegroup=self.group,
-            createdtime=self.created_at,
-            createdtimedec=float(self.created_at.strftime("0.%f")),
-            microservicechainlink=self.link.id,
+        """Record the job, see `a3m.server.bookkeeping`."""
+        self.status = self.STATUS_EXECUTING_COMMANDS
+        get_bookkeeping_writer().create_job(
+            models.Job(
+                jobuuid=self.uuid,
+                jobtype=self.description,
+                directory=self.package.current_path_for_db,
+                sipuuid=self.package.subid,
+                currentstep=self.STATUS_EXECUTING_COMMANDS,
+                unittype=self.package.unit_type,
+                microservicegroup=self.group,
+                createdtime=self.created_at,
+                createdtimedec=float(self.created_at.strftime("0.%f")),
+                microservicechainlink=self.link.id,
+            )
         )
 
-    @auto_close_old_connections()
     def mark_complete(self):
         logger.debug(
             "%s %s done with exit code %s",
@@ -87,6 +92,5 @@ class Job(metaclass=abc.ABCMeta):
             self.uuid,
             self.exit_code,
         )
-        return models.Job.objects.filter(jobuuid=self.uuid).update(
-            currentstep=self.STATUS_COMPLETED_SUCCESSFULLY
-        )
+        self.status = self.STATUS_COMPLETED_SUCCESSFULLY
+        get_bookkeeping_writer().update_job_status(self.uuid, self.status)
@@ -62,7 +62,7 @@ class JobChain:
         self.next_link = self.initial_link
 
         self.current_job = None
-        # TODO: package context hits the db, make that clearer
+        # The package context is cached by the package, loaded once per unit.
         self.context = self.package.context.copy()
 
         logger.debug(
@@ -96,6 +96,7 @@ class JobChain:
             next_link = self.workflow.get_link(next_link)
 
         self.current_link = next_link
+        self.package.save_workflow_state(self.current_link)
         job_class = get_job_class_for_link(self.current_link)
         self.current_job = job_class(self, self.current_link, self.package)
         return self.current_job
@@ -115,3 +116,4 @@ class JobChain:
     def chain_completed(self):
         """Log chain completion"""
         logger.debug("Done with chain for package %s", self.package.uuid)
+        self.package.clear_workflow_state()
@@ -3,11 +3,15 @@ Jobs remotely executed by on MCP client.
 """
 
 import abc
+import collections
 import logging
 
 from a3m.main import models
+from a3m.replacements import compile_template
 from a3m.server import metrics
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.db import auto_close_old_connections
+from a3m.server.db import count_queries
 from a3m.server.jobs.base import Job
 from a3m.server.tasks import Task
 from a3m.server.tasks import get_task_backend
@@ -35,11 +39,17 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
 
         # Lazy initialize in `run` method
         self.task_backend = None
+        self.queries = None
 
         # Exit code is the maximum task exit code; start with None
         self.exit_code = None
 
         self.command_replacements = {}
+        self.escaped_replacements = {}
+
+        # Job that was running the same link when the server shut down, set
+        # when the package is resumed.
+        self.interrupted_job_uuid = None
 
     @property
     def name(self):
@@ -71,22 +81,26 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
         """A file path to capture job stderr, as defined in the workflow."""
         return self.link.config.get("stderr_file")
 
-    @staticmethod
-    def replace_values(command, replacements):
-        """Replace variables in a string with any replacements given in a dict.
+    def replace_values(self, command, file_replacements=None):
+        """Replace variables in a string with the values of the job.
 
         A large number of replacement values are available. For more details see
         `get_replacement_mapping` and `get_file_replacement_mapping` in the `packages`
-        module.
+        module. File replacement values take priority. The string is compiled
+        once, see `a3m.replacements`.
         """
         if command is None:
             return None
 
-        for key, replacement in replacements.items():
-            escaped_replacement = _escape_for_command_line(replacement)
-            command = command.replace(key, escaped_replacement)
-
-        return command
+        template = compile_template(command)
+        if not file_replacements:
+            return template.expand(self.escaped_replacements)
+        file_values = {
+            key: _escape_for_command_line(file_replacements[key])
+            for key in template.variables
+            if key in file_replacements
+        }
+        return template.expand(file_values, self.escaped_replacements)
 
     @auto_close_old_connections()
     def run(self, *args, **kwargs):
@@ -94,27 +108,41 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
 
         logger.debug("Running %s (package %s)", self.description, self.package.uuid)
 
-        # Reload the package, in case the path has changed
-        self.package.reload()
-        self.save_to_db()
-
-        self.command_replacements = self.package.get_replacement_mapping()
-        if self.job_chain.context is not None:
-            self.command_replacements.update(self.job_chain.context)
-
-        self.task_backend = get_task_backend()
-        self.submit_tasks()
-        # Block until out of process tasks have completed
-        self.wait_for_task_results()
+        # Statements made by the client scripts are counted in the tasks.
+        with count_queries() as self.queries:
+            # Reload the package, in case the path has changed
+            self.package.reload()
+            self.save_to_db()
+            # The client scripts record the tasks of the job, which refer to it.
+            get_bookkeeping_writer().flush()
+
+            self.command_replacements = self.package.get_replacement_mapping()
+            if self.job_chain.context is not None:
+                self.command_replacements.update(self.job_chain.context)
+            self.escaped_replacements = {
+                key: _escape_for_command_line(value)
+                for key, value in self.command_replacements.items()
+            }
+
+            self.task_backend = get_task_backend()
+            self.submit_tasks()
+            # Block until out of process tasks have completed
+            self.wait_for_task_results()
+        metrics.job_queries(self)
+
+        # Tasks cancelled by a shutdown have failed, do not move on to the next
+        # link so that the package resumes this job when the server restarts.
+        if self.task_backend.stopped:
+            raise RuntimeError("Task backend stopped while the job was running.")
 
         self.update_status_from_exit_code()
 
         return next(self.job_chain, None)
 
     def submit_tasks(self):
-        arguments = self.replace_values(self.arguments, self.command_replacements)
-        stdout_file = self.replace_values(self.stdout_file, self.command_replacements)
-        stderr_file = self.replace_values(self.stderr_file, self.command_replacements)
+        arguments = self.replace_values(self.arguments)
+        stdout_file = self.replace_values(self.stdout_file)
+        stderr_file = self.replace_values(self.stderr_file)
 
         task = Task(
             self.execute,
@@ -137,10 +165,12 @@ class ClientScriptJob(Job, metaclass=abc.ABCMeta):
     def task_completed_callback(self, task):
         """Hook for child classes."""
 
-    @auto_close_old_connections()
     def update_status_from_exit_code(self):
         status_code = self.link.get_status_id(self.exit_code)
-        models.Job.objects.filter(jobuuid=self.uuid).update(currentstep=status_code)
+        self.status = status_code
+        get_bookkeeping_writer().update_job_status(
+            self.uuid, status_code, queries=self.queries
+        )
         if status_code != models.Job.STATUS_COMPLETED_SUCCESSFULLY:
             try:
                 status = models.Job.STATUS[status_code][1]
@@ -180,15 +210,29 @@ class FilesClientScriptJob(ClientScriptJob):
         return self.link.config.get("filter_subdir", "")
 
     def submit_tasks(self):
-        """Iterate through all matching files for the package, and submit tasks."""
+        """Iterate through all matching files for the package, and submit tasks.
+
+        The backend starts processing batches as soon as they fill up, so the
+        tasks run while the rest of the files are still being enumerated.
+
+        Files processed successfully by the job this one is resuming, if any,
+        are skipped.
+        """
+        completed_file_uuids = self.get_completed_file_uuids()
+        skipped = 0
         for file_replacements in self.package.files(filter_subdir=self.filter_subdir):
+            if file_replacements.get(r"%fileUUID%") in completed_file_uuids:
+                skipped += 1
+                continue
+
             # File replacement values take priority
-            command_replacements = self.command_replacements.copy()
-            command_replacements.update(file_replacements)
+            command_replacements = collections.ChainMap(
+                file_replacements, self.command_replacements
+            )
 
-            arguments = self.replace_values(self.arguments, command_replacements)
-            stdout_file = self.replace_values(self.stdout_file, command_replacements)
-            stderr_file = self.replace_values(self.stderr_file, command_replacements)
+            arguments = self.replace_values(self.arguments, file_replacements)
+            stdout_file = self.replace_values(self.stdout_file, file_replacements)
+            stderr_file = self.replace_values(self.stderr_file, file_replacements)
 
             task = Task(
                 self.execute,
@@ -203,5 +247,23 @@ class FilesClientScriptJob(ClientScriptJob):
             # Nothing to do; set exit code to success
             self.exit_code = 0
 
+        if skipped:
+            logger.info(
+                "Skipped %s tasks completed before the job was interrupted (job %s)",
+                skipped,
+                self.uuid,
+            )
+
+    @auto_close_old_connections()
+    def get_completed_file_uuids(self):
+        """Return the files processed successfully by the interrupted job."""
+        if self.interrupted_job_uuid is None:
+            return set()
+        file_uuids = models.Task.objects.filter(
+            job_id=self.interrupted_job_uuid, exitcode=0
+        ).values_list("fileuuid", flat=True)
+        # Files not registered in the database have no identifier.
+        return set(file_uuids) - {None, "", "None"}
+
     def task_completed_callback(self, task):
         pass
@@ -13,6 +13,8 @@ from prometheus_client import Info
 from prometheus_client import start_http_server
 
 from a3m import __version__
+from a3m.common_metrics import DB_QUERY_COUNT_BUCKETS
+from a3m.common_metrics import DB_QUERY_TIME_BUCKETS
 from a3m.common_metrics import TASK_DURATION_BUCKETS
 
 gearman_active_jobs_gauge = Gauge(
@@ -47,6 +49,24 @@ task_duration_histogram = Histogram(
     ["script_name"],
     buckets=TASK_DURATION_BUCKETS,
 )
+job_db_queries_histogram = Histogram(
+    "mcpserver_job_db_queries",
+    "Histogram of database statements made to run jobs, labeled by script name",
+    ["script_name"],
+    buckets=DB_QUERY_COUNT_BUCKETS,
+)
+job_db_query_time_histogram = Histogram(
+    "mcpserver_job_db_query_time_seconds",
+    "Histogram of time spent in database statements to run jobs in seconds, "
+    "labeled by script name",
+    ["script_name"],
+    buckets=DB_QUERY_TIME_BUCKETS,
+)
+task_batch_size_gauge = Gauge(
+    "mcpserver_task_batch_size",
+    "Number of tasks in the batches being submitted, labeled by script name",
+    ["script_name"],
+)
 
 archivematica_info = Info("archivematica_version", "Archivematica version info")
 environment_info = Info("environment_variables", "Environment Variables")
@@ -90,6 +110,8 @@ def init_labels(workflow):
         task_success_timestamp.labels(task_group_name=group_name, task_name=task_name)
         task_error_timestamp.labels(task_group_name=group_name, task_name=task_name)
         task_duration_histogram.labels(script_name=script_name)
+        job_db_queries_histogram.labels(script_name=script_name)
+        job_db_query_time_histogram.labels(script_name=script_name)
 
 
 @skip_if_prometheus_disabled
@@ -114,3 +136,11 @@ def task_completed(task, job):
         task_group_name=job.group, task_name=job.description
     ).set_to_current_time()
     task_duration_histogram.labels(script_name=job.name).observe(duration)
+
+
+@skip_if_prometheus_disabled
+def job_queries(job):
+    job_db_queries_histogram.labels(script_name=job.name).observe(job.queries.count)
+    job_db_query_time_histogram.labels(script_name=job.name).observe(
+        job.queries.duration
+    )
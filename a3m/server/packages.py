@@ -1,25 +1,35 @@
 """Package management."""
 
-import ast
 import collections
 import functools
 import logging
 import os
+import threading
 from dataclasses import dataclass
 from dataclasses import field
+from dataclasses import replace
 from enum import Enum
 from enum import auto
+from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.conf import settings
+from django.db import transaction
 from google.protobuf import timestamp_pb2
 
 from a3m.api.transferservice import v1beta1 as transfer_service_api
 from a3m.archivematicaFunctions import strToUnicode
+from a3m.databaseFunctions import retryOnFailure
+from a3m.inventory import PackageSize
+from a3m.inventory import get_inventory
+from a3m.inventory import measure_path
 from a3m.main import models
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.db import auto_close_old_connections
+from a3m.server.jobs import ClientScriptJob
 from a3m.server.jobs import JobChain
 from a3m.server.processing import DEFAULT_PROCESSING_CONFIG
+from a3m.tracing import Trace
 
 logger = logging.getLogger(__name__)
 
@@ -80,15 +90,24 @@ class Package:
     package is in.
     """
 
-    def __init__(self, name, url, config, transfer, sip):
+    def __init__(self, name, url, config, transfer, sip, submitter=""):
         self.name = name
         self.url = url
+        self.submitter = submitter
         self.config = self._prepare_config(config)
         self.transfer = transfer
         self.sip = sip
         self.stage = Stage.TRANSFER
         self.aip_filename = None
         self._current_path = self.transfer.currentlocation
+        # `PackageContext` and the unit it was loaded for.
+        self._context = None
+        self._context_subid = None
+        # Timing trace, see `a3m.tracing`.
+        self.trace = Trace() if settings.PACKAGE_TRACES else None
+        # `PackageSize`, see `measure`.
+        self.estimated_size = None
+        self._size_recorded = False
 
     def __repr__(self):
         return "{class_name}({uuid})".format(
@@ -108,7 +127,9 @@ class Package:
 
     @classmethod
     @auto_close_old_connections()
-    def create_package(cls, package_queue, executor, workflow, name, url, config):
+    def create_package(
+        cls, package_queue, executor, workflow, name, url, config, submitter=""
+    ):
         """Launch transfer and return its object immediately."""
         if not name:
             raise ValueError("No transfer name provided.")
@@ -119,20 +140,35 @@ class Package:
         transfer_dir = os.path.join(
             _get_setting("PROCESSING_DIRECTORY"), "transfer", transfer_id, ""
         )
-        transfer = models.Transfer.objects.create(
-            uuid=transfer_id, currentlocation=transfer_dir
-        )
-        logger.debug("Transfer object created: %s", transfer.pk)
+        transfer = models.Transfer(uuid=transfer_id, currentlocation=transfer_dir)
 
         sip_id = str(uuid4())
         sip_dir = os.path.join(
             _get_setting("PROCESSING_DIRECTORY"), "ingest", sip_id, ""
         )
-        sip = models.SIP.objects.create(uuid=sip_id, currentpath=sip_dir)
-        sip.transfer_id = transfer_id
-        logger.debug("SIP object created: %s", sip.pk)
+        sip = models.SIP(uuid=sip_id, currentpath=sip_dir)
+
+        package = cls(name, url, config, transfer, sip, submitter=submitter)
+        package_state = models.PackageState(
+            sip=sip,
+            transfer=transfer,
+            name=package.name,
+            url=package.url,
+            submitter=package.submitter,
+            config=package.config.SerializeToString(),
+            stage=package.stage.name,
+        )
 
-        package = cls(name, url, config, transfer, sip)
+        def create_records():
+            with transaction.atomic():
+                transfer.save(force_insert=True)
+                sip.save(force_insert=True)
+                package_state.save(force_insert=True)
+
+        retryOnFailure("Create package", create_records)
+        sip.transfer_id = transfer_id
+        logger.debug("Transfer and SIP objects created: %s, %s", transfer.pk, sip.pk)
+        package_queue.statuses.package_queued(package.uuid)
 
         params = (package, package_queue, workflow)
         future = executor.submit(Package.trigger_workflow, *params)
@@ -142,6 +178,61 @@ class Package:
 
         return package
 
+    @classmethod
+    @auto_close_old_connections()
+    def resume_packages(cls, package_queue, workflow):
+        """Resume processing of the packages interrupted by a shutdown.
+
+        Each package is resumed from the link it was processing, which is run
+        again. Tasks that completed successfully before the shutdown are not
+        run again, see `FilesClientScriptJob`.
+        """
+        packages = []
+        for state in models.PackageState.objects.select_related("sip", "transfer"):
+            config = transfer_service_api.request_response_pb2.ProcessingConfig()
+            config.ParseFromString(bytes(state.config))
+            package = cls(
+                state.name,
+                state.url,
+                config,
+                state.transfer,
+                state.sip,
+                submitter=state.submitter,
+            )
+            package.stage = Stage[state.stage]
+
+            if state.link_id is None:
+                link = workflow.get_initiator()
+            else:
+                try:
+                    link = workflow.get_link(str(state.link_id))
+                except KeyError:
+                    logger.warning(
+                        "Package %s cannot be resumed: link %s not found in the "
+                        "workflow",
+                        package.uuid,
+                        state.link_id,
+                    )
+                    continue
+
+            job_chain = JobChain(package, workflow, link)
+            job = next(job_chain)
+            if isinstance(job, ClientScriptJob):
+                job.interrupted_job_uuid = (
+                    models.Job.objects.filter(
+                        sipuuid=package.subid, microservicechainlink=link.id
+                    )
+                    .order_by("-createdtime", "-createdtimedec")
+                    .values_list("jobuuid", flat=True)
+                    .first()
+                )
+
+            logger.info("Resuming package %s (link %s)", package.uuid, link.id)
+            package_queue.schedule_job(job)
+            packages.append(package)
+
+        return packages
+
     @staticmethod
     def trigger_workflow(package, package_queue, workflow):
         logger.debug("Package %s: starting workflow processing", package.uuid)
@@ -174,6 +265,34 @@ class Package:
         else:
             return self.transfer.pk
 
+    def measure(self):
+        """Update the estimated `PackageSize` of the package.
+
+        The size is recorded once the transfer is downloaded, see the
+        ``a3m_download_transfer`` client script. Before that, it is known for
+        local sources only, otherwise it is None.
+        """
+        if self._size_recorded:
+            return
+        recorded = (
+            models.PackageState.objects.filter(sip_id=self.uuid)
+            .values_list("size", "file_count")
+            .first()
+        )
+        if recorded is not None and recorded[0] is not None:
+            self.estimated_size = PackageSize(*recorded)
+            self._size_recorded = True
+            return
+        if self.estimated_size is not None:
+            return
+        parsed = urlparse(self.url)
+        if parsed.scheme != "file":
+            return
+        try:
+            self.estimated_size = measure_path(parsed.path)
+        except OSError as err:
+            logger.debug("Unable to measure %s: %s", self.url, err)
+
     @property
     def current_path(self):
         return self._current_path
@@ -194,11 +313,33 @@ class Package:
 
     @property
     def context(self):
-        """Returns a `PackageContext` for this package."""
-        # This needs to be reloaded from the db every time, because new values
-        # could have been added by a client script.
-        # TODO: pass context changes back from client
-        return PackageContext.load_from_db(self.subid)
+        """Returns a `PackageContext` for this package.
+
+        It is loaded from the database once per unit, call `invalidate_context`
+        after changing it.
+        """
+        if self._context is None or self._context_subid != self.subid:
+            self._context = PackageContext.load_from_db(self.subid)
+            self._context_subid = self.subid
+        return self._context
+
+    def invalidate_context(self):
+        """Reload the context from the database the next time it is used."""
+        self._context = None
+
+    def save_trace(self):
+        """Write the timing trace of the package, if it was recorded."""
+        if self.trace is None:
+            return
+        path = os.path.join(
+            _get_setting("SHARED_DIRECTORY"), "logs", "traces", f"{self.uuid}.json"
+        )
+        try:
+            self.trace.save(path)
+        except OSError as err:
+            logger.warning(
+                "Unable to write the trace of package %s: %s", self.uuid, err
+            )
 
     @property
     def unit_type(self):
@@ -233,6 +374,19 @@ class Package:
         """Signal this package so it becomes a SIP."""
         self.stage = Stage.INGEST
 
+    def save_workflow_state(self, link):
+        """Record the link the package is processing, see `resume_packages`.
+
+        The record is written behind by the bookkeeping writer.
+        """
+        get_bookkeeping_writer().update_package_state(
+            self.uuid, self.stage.name, link.id
+        )
+
+    def clear_workflow_state(self):
+        """Forget the workflow state once the package is done processing."""
+        get_bookkeeping_writer().delete_package_state(self.uuid)
+
     @auto_close_old_connections()
     def reload(self):
         if self.stage is Stage.INGEST:
@@ -304,18 +458,20 @@ class Package:
             if filter_subdir:
                 start_path = start_path + filter_subdir
 
+            inventory = get_inventory(self.current_path)
             files_returned_already = set()
-            if queryset.exists():
-                for file_obj in queryset.iterator():
-                    file_obj_mapped = get_file_replacement_mapping(
-                        file_obj, self.current_path
-                    )
-                    if not os.path.exists(file_obj_mapped.get("%inputFile%")):
-                        continue
-                    files_returned_already.add(file_obj_mapped.get("%inputFile%"))
-                    yield file_obj_mapped
+            # Fetched upfront: callers run tasks between items, an open read
+            # would block their writes on databases without WAL, e.g. memdb.
+            for file_obj in list(queryset):
+                file_obj_mapped = get_file_replacement_mapping(
+                    file_obj, self.current_path
+                )
+                if not inventory.exists(file_obj_mapped.get("%inputFile%")):
+                    continue
+                files_returned_already.add(file_obj_mapped.get("%inputFile%"))
+                yield file_obj_mapped
 
-            for basedir, subdirs, files in os.walk(start_path):
+            for basedir, subdirs, files in inventory.walk(start_path):
                 for file_name in files:
                     file_path = os.path.join(basedir, file_name)
                     if file_path not in files_returned_already:
@@ -362,23 +518,10 @@ class PackageContext:
         Loads a context from the UnitVariable table.
         """
         context = cls()
-
-        # TODO: we shouldn't need one UnitVariable per chain, with all the same values
-        unit_vars_queryset = models.UnitVariable.objects.filter(
-            unituuid=uuid, variable="replacementDict"
-        )
-        # Distinct helps here, at least
-        unit_vars_queryset = unit_vars_queryset.values_list("variablevalue").distinct()
-        for unit_var_value in unit_vars_queryset:
-            # TODO: nope nope nope, fix eval usage
-            try:
-                unit_var = ast.literal_eval(unit_var_value[0])
-            except (ValueError, SyntaxError):
-                logger.exception(
-                    "Failed to eval unit variable value %s", unit_var_value[0]
-                )
-            else:
-                context.update(unit_var)
+        try:
+            context.update(models.UnitVariable.objects.get_package_context(uuid))
+        except ValueError:
+            logger.exception("Failed to decode the context of unit %s", uuid)
 
         return context
 
@@ -404,8 +547,107 @@ class PackageStatus:
     jobs: list = field(default_factory=list)
 
 
+def _get_final_status(group, description):
+    """Determine the status of a package from the last job processed."""
+    if "failed" in group.lower():
+        return transfer_service_api.request_response_pb2.PACKAGE_STATUS_FAILED
+    elif "reject" in group.lower():
+        return transfer_service_api.request_response_pb2.PACKAGE_STATUS_REJECTED
+    elif description == "a3m - Store AIP":
+        return transfer_service_api.request_response_pb2.PACKAGE_STATUS_COMPLETE
+    raise ValueError(
+        f"Package status cannot be determined (job.type={description}, job.microservicegroup={group})"
+    )
+
+
+class PackageStatusIndex:
+    """Status of the packages processed by this server, kept in memory.
+
+    `PackageQueue` updates it as packages are queued and their jobs run, so
+    `get_package_status` can answer without querying the database. Only the
+    most recent ``max_finished`` finished packages are remembered, the status
+    of other packages is looked up in the database.
+    """
+
+    MAX_FINISHED = 4096
+
+    def __init__(self, max_finished=MAX_FINISHED):
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+        self.processing = {}  # package_id: last job started or None
+        self.finished = collections.OrderedDict()  # package_id: PackageStatus
+
+    def get(self, package_id):
+        """Return the status of a package, or None if it is not known."""
+        package_id = str(package_id)
+        with self.lock:
+            if package_id in self.processing:
+                job = self.processing[package_id]
+                return PackageStatus(
+                    status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING,
+                    job=job.description if job else None,
+                )
+            package_status = self.finished.get(package_id)
+            if package_status is not None:
+                self.finished.move_to_end(package_id)
+            return package_status
+
+    def package_queued(self, package_id):
+        with self.lock:
+            self.processing.setdefault(str(package_id), None)
+
+    def job_started(self, package_id, job):
+        with self.lock:
+            self.processing[str(package_id)] = job
+
+    def package_finished(self, package_id):
+        """Record the final status of a package, given by its last job."""
+        package_id = str(package_id)
+        with self.lock:
+            job = self.processing.pop(package_id, None)
+        if job is None:
+            return
+        try:
+            status = _get_final_status(job.group, job.description)
+        except ValueError as err:
+            logger.warning("%s", err)
+            return
+        self.add_finished(package_id, PackageStatus(status=status, job=job.group))
+
+    def add_finished(self, package_id, package_status):
+        with self.lock:
+            self.finished[str(package_id)] = package_status
+            self.finished.move_to_end(str(package_id))
+            while len(self.finished) > self.max_finished:
+                self.finished.popitem(last=False)
+
+
+def get_package_status(
+    package_queue, package_id: str, include_jobs: bool = False
+) -> PackageStatus:
+    """Return the status of a package.
+
+    The status is read from ``package_queue.statuses``, falling back to the
+    database for packages it does not know about. The job history is only
+    loaded, from the database, if ``include_jobs`` is set.
+    """
+    package_status = package_queue.statuses.get(package_id)
+    if package_status is None:
+        package_status = _load_package_status(package_id)
+        if (
+            package_status.status
+            != transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+        ):
+            package_queue.statuses.add_finished(package_id, package_status)
+
+    if include_jobs:
+        package_status = replace(package_status, jobs=_load_package_jobs(package_id))
+
+    return package_status
+
+
 @auto_close_old_connections()
-def get_package_status(package_queue, package_id: str) -> PackageStatus:
+def _load_package_status(package_id: str) -> PackageStatus:
     try:
         sip = models.SIP.objects.get(pk=package_id)
     except models.SIP.DoesNotExist:
@@ -418,20 +660,14 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
             .first()
         )
 
-    package = package_queue.active_packages.get(package_id)
-    if package:
-        # Reminder: package.subid can be in Transfer or Ingest.
-        job = get_latest_job(package.subid)
+    # Packages waiting for a slot, e.g. resumed after a restart.
+    if models.PackageState.objects.filter(sip_id=package_id).exists():
         return PackageStatus(
-            status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING,
-            job=job.jobtype if job else None,
+            status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
         )
 
-    # A3M-TODO: persist package-workflow status!
-    # It'd be much easier if a workflow instance could keep the package
-    # model(s) up to date.
-
-    # We have an inactive package, look up the status in the database.
+    # We have a package not processed by this server, look up the status in
+    # the database.
     job = get_latest_job(package_id)
 
     # It must be an error during Transfer when Ingest activity not recorded.
@@ -447,19 +683,20 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
                 status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
             )
 
-    if "failed" in job.microservicegroup.lower():
-        status = transfer_service_api.request_response_pb2.PACKAGE_STATUS_FAILED
-    elif "reject" in job.microservicegroup.lower():
-        status = transfer_service_api.request_response_pb2.PACKAGE_STATUS_REJECTED
-    elif job.jobtype == "a3m - Store AIP":
-        status = transfer_service_api.request_response_pb2.PACKAGE_STATUS_COMPLETE
-    else:
-        raise Exception(
-            f"Package status cannot be determined (job.currentstep={job.currentstep}, job.type={job.jobtype}, job.microservicegroup={job.microservicegroup})"
-        )
+    status = _get_final_status(job.microservicegroup, job.jobtype)
 
-    package_status = PackageStatus(status=status, job=job.microservicegroup)
+    return PackageStatus(status=status, job=job.microservicegroup)
 
+
+@auto_close_old_connections()
+def _load_package_jobs(package_id: str) -> list:
+    get_bookkeeping_writer().flush()
+    try:
+        sip = models.SIP.objects.get(pk=package_id)
+    except models.SIP.DoesNotExist:
+        raise PackageNotFoundError
+
+    jobs = []
     for item in (
         models.Job.objects.filter(sipuuid__in=(sip.pk, sip.transfer_id))
         .order_by("createdtime")
@@ -476,7 +713,7 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
         start_time = timestamp_pb2.Timestamp()
         start_time.FromDatetime(item["createdtime"])
 
-        package_status.jobs.append(
+        jobs.append(
             transfer_service_api.request_response_pb2.Job(
                 id=str(item["jobuuid"]),
                 name=item["jobtype"],
@@ -487,4 +724,4 @@ def get_package_status(package_queue, package_id: str) -> PackageStatus:
             )
         )
 
-    return package_status
+    return jobs
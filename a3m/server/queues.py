@@ -2,15 +2,26 @@
 The PackageQueue class handles job queueing, as it relates to packages.
 """
 
+import collections
 import functools
 import logging
 import queue
 import threading
+import time
 import uuid
 
 from django.conf import settings
 
+from a3m import inventory
+from a3m import tracing
 from a3m.server import metrics
+from a3m.server.bookkeeping import get_bookkeeping_writer
+from a3m.server.packages import PackageStatusIndex
+from a3m.server.scheduling import get_scheduling_policy
+from a3m.server.watchers import PackageWatchers
+from a3m.server.watchers import job_finished_event
+from a3m.server.watchers import job_started_event
+from a3m.server.watchers import package_finished_event
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +36,9 @@ class PackageQueue:
     a separate concern from package queuing and could be isolated in future.
 
     Methods on this class should be threadsafe; they can be called from any
-    worker thread.
+    worker thread. The queue state is guarded by a single lock that is never
+    held while blocking, and the processing loop sleeps on a condition
+    variable until there is work to do.
 
     This process happens when a `Job` is scheduled via `PackageQueue.schedule_job`.
 
@@ -36,19 +49,25 @@ class PackageQueue:
        SIP/Transfer completion or failure). If there is room to process the
        package, the job is placed on an active job queue, which is the consumed
        by the processing loop running on the main thread.
-    2. The processing loop retrieves any jobs from the active queue, and
-       schedules their `run` method for execution in a worker thread (via
-       `ThreadPoolExecutor.submit`).
+       Which deferred package goes next is decided by the scheduling policy,
+       see `a3m.server.scheduling`.
+    2. The processing loop is woken up as soon as a job is added to the active
+       queue, and schedules its `run` method for execution in a worker thread
+       (via `ThreadPoolExecutor.submit`).
     3. The `Job.run` method executes. If it is a `ClientScriptJob` (executing
        on MCPClient), it generates the `Task` objects required, and sends them
-       to MCPClient via `GearmanTaskBackend`, and waits for the results. All of
+       to MCPClient via `PoolTaskBackend`, and waits for the results. All of
        this happens on the one worker thread.
-    4. On the completion of tasks (i.e. results are returned by Gearman),
+    4. On the completion of tasks (i.e. results are returned by the backend),
        `Job.run` returns the _next_ job to schedule, if any. In practice this
        is usually retrieved from the `JobChain` via `next(self.job_chain)`.
     5. Back in the main thread, a callback attached to the result of `Job.run`
        triggers adding the next job to the active job queue. This cycle
        continues until the workflow chain ends.
+
+    Clients can follow the progress of a package via `watchers`, which get an
+    event when its jobs start or finish and when the package is done. The
+    status of each package is also kept in `statuses`.
     """
 
     # An arbitrary, large value, so we don't accept infinite packages.
@@ -60,21 +79,39 @@ class PackageQueue:
         shutdown_event=None,
         max_concurrent_packages=settings.CONCURRENT_PACKAGES,
         max_queued_packages=MAX_QUEUED_PACKAGES,
+        scheduling_policy=None,
         debug=False,
     ):
         self.executor = executor
         self.max_concurrent_packages = max_concurrent_packages
+        self.max_queued_packages = max_queued_packages
         self.debug = debug
 
         if shutdown_event is None:
             shutdown_event = threading.Event()
         self.shutdown_event = shutdown_event
 
-        self.active_package_lock = threading.Lock()
-        self.active_packages = {}  # package uuid: Package
+        self.lock = threading.RLock()
+        self.job_available = threading.Condition(self.lock)
+
+        # Package uuid: Package. The dict is replaced on every change instead
+        # of being mutated so it can be read without taking the lock.
+        self.active_packages = {}
+
+        # Jobs of active packages. Each active package has at most one job
+        # queued, so this is bound by `max_concurrent_packages`.
+        self.job_queue = collections.deque()
+
+        # Jobs of packages waiting for a slot.
+        if scheduling_policy is None:
+            scheduling_policy = get_scheduling_policy()
+        self.queue = scheduling_policy
+
+        # Package uuid: time it was queued, for its trace.
+        self.queued_since = {}
 
-        self.job_queue = queue.Queue(maxsize=max_concurrent_packages)
-        self.queue = queue.Queue(maxsize=max_queued_packages)
+        self.watchers = PackageWatchers()
+        self.statuses = PackageStatusIndex()
 
         if self.debug:
             logger.debug(
@@ -92,49 +129,32 @@ class PackageQueue:
         if self.shutdown_event.is_set():
             raise RuntimeError("Queue stopped.")
 
-        # The most common case is an already active package is scheduled
         package = job.package
-        with self.active_package_lock:
+        if package.uuid not in self.active_packages:
+            self.statuses.package_queued(package.uuid)
+            self.queue.prepare(job)
+            self.queued_since.setdefault(package.uuid, time.time_ns())
+
+        with self.lock:
+            # The most common case is an already active package is scheduled
             if package.uuid in self.active_packages:
-                # If there's no slot available, block until ready
-                self.job_queue.put(job, block=True)
-                metrics.job_queue_length_gauge.inc()
+                self._put_job(job)
                 return
 
             # Otherwise, we need to queue the package
-            active_package_count = len(self.active_packages)
-
-        self._put_package_nowait(package, job)
+            self._put_package_nowait(package, job)
 
-        if self.debug:
-            with self.active_package_lock:
+            if self.debug:
                 logger.debug(
-                    "Active packages are: %s",
-                    ", ".join(
-                        [
-                            repr(active_package)
-                            for active_package in self.active_packages.values()
-                        ]
-                    ),
+                    "Scheduled job %s (%s %s). Current queue size: %s",
+                    job.uuid,
+                    package.__class__.__name__,
+                    package.uuid,
+                    len(self.queue),
                 )
-            logger.debug(
-                "Scheduled job %s (%s %s). Current queue size: %s",
-                job.uuid,
-                package.__class__.__name__,
-                package.uuid,
-                self.queue.qsize(),
-            )
 
-        # Don't start processing unless we have capacity
-        if active_package_count < self.max_concurrent_packages:
             self.queue_next_job()
 
-        elif self.debug:
-            logger.debug(
-                "Not processing next job; %s packages already active",
-                active_package_count,
-            )
-
     def work(self):
         """Process the package queue.
 
@@ -142,8 +162,7 @@ class PackageQueue:
         them, until `stop` is called.
         """
         while not self.shutdown_event.is_set():
-            # Using a timeout here allows shutdown signals to fire
-            self.process_one_job(timeout=1.0)
+            self.process_one_job()
 
     def wait_for_termination(self):
         """Blocks current thread until the server stops."""
@@ -160,16 +179,23 @@ class PackageQueue:
         particalar package. If such a link is encountered the package is
         deactivated and the next package is scheduled.
         """
-        try:
-            job = self.job_queue.get(timeout=timeout)
-        except queue.Empty:
-            return
+        with self.job_available:
+            self.job_available.wait_for(
+                lambda: self.job_queue or self.shutdown_event.is_set(),
+                timeout=timeout,
+            )
+            if not self.job_queue:
+                return
+            job = self.job_queue.popleft()
 
         metrics.job_queue_length_gauge.dec()
         metrics.active_jobs_gauge.inc()
 
-        result = self.executor.submit(job.run)
-        result.add_done_callback(self._job_completed_callback)
+        self.statuses.job_started(job.package.uuid, job)
+        self.watchers.publish(job.package.uuid, job_started_event, job)
+
+        result = self.executor.submit(self._run_job, job)
+        result.add_done_callback(functools.partial(self._job_completed_callback, job))
 
         if job.link.is_terminal:
             package_done_callback = functools.partial(
@@ -182,6 +208,8 @@ class PackageQueue:
     def stop(self):
         """Trigger queue shutdown."""
         self.shutdown_event.set()
+        with self.job_available:
+            self.job_available.notify_all()
 
     def _package_completed_callback(self, package, link_id, future):
         """Marks the package as inactive and schedules a new package.
@@ -199,10 +227,36 @@ class PackageQueue:
             )
             return
 
-        self.deactivate_package(package)
-        self.queue_next_job()
+        with self.lock:
+            self.deactivate_package(package)
+            self.queue_next_job()
 
-    def _job_completed_callback(self, future):
+        # Write pending job records before reporting the package as finished.
+        with tracing.activate(package.trace):
+            get_bookkeeping_writer().flush()
+        package.save_trace()
+        self._remove_inventories(package)
+        self.statuses.package_finished(package.uuid)
+        self.watchers.publish(package.uuid, package_finished_event)
+
+    @staticmethod
+    def _remove_inventories(package):
+        """Remove the inventories of the package, including earlier paths."""
+        try:
+            if package.current_path:
+                inventory.invalidate(package.current_path)
+            inventory.remove_stale()
+        except OSError as err:
+            logger.warning("Unable to remove inventories: %s", err)
+
+    @staticmethod
+    def _run_job(job):
+        """Run a job, recording it in the trace of its package."""
+        with tracing.activate(job.package.trace):
+            with tracing.span(job.description, tracing.JOB, link=str(job.link.id)):
+                return job.run()
+
+    def _job_completed_callback(self, job, future):
         """Schedule the next job in the chain.
 
         Retrieve the next job from the result from the previous job. If there is
@@ -210,36 +264,51 @@ class PackageQueue:
         called by an executor on completion of a Job.
         """
         metrics.active_jobs_gauge.dec()
+        self.watchers.publish(
+            job.package.uuid, job_finished_event, job, future.exception() is not None
+        )
         next_job = future.result()
 
         if not next_job:
             return
         self.schedule_job(next_job)
 
+    def _put_job(self, job):
+        """Queue a job of an active package and wake up the processing loop."""
+        with self.job_available:
+            self.job_queue.append(job)
+            self.job_available.notify()
+        metrics.job_queue_length_gauge.inc()
+
     def _put_package_nowait(self, package, job):
         """Queue a package and job for later processing."""
-        self.queue.put_nowait(job)
+        with self.lock:
+            if len(self.queue) >= self.max_queued_packages:
+                raise queue.Full
+            self.queue.push(job)
         metrics.package_queue_length_gauge.inc()
 
     def _get_package_job_nowait(self):
         """Return a waiting job for an inactive package.
-        Prioritized by package type.
+        Prioritized by the scheduling policy.
         """
-        try:
-            job = self.queue.get_nowait()
-        except queue.Empty:
-            job = None
+        with self.lock:
+            job = self.queue.pop()
+            if job is None:
+                return None
 
-        if job is not None:
-            metrics.package_queue_length_gauge.dec()
+        metrics.package_queue_length_gauge.dec()
 
         return job
 
     def activate_package(self, package):
         """Mark a package as active, allowing jobs related to it to process."""
-        with self.active_package_lock:
+        with self.lock:
             if package.uuid not in self.active_packages:
-                self.active_packages[package.uuid] = package
+                self.active_packages = {
+                    **self.active_packages,
+                    package.uuid: package,
+                }
                 metrics.active_package_gauge.inc()
                 if self.debug:
                     logger.debug("Marked package %s as active", package.uuid)
@@ -250,9 +319,13 @@ class PackageQueue:
 
     def deactivate_package(self, package):
         """Mark a package as inactive."""
-        with self.active_package_lock:
+        with self.lock:
             if package.uuid in self.active_packages:
-                del self.active_packages[package.uuid]
+                self.active_packages = {
+                    package_uuid: active_package
+                    for package_uuid, active_package in self.active_packages.items()
+                    if package_uuid != package.uuid
+                }
                 metrics.active_package_gauge.dec()
                 if self.debug:
                     logger.debug("Marked package %s as inactive", package.uuid)
@@ -263,35 +336,48 @@ class PackageQueue:
                 )
 
     def is_package_active(self, package_uuid):
-        """Determine whether a package is still active."""
+        """Determine whether a package is still active.
+
+        It does not take the lock, see ``active_packages``.
+        """
         if not isinstance(package_uuid, uuid.UUID):
             package_uuid = uuid.UUID(package_uuid)
-        # TODO: use timeout or rwlock
-        with self.active_package_lock:
-            if package_uuid in self.active_packages:
-                return True
-        return False
+        return package_uuid in self.active_packages
 
     def queue_next_job(self):
         """Load another job into the active job queue.
 
-        This method should only be called when there is space in the package
-        queue.
+        It does nothing unless there are queued packages and room to activate
+        one of them.
         """
-        job = self._get_package_job_nowait()
-        if job is None:
-            return  # nothing to do
+        with self.lock:
+            if len(self.active_packages) >= self.max_concurrent_packages:
+                if self.debug:
+                    logger.debug(
+                        "Not processing next job; %s packages already active",
+                        len(self.active_packages),
+                    )
+                return
 
-        package = job.package
-        self.activate_package(package)
-        self.job_queue.put_nowait(job)
-        metrics.job_queue_length_gauge.inc()
+            job = self._get_package_job_nowait()
+            if job is None:
+                return  # nothing to do
 
-        if self.debug:
-            logger.debug(
-                "Released job %s (%s %s). Current queue size: %s",
-                job.uuid,
-                package.__class__.__name__,
-                package.uuid,
-                self.queue.qsize(),
-            )
+            package = job.package
+            self.activate_package(package)
+            self._put_job(job)
+
+            queued_since = self.queued_since.pop(package.uuid, None)
+            if package.trace is not None and queued_since is not None:
+                package.trace.add_span(
+                    "Queue wait", tracing.QUEUE, queued_since, time.time_ns()
+                )
+
+            if self.debug:
+                logger.debug(
+                    "Released job %s (%s %s). Current queue size: %s",
+                    job.uuid,
+                    package.__class__.__name__,
+                    package.uuid,
+                    len(self.queue),
+                )
@@ -4,6 +4,7 @@ from collections.abc import Callable
 import tenacity
 from grpc import Channel
 from grpc import RpcError
+from grpc import StatusCode
 
 from a3m import __version__
 from a3m.api.transferservice import v1beta1 as transfer_service_api
@@ -56,21 +57,68 @@ class Client:
         url: str,
         name: str,
         config: transfer_service_api.request_response_pb2.ProcessingConfig = None,
+        submitter: str = "",
     ):
         request = transfer_service_api.request_response_pb2.SubmitRequest(
-            name=name, url=url, config=config
+            name=name, url=url, config=config, submitter=submitter
         )
         return self._unary_call(self.transfer_stub.Submit, request)
 
-    def read(self, package_id: str):
-        request = transfer_service_api.request_response_pb2.ReadRequest(id=package_id)
+    def read(self, package_id: str, include_jobs: bool = False):
+        request = transfer_service_api.request_response_pb2.ReadRequest(
+            id=package_id, include_jobs=include_jobs
+        )
         return self._unary_call(self.transfer_stub.Read, request)
 
+    def watch(self, package_id: str):
+        """Streams the events of a package until processing has completed.
+
+        Unlike unary calls, the stream is not subject to ``rpc_timeout``.
+        """
+        request = transfer_service_api.request_response_pb2.WatchRequest(id=package_id)
+        logger.debug("RPC call Watch with request: %r", request)
+        return self.transfer_stub.Watch(
+            request,
+            metadata=Client.version_metadata(),
+            wait_for_ready=self.wait_for_ready,
+        )
+
     def wait_until_complete(
-        self, package_id: str, spin_cb: Callable = None
+        self, package_id: str, spin_cb: Callable = None, event_cb: Callable = None
     ) -> transfer_service_api.request_response_pb2.ReadResponse:
-        """Blocks until processing of a package has completed."""
+        """Blocks until processing of a package has completed.
+
+        It follows the package with ``watch``, falling back to polling when
+        the server does not implement it, has too many watchers or the stream
+        ends early. ``event_cb`` is called with every event of the stream and
+        ``spin_cb`` with the retry state of every poll. The response includes
+        the jobs.
+        """
+        finished = False
+        try:
+            for event in self.watch(package_id):
+                if event_cb is not None:
+                    event_cb(event)
+                if (
+                    event.type
+                    == transfer_service_api.request_response_pb2.WatchResponse.TYPE_PACKAGE_FINISHED
+                ):
+                    finished = True
+                    break
+        except RpcError as e:
+            if e.code() not in (
+                StatusCode.UNIMPLEMENTED,
+                StatusCode.RESOURCE_EXHAUSTED,
+            ):
+                logger.warning("RPC call Watch got error %s", e)
+                raise
+
+        if not finished:
+            self._poll_until_complete(package_id, spin_cb)
+
+        return self.read(package_id, include_jobs=True)
 
+    def _poll_until_complete(self, package_id, spin_cb=None):
         def _should_continue(
             resp: transfer_service_api.request_response_pb2.ReadResponse,
         ):
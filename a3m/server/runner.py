@@ -10,6 +10,7 @@ Start and run MCPServer.
 structure, and default processing configs added.
 5. Any in progress Job and Task entries in the database are marked as errors,
 as they are presumed to have been the result of a shutdown while processing.
+The packages they belong to are resumed once the `PackageQueue` is created.
 6. If Prometheus metrics are enabled, an thread is started to serve metrics for
 scraping.
 7. A `PackageQueue` (see the `queues` module) is initialized.
@@ -31,16 +32,21 @@ from grpc_reflection.v1alpha import reflection
 
 from a3m import __version__
 from a3m.api.transferservice import v1beta1 as transfer_service_api
+from a3m.api.workerservice import v1beta1 as worker_service_api
 from a3m.main import models
 from a3m.server import metrics
 from a3m.server import shared_dirs
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.db import migrate
 from a3m.server.jobs import Job
+from a3m.server.packages import Package
 from a3m.server.queues import PackageQueue
+from a3m.server.tasks import RemoteTaskBackend
 from a3m.server.tasks import Task
 from a3m.server.tasks.backends import TaskBackend
 from a3m.server.tasks.backends import get_task_backend
 from a3m.server.transfer_service import TransferService
+from a3m.server.worker_service import WorkerService
 from a3m.server.workflow import Workflow
 from a3m.server.workflow import load_default_workflow
 
@@ -72,6 +78,7 @@ class Server:
         queue_executor: concurrent.futures.ThreadPoolExecutor,
         grpc_executor: concurrent.futures.ThreadPoolExecutor,
         debug: bool = False,
+        max_watchers: int | None = None,
     ):
         self.stage = ServerStage.STOPPED
         self.lock = threading.RLock()
@@ -90,6 +97,7 @@ class Server:
             debug=debug,
         )
         self.grpc_executor = grpc_executor
+        self.max_watchers = max_watchers
         self.grpc_server = grpc.server(
             grpc_executor,
             options=[
@@ -105,7 +113,7 @@ class Server:
 
     def _mount_services(self):
         transfer_service = TransferService(
-            self.workflow, self.queue, self.queue_executor
+            self.workflow, self.queue, self.queue_executor, self.max_watchers
         )
         transfer_service_api.service_pb2_grpc.add_TransferServiceServicer_to_server(
             transfer_service, self.grpc_server
@@ -114,7 +122,21 @@ class Server:
         services = tuple(
             service.full_name
             for service in transfer_service_api.service_pb2.DESCRIPTOR.services_by_name.values()
-        ) + (reflection.SERVICE_NAME,)
+        )
+
+        # Remote workers lease their tasks from the task backend.
+        task_backend = get_task_backend()
+        if isinstance(task_backend, RemoteTaskBackend):
+            worker_service = WorkerService(task_backend.dispatcher)
+            worker_service_api.service_pb2_grpc.add_WorkerServiceServicer_to_server(
+                worker_service, self.grpc_server
+            )
+            services += tuple(
+                service.full_name
+                for service in worker_service_api.service_pb2.DESCRIPTOR.services_by_name.values()
+            )
+
+        services += (reflection.SERVICE_NAME,)
         reflection.enable_server_reflection(services, self.grpc_server)
 
     def start(self):
@@ -152,9 +174,10 @@ class Server:
                 logger.info("Shutting down...")
 
                 self.grpc_server.stop(grace)
-                self.queue_shutdown_event.set()
+                self.queue.stop()
                 self.queue.wait_for_termination()
                 get_task_backend().shutdown(wait=False)
+                get_bookkeeping_writer().stop()
 
                 shutdown_event.set()
                 self.termination_event.set()
@@ -185,7 +208,7 @@ def create_server(
 
     shared_dirs.create()
 
-    migrate()
+    migrate(premis_settings.DB_TEMPLATE_DIRECTORY)
     update_agents()
 
     Job.cleanup_old_db_entries()
@@ -194,7 +217,7 @@ def create_server(
     metrics.init_labels(workflow)
     metrics.start_prometheus_server()
 
-    return Server(
+    server = Server(
         bind_address,
         server_credentials,
         workflow,
@@ -203,8 +226,14 @@ def create_server(
         concurrent.futures.ThreadPoolExecutor(max_workers=queue_workers),
         concurrent.futures.ThreadPoolExecutor(max_workers=grpc_workers),
         debug,
+        # Leave threads to the other RPCs, e.g. the workers leasing tasks.
+        max_watchers=max(1, grpc_workers // 2),
     )
 
+    Package.resume_packages(server.queue, workflow)
+
+    return server
+
 
 def update_agents():
     """Create or update software and organization agents."""
@@ -0,0 +1,168 @@
+"""
+Scheduling policies for packages waiting to be processed.
+
+When `PackageQueue` is at capacity, jobs of new packages are deferred until
+an active package completes. The scheduling policy decides which of the
+waiting packages goes next:
+
+* ``fifo``: in order of arrival.
+* ``shortest``: smallest estimated package first (see
+  `Package.measure`), so small transfers are not stuck behind large ones. Packages waiting longer than ``MAX_WAIT`` seconds go first so large
+  packages are not starved.
+* ``fair``: weighted fair share between submitters (see the ``submitter``
+  attribute of ``SubmitRequest``), i.e. stride scheduling over one FIFO queue
+  per submitter.
+
+Policies are not thread-safe, `PackageQueue` guards them with its lock.
+"""
+
+import abc
+import collections
+import itertools
+import math
+import time
+
+from django.conf import settings
+
+
+class SchedulingPolicy(metaclass=abc.ABCMeta):
+    """Holds jobs of packages waiting for a slot."""
+
+    def prepare(self, job):
+        """Hook called before `push`, without holding the queue lock.
+
+        Policies can use it to compute expensive properties of the package.
+        """
+
+    @abc.abstractmethod
+    def push(self, job):
+        """Add a job."""
+
+    @abc.abstractmethod
+    def pop(self):
+        """Remove and return the next job, or None if there are none."""
+
+    @abc.abstractmethod
+    def __len__(self):
+        """Number of jobs waiting."""
+
+
+class FIFOPolicy(SchedulingPolicy):
+    def __init__(self):
+        self.jobs = collections.deque()
+
+    def push(self, job):
+        self.jobs.append(job)
+
+    def pop(self):
+        try:
+            return self.jobs.popleft()
+        except IndexError:
+            return None
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+class ShortestFirstPolicy(SchedulingPolicy):
+    # Cost of a file in bytes. Per-file microservices dominate the processing
+    # time of packages with many small files.
+    FILE_COST = 1_000_000
+
+    # Seconds a package can wait before it is released regardless of its size.
+    MAX_WAIT = 3600
+
+    def __init__(self, max_wait=MAX_WAIT):
+        self.max_wait = max_wait
+        self.counter = itertools.count()
+        self.jobs = []  # (cost, seq, queued at, job)
+
+    @classmethod
+    def cost(cls, package):
+        size = package.estimated_size
+        if size is None:
+            return math.inf
+        return size.bytes + size.files * cls.FILE_COST
+
+    def prepare(self, job):
+        # Measure the package now, not while holding the lock.
+        job.package.measure()
+
+    def push(self, job):
+        self.jobs.append(
+            (self.cost(job.package), next(self.counter), time.monotonic(), job)
+        )
+
+    def pop(self):
+        # Linear scans are fine, packages are popped once and queues are short.
+        if not self.jobs:
+            return None
+        oldest = min(self.jobs, key=lambda item: item[1])
+        if time.monotonic() - oldest[2] >= self.max_wait:
+            item = oldest
+        else:
+            item = min(self.jobs, key=lambda item: item[:2])
+        self.jobs.remove(item)
+        return item[3]
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+class FairSharePolicy(SchedulingPolicy):
+    def __init__(self, weights=None):
+        self.weights = weights or {}
+        self.queues = {}  # submitter: deque of jobs
+        self.passes = {}  # submitter: virtual time of its next job
+        self.virtual_time = 0.0
+
+    def push(self, job):
+        submitter = job.package.submitter
+        jobs = self.queues.setdefault(submitter, collections.deque())
+        if not jobs:
+            # Idle submitters do not accumulate credit.
+            self.passes[submitter] = max(
+                self.passes.get(submitter, 0.0), self.virtual_time
+            )
+        jobs.append(job)
+
+    def pop(self):
+        waiting = [submitter for submitter, jobs in self.queues.items() if jobs]
+        if not waiting:
+            return None
+        submitter = min(waiting, key=lambda item: self.passes[item])
+        self.virtual_time = self.passes[submitter]
+        self.passes[submitter] += 1 / self.weights.get(submitter, 1)
+        return self.queues[submitter].popleft()
+
+    def __len__(self):
+        return sum(len(jobs) for jobs in self.queues.values())
+
+
+def parse_weights(value):
+    """Parse weights given as a string, e.g. "archive:3, lab:1"."""
+    weights = {}
+    for item in value.split(","):
+        submitter, sep, weight = item.strip().rpartition(":")
+        if not sep:
+            continue
+        try:
+            weights[submitter.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid submitter weight: {item!r}")
+        if weights[submitter.strip()] <= 0:
+            raise ValueError(f"Submitter weights must be positive: {item!r}")
+    return weights
+
+
+def get_scheduling_policy(name=None):
+    """Return a new instance of the scheduling policy given by name."""
+    if name is None:
+        name = settings.SCHEDULING_POLICY
+    if name == "fifo":
+        return FIFOPolicy()
+    if name == "shortest":
+        return ShortestFirstPolicy()
+    if name == "fair":
+        return FairSharePolicy(parse_weights(settings.SUBMITTER_WEIGHTS))
+    raise ValueError(f"Unknown scheduling policy: {name}")
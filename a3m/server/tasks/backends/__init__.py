@@ -2,25 +2,31 @@
 Handle offloading of Task objects to MCP Client for processing.
 """
 
+from django.conf import settings
+
 from a3m.server.tasks.backends.base import TaskBackend
 from a3m.server.tasks.backends.pool_backend import PoolTaskBackend
+from a3m.server.tasks.backends.remote_backend import RemoteTaskBackend
 
-# This could be a configuration setting.
-DEFAULT_BACKEND = PoolTaskBackend
+BACKENDS = {
+    "pool": PoolTaskBackend,
+    "remote": RemoteTaskBackend,
+}
 
 # Backend is shared across all threads.
 backend_global = None
 
 
 def get_task_backend():
-    """Return the backend for processing tasks."""
-    if DEFAULT_BACKEND == PoolTaskBackend:
-        global backend_global
-        if backend_global is None:
-            backend_global = PoolTaskBackend()
-        return backend_global
-
-    raise RuntimeError("Unsupported task backend")
-
-
-__all__ = ("PoolTaskBackend", "TaskBackend", "get_task_backend")
+    """Return the backend for processing tasks, see the TASK_BACKEND setting."""
+    global backend_global
+    if backend_global is None:
+        try:
+            backend_class = BACKENDS[settings.TASK_BACKEND]
+        except KeyError:
+            raise RuntimeError("Unsupported task backend")
+        backend_global = backend_class()
+    return backend_global
+
+
+__all__ = ("PoolTaskBackend", "RemoteTaskBackend", "TaskBackend", "get_task_backend")
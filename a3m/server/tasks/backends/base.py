@@ -12,11 +12,20 @@ class TaskBackend(metaclass=abc.ABCMeta):
     #
     # Setting this too large will use more memory; setting it too small will
     # hurt throughput.  So the trick is to set it juuuust right.
+    #
+    # Backends may adjust it per script, e.g. see `BatchSizer`.
     TASK_BATCH_SIZE = settings.BATCH_SIZE
 
+    # Set by `shutdown`, the results of pending tasks are failures then.
+    stopped = False
+
     @abc.abstractmethod
     def submit_task(self, job, task):
-        """Submit a task as part of the job given, for offline processing."""
+        """Submit a task as part of the job given, for offline processing.
+
+        Backends may start processing tasks before `wait_for_results` is
+        called, and may block the caller to apply backpressure.
+        """
 
     @abc.abstractmethod
     def wait_for_results(self, job):
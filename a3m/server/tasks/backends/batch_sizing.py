@@ -0,0 +1,65 @@
+"""
+Adaptive sizing of task batches.
+
+Some scripts take milliseconds per file (e.g. file format identification),
+others take minutes (e.g. normalization). `BatchSizer` keeps a moving average
+of the time it takes to run a task of each script and uses it to size batches
+so they take about the same wall-clock time. Slow scripts get small batches
+that spread across workers, fast scripts get large batches that amortize the
+cost of dispatching them.
+"""
+
+import threading
+
+from a3m.server import metrics
+
+
+class BatchSizer:
+    # Weight given to the latest observation in the moving average.
+    SMOOTHING = 0.3
+
+    # How much larger than the configured size a batch is allowed to grow.
+    MAX_SIZE_FACTOR = 8
+
+    def __init__(self, target_duration):
+        self.target_duration = target_duration
+        self.lock = threading.Lock()
+        self.task_durations = {}  # script name: average seconds per task
+
+    def get_size(self, script_name, default_size):
+        """Return the size of the next batch of tasks for the given script.
+
+        ``default_size`` is used until we know how long tasks take, or if
+        adaptive sizing is disabled (``target_duration`` is zero).
+        """
+        if self.target_duration <= 0:
+            return default_size
+
+        with self.lock:
+            task_duration = self.task_durations.get(script_name)
+
+        max_size = default_size * self.MAX_SIZE_FACTOR
+        if task_duration is None:
+            size = default_size
+        elif task_duration <= 0:
+            size = max_size
+        else:
+            size = int(self.target_duration / task_duration)
+        size = min(max(size, 1), max_size)
+
+        metrics.task_batch_size_gauge.labels(script_name=script_name).set(size)
+
+        return size
+
+    def observe(self, script_name, duration, task_count):
+        """Record the time it took to run a batch of ``task_count`` tasks."""
+        if task_count < 1:
+            return
+        task_duration = duration / task_count
+        with self.lock:
+            average = self.task_durations.get(script_name)
+            if average is None:
+                average = task_duration
+            else:
+                average += self.SMOOTHING * (task_duration - average)
+            self.task_durations[script_name] = average
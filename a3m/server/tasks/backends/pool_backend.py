@@ -3,56 +3,123 @@ Built-in task backend. Submits `Task` objects to a local pool of processes for
 processing, and returns results.
 """
 
+import functools
+import importlib
 import logging
+import multiprocessing
+import pkgutil
+import threading
+import time
 import uuid
 from concurrent import futures
 
+import django
+from django.conf import settings
+
+from a3m import tracing
+from a3m.client import clientScripts
 from a3m.client.mcp import execute_command
+from a3m.client.mcp import fail_all_tasks
 from a3m.client.metrics import init_counter_labels
 from a3m.server import metrics
 from a3m.server.db import auto_close_old_connections
 from a3m.server.jobs import Job
 from a3m.server.tasks.backends.base import TaskBackend
+from a3m.server.tasks.backends.batch_sizing import BatchSizer
 from a3m.server.tasks.task import Task
 
 logger = logging.getLogger(__name__)
 
 
+def init_worker(logging_disable_level=logging.NOTSET):
+    """Prepare a worker process before it runs its first batch.
+
+    Worker processes are spawned, i.e. they do not inherit the state of the
+    server. We set up Django, which gives the worker its own database
+    connection, and import all the client scripts upfront so the first batch
+    of every script does not pay for it.
+    """
+    django.setup()
+
+    # Honour ``logging.disable`` calls made by the parent, e.g. the CLI.
+    logging.disable(logging_disable_level)
+
+    for module_info in pkgutil.iter_modules(clientScripts.__path__):
+        module_name = f"{clientScripts.__name__}.{module_info.name}"
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            # Tasks will fail when the module is needed, let them report it.
+            logger.warning("Unable to import client script %s", module_name)
+
+
+def run_batch(job_name: str, batch_payload):
+    """Run a batch of tasks. It may be executed in a worker process.
+
+    Returns the results and the time it took to produce them.
+    """
+    start_time = time.monotonic()
+    with auto_close_old_connections():
+        results = execute_command(job_name, batch_payload)
+    return results, time.monotonic() - start_time
+
+
 class PoolTaskBatch:
-    def __init__(self):
+    def __init__(self, size):
         self.uuid = uuid.uuid4()
+        self.size = size
         self.tasks = []
+        self.payload = None
         self.future = None
 
     def __len__(self):
         return len(self.tasks)
 
-    def serialize_task(self, task: Task):
+    def serialize_task(self, task: Task, job):
         return {
             "uuid": str(task.uuid),
             "createdDate": task.start_timestamp.isoformat(" "),
             "arguments": task.arguments,
             "wants_output": task.wants_output,
             "execute": task.execute,
+            "jobUUID": str(job.uuid),
+            "fileUUID": task.file_uuid,
+            "fileName": task.file_name,
         }
 
     def add_task(self, task: Task):
         self.tasks.append(task)
 
-    @auto_close_old_connections()
-    def run(self, job_name: str, batch_payload):
-        result = execute_command(job_name, batch_payload)
-        return self, result
+    def is_full(self):
+        return len(self.tasks) >= self.size
 
     def submit(self, executor, job):
-        data = {
-            "tasks": {str(task.uuid): self.serialize_task(task) for task in self.tasks}
+        self.payload = {
+            "tasks": {
+                str(task.uuid): self.serialize_task(task, job) for task in self.tasks
+            }
         }
 
-        self.future = executor.submit(self.run, job.name, data)
+        self.future = executor.submit(run_batch, job.name, self.payload)
 
         logger.debug("Submitted pool job %s (%s)", self.uuid, job.name)
 
+    def result(self):
+        """Block until the batch is processed and return its results.
+
+        If the worker running the batch died, or the batch was cancelled by a
+        shutdown, all tasks are marked as failed.
+        """
+        try:
+            results, _ = self.future.result()
+            return results
+        except futures.BrokenExecutor as err:
+            logger.error("Worker died while processing batch %s", self.uuid)
+            return fail_all_tasks(self.payload, err)
+        except futures.CancelledError:
+            logger.error("Batch %s cancelled by shutdown", self.uuid)
+            return fail_all_tasks(self.payload, "Batch cancelled by shutdown.")
+
     def save(self, job):
         Task.bulk_log(self.tasks, job)
 
@@ -79,35 +146,85 @@ class PoolTaskBatch:
 class PoolTaskBackend(TaskBackend):
     """Submits tasks to the pool.
 
-    Tasks are batched into BATCH_SIZE groups (default 128) and sent to the
-    client. This adds some complexity but saves a lot of overhead.
+    Tasks are batched into groups and sent to the client. This adds some
+    complexity but saves a lot of overhead. Batches start with BATCH_SIZE
+    tasks (default 128) and are then sized after the observed duration of the
+    tasks of each script, see `BatchSizer`.
+
+    With ``worker_processes`` set, batches are run by a pool of worker
+    processes so batches of the same or different jobs are processed in
+    parallel. Otherwise, batches run one at a time in a thread of the server
+    process, which is what we want with SQLite.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        worker_processes=None,
+        max_in_flight_batches=None,
+        batch_target_duration=None,
+    ):
         init_counter_labels()
 
-        # Having multiple threads would be equivalent to deploying multiple
-        # MCPClient instances in Archivematica which is known to be problematic.
-        # Let's stick to one for now.
-        self.executor = futures.ThreadPoolExecutor(max_workers=1)
+        if worker_processes is None:
+            worker_processes = settings.WORKER_PROCESSES
+        self.worker_processes = worker_processes
+
+        # Batches are submitted as soon as they are full, while the job is
+        # still generating tasks. This bounds how far ahead of the workers a
+        # job can get before `submit_task` blocks.
+        if max_in_flight_batches is None:
+            max_in_flight_batches = max(self.worker_processes, 1) * 2
+        self.max_in_flight_batches = max_in_flight_batches
+
+        # Batches are sized after the duration of the tasks of each script,
+        # using TASK_BATCH_SIZE as the starting point.
+        if batch_target_duration is None:
+            batch_target_duration = settings.BATCH_TARGET_DURATION
+        self.batch_sizer = BatchSizer(batch_target_duration)
+
+        self.executor_lock = threading.Lock()
+        self.executor = self._create_executor()
 
         self.current_task_batches = {}  # job_uuid: PoolTaskBatch
         self.pending_jobs = {}  # job_uuid: List[PoolTaskBatch]
-        self.batches_to_submit = {}  # job_uuid: List[PoolTaskBatch]
+
+    def _create_executor(self):
+        if self.worker_processes < 1:
+            # Having multiple threads would be equivalent to deploying multiple
+            # MCPClient instances in Archivematica which is known to be
+            # problematic. Let's stick to one.
+            return futures.ThreadPoolExecutor(max_workers=1)
+
+        # Spawn workers: forking a process with running threads is unsafe.
+        return futures.ProcessPoolExecutor(
+            max_workers=self.worker_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(logging.root.manager.disable,),
+        )
 
     def submit_task(self, job: Job, task: Task):
-        current_task_batch = self._get_current_task_batch(job.uuid)
+        current_task_batch = self._get_current_task_batch(job)
         if len(current_task_batch) == 0:
             metrics.gearman_pending_jobs_gauge.inc()
 
         current_task_batch.add_task(task)
 
-        # If we've hit TASK_BATCH_SIZE, save the batch
-        if (len(current_task_batch) % self.TASK_BATCH_SIZE) == 0:
-            self._save_batch(job, current_task_batch)
+        # If the batch is full, send it off
+        if current_task_batch.is_full():
+            self._flush_batch(job, current_task_batch)
 
     def wait_for_results(self, job):
-        self._submit_batches(job)
+        """Yield the tasks of the job given once processed.
+
+        Batches may complete in any order, but tasks are returned in the order
+        they were submitted.
+        """
+        # Send whatever is left in the last, partially filled batch.
+        current_task_batch = self.current_task_batches.get(job.uuid)
+        if current_task_batch is not None:
+            self._flush_batch(job, current_task_batch)
+
         try:
             pending_batches = self.pending_jobs[job.uuid]
         except KeyError:
@@ -115,45 +232,60 @@ class PoolTaskBackend(TaskBackend):
             return
 
         # Wait for all batches to complete.
-        futs = [item.future for item in pending_batches]
-        for future in futures.as_completed(futs):
-            batch, results = future.result()
+        for batch in pending_batches:
+            results = batch.result()
+            tracing.add_events(results.get("spans", ()))
             yield from batch.update_task_results(results)
             metrics.gearman_active_jobs_gauge.dec()
 
         # Once we've gotten results for all job tasks, clear the batches
         del self.pending_jobs[job.uuid]
 
-    def _get_current_task_batch(self, job_uuid) -> PoolTaskBatch:
+    def _get_current_task_batch(self, job) -> PoolTaskBatch:
         try:
-            return self.current_task_batches[job_uuid]
+            return self.current_task_batches[job.uuid]
         except KeyError:
-            self.current_task_batches[job_uuid] = PoolTaskBatch()
-            return self.current_task_batches[job_uuid]
-
-    def _save_batch(self, job, task_batch):
-        task_batch.save(job)
-        if job.uuid not in self.batches_to_submit:
-            self.batches_to_submit[job.uuid] = []
-        self.batches_to_submit[job.uuid].append(task_batch)
+            size = self.batch_sizer.get_size(job.name, self.TASK_BATCH_SIZE)
+            self.current_task_batches[job.uuid] = PoolTaskBatch(size)
+            return self.current_task_batches[job.uuid]
+
+    def _flush_batch(self, job, task_batch):
+        """Save the batch and submit it for processing."""
         del self.current_task_batches[job.uuid]
 
-    def _submit_batches(self, job: Job):
-        # Check if we have anything for this job that hasn't been saved
-        current_task_batch = self._get_current_task_batch(job.uuid)
-        if len(current_task_batch) > 0:
-            self._save_batch(job, current_task_batch)
+        with tracing.span("Submit batch", tracing.SUBMIT, tasks=len(task_batch)):
+            # Queued, the client records the tasks if they are not written yet.
+            task_batch.save(job)
+
+            self._wait_for_capacity(job)
+            self._submit_batch(job, task_batch)
 
-        # Submit all saved batches
-        if job.uuid in self.batches_to_submit:
-            for task_batch in self.batches_to_submit[job.uuid]:
-                self._submit_batch(job, task_batch)
+    def _wait_for_capacity(self, job):
+        """Block while the job has too many batches in flight."""
+        in_flight = [
+            batch.future
+            for batch in self.pending_jobs.get(job.uuid, [])
+            if not batch.future.done()
+        ]
+        while len(in_flight) >= self.max_in_flight_batches:
+            _, not_done = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            in_flight = list(not_done)
 
     def _submit_batch(self, job, task_batch):
         if len(task_batch) == 0:
             return
 
-        task_batch.submit(self.executor, job)
+        with self.executor_lock:
+            try:
+                task_batch.submit(self.executor, job)
+            except futures.process.BrokenProcessPool:
+                logger.warning("Worker pool is not usable, starting a new one.")
+                self.executor = self._create_executor()
+                task_batch.submit(self.executor, job)
+
+        task_batch.future.add_done_callback(
+            functools.partial(self._batch_done_callback, job.name, len(task_batch))
+        )
 
         metrics.gearman_active_jobs_gauge.inc()
         metrics.gearman_pending_jobs_gauge.dec()
@@ -162,5 +294,13 @@ class PoolTaskBackend(TaskBackend):
             self.pending_jobs[job.uuid] = []
         self.pending_jobs[job.uuid].append(task_batch)
 
+    def _batch_done_callback(self, job_name, task_count, future):
+        """Feed the duration of the batch back to the batch sizer."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, duration = future.result()
+        self.batch_sizer.observe(job_name, duration, task_count)
+
     def shutdown(self, wait=True):
+        self.stopped = True
         self.executor.shutdown(wait)
@@ -0,0 +1,187 @@
+"""
+Remote task backend. Batches of tasks are processed by worker processes that
+connect to the server, possibly from other hosts, see `a3m.client.worker`.
+
+Workers lease batches via the WorkerService API. A lease expires unless the
+worker renews it with heartbeats, e.g. because the worker died, and then the
+batch is dispatched again. Leases are checked by a background thread, so that
+batches are given up on even if no worker asks for work anymore.
+"""
+
+import collections
+import logging
+import threading
+import time
+import uuid
+from concurrent import futures
+
+from django.conf import settings
+
+from a3m.server.tasks.backends.pool_backend import PoolTaskBackend
+from a3m.server.tasks.backends.pool_backend import run_batch
+
+logger = logging.getLogger(__name__)
+
+
+class BatchLost(futures.BrokenExecutor):
+    """Raised when a batch could not be processed by any worker."""
+
+
+class Lease:
+    def __init__(self, future, job_name, payload):
+        self.id = None
+        self.future = future
+        self.job_name = job_name
+        self.payload = payload
+        self.worker_id = None
+        self.expires_at = None
+        self.attempts = 0
+
+
+class BatchDispatcher(futures.Executor):
+    """Executor that hands batches out to remote workers.
+
+    Batches submitted wait in a queue until a worker leases them. The future
+    returned by `submit` completes when the worker reports the results.
+    """
+
+    # Times a batch is leased before we give up on it.
+    MAX_ATTEMPTS = 3
+    # Seconds between checks of the leases, at most.
+    EXPIRY_INTERVAL = 5
+
+    def __init__(self, lease_duration):
+        self.lease_duration = lease_duration
+        self.lock = threading.Lock()
+        self.pending = collections.deque()  # Lease
+        self.leases = {}  # lease_id: Lease
+        self._shutdown = False
+
+        self.shutdown_event = threading.Event()
+        self.expiry_thread = threading.Thread(
+            target=self._expire_leases_periodically,
+            name="lease-expiry",
+            daemon=True,
+        )
+        self.expiry_thread.start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Queue a batch for the workers.
+
+        Only `run_batch` is supported, which the workers run with the same
+        arguments.
+        """
+        if fn is not run_batch:
+            raise ValueError("Remote workers can only run batches.")
+        job_name, payload = args
+
+        future = futures.Future()
+        with self.lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit batches after shutdown.")
+            self.pending.append(Lease(future, job_name, payload))
+
+        return future
+
+    def lease(self, worker_id):
+        """Return the next batch waiting to be processed, or None."""
+        with self.lock:
+            self._expire_leases()
+
+            while self.pending:
+                lease = self.pending.popleft()
+                if (
+                    lease.attempts == 0
+                    and not lease.future.set_running_or_notify_cancel()
+                ):
+                    continue  # Cancelled.
+                lease.id = str(uuid.uuid4())
+                lease.worker_id = worker_id
+                lease.expires_at = time.monotonic() + self.lease_duration
+                lease.attempts += 1
+                self.leases[lease.id] = lease
+                return lease
+
+    def heartbeat(self, lease_id):
+        """Renew a lease. Return False if it is no longer valid."""
+        with self.lock:
+            lease = self.leases.get(lease_id)
+            if lease is None:
+                return False
+            lease.expires_at = time.monotonic() + self.lease_duration
+            return True
+
+    def complete(self, lease_id, results, duration):
+        """Complete the batch of a lease. Return False if it is no longer valid."""
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+        if lease is None:
+            return False
+        lease.future.set_result((results, duration))
+        return True
+
+    def _expire_leases_periodically(self):
+        interval = min(self.EXPIRY_INTERVAL, self.lease_duration)
+        while not self.shutdown_event.wait(interval):
+            with self.lock:
+                self._expire_leases()
+
+    def _expire_leases(self):
+        """Dispatch again the batches of expired leases."""
+        now = time.monotonic()
+        expired = [lease for lease in self.leases.values() if lease.expires_at < now]
+        for lease in expired:
+            del self.leases[lease.id]
+            logger.warning(
+                "Lease %s of worker %s expired (attempt %s of %s)",
+                lease.id,
+                lease.worker_id,
+                lease.attempts,
+                self.MAX_ATTEMPTS,
+            )
+            if lease.attempts >= self.MAX_ATTEMPTS:
+                lease.future.set_exception(
+                    BatchLost(f"Batch leased {lease.attempts} times without results.")
+                )
+            else:
+                # Go first, the batch has been waiting the longest.
+                self.pending.appendleft(lease)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Cancel all batches, workers cannot report results after shutdown.
+
+        Their tasks are marked as failed and the jobs waiting for them are
+        interrupted, they are resumed on restart.
+        """
+        with self.lock:
+            self._shutdown = True
+            for lease in [*self.pending, *self.leases.values()]:
+                if not lease.future.cancel():  # Already running.
+                    lease.future.set_exception(futures.CancelledError())
+            self.pending.clear()
+            self.leases.clear()
+        self.shutdown_event.set()
+        if wait:
+            self.expiry_thread.join()
+
+
+class RemoteTaskBackend(PoolTaskBackend):
+    """Submits tasks to remote workers.
+
+    Tasks are batched like in `PoolTaskBackend`, but batches are processed by
+    workers connected to the WorkerService API.
+    """
+
+    # Workers are not known in advance, allow for plenty of them.
+    MAX_IN_FLIGHT_BATCHES = 64
+
+    def __init__(self, lease_duration=None, **kwargs):
+        if lease_duration is None:
+            lease_duration = settings.WORKER_LEASE_DURATION
+        self.dispatcher = BatchDispatcher(lease_duration)
+
+        kwargs.setdefault("max_in_flight_batches", self.MAX_IN_FLIGHT_BATCHES)
+        super().__init__(**kwargs)
+
+    def _create_executor(self):
+        return self.dispatcher
@@ -12,6 +12,7 @@ import uuid
 from django.utils import timezone
 
 from a3m.main import models
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.db import auto_close_old_connections
 
 logger = logging.getLogger(__name__)
@@ -56,40 +57,43 @@ class Task:
             self.uuid, self.execute, self.arguments, self.start_timestamp, self.done
         )
 
+    @property
+    def file_uuid(self):
+        return self.context.get(r"%fileUUID%", "")
+
+    @property
+    def file_name(self):
+        return os.path.basename(os.path.abspath(self.context[r"%relativeLocation%"]))
+
     @classmethod
     @auto_close_old_connections()
     def cleanup_old_db_entries(cls):
         """Update the status of any in progress tasks.
 
-        This command is run on startup.
-        TODO: we could try to recover, instead of just failing.
+        This command is run on startup. Tasks that completed before the
+        shutdown keep their results, resumed jobs can skip them.
         """
         models.Task.objects.filter(exitcode=None).update(
             exitcode=-1, stderror="MCP shut down while processing."
         )
 
     @classmethod
-    @auto_close_old_connections()
     def bulk_log(self, tasks, job):
-        """Log tasks to the database, in bulk."""
-        model_objects = [task.to_db_model(job) for task in tasks]
-        models.Task.objects.bulk_create(model_objects)
+        """Log tasks to the database, in bulk.
+
+        Tasks are queued, see `a3m.server.bookkeeping`. The client scripts
+        record the tasks with their results if they are not written yet.
+        """
+        get_bookkeeping_writer().create_tasks([task.to_db_model(job) for task in tasks])
 
     def to_db_model(self, job):
         """Returns an instance of the `Task` Django model."""
-        job_uuid = job.uuid
-        file_uuid = self.context.get(r"%fileUUID%", "")
-        task_exec = job.link.config.get("execute")
-        file_name = os.path.basename(
-            os.path.abspath(self.context[r"%relativeLocation%"])
-        )
-
         return models.Task(
             taskuuid=self.uuid,
-            job_id=job_uuid,
-            fileuuid=file_uuid,
-            filename=file_name,
-            execution=task_exec,
+            job_id=job.uuid,
+            fileuuid=self.file_uuid,
+            filename=self.file_name,
+            execution=job.link.config.get("execute"),
             arguments=self.arguments,
             createdtime=self.start_timestamp,
         )
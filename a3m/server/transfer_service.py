@@ -1,11 +1,14 @@
 import logging
+import threading
 
+import grpc
 from google.protobuf import timestamp_pb2
 from google.rpc import code_pb2
 
 from a3m.api.transferservice import v1beta1 as transfer_service_api
 from a3m.main.models import Task
 from a3m.server import shared_dirs
+from a3m.server.bookkeeping import get_bookkeeping_writer
 from a3m.server.packages import Package
 from a3m.server.packages import PackageNotFoundError
 from a3m.server.packages import get_package_status
@@ -14,10 +17,17 @@ logger = logging.getLogger(__name__)
 
 
 class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServicer):
-    def __init__(self, workflow, package_queue, executor):
+    def __init__(self, workflow, package_queue, executor, max_watchers=None):
         self.workflow = workflow
         self.package_queue = package_queue
         self.executor = executor
+        # Every Watch stream holds a thread of the gRPC server until the
+        # package finishes, the others are left to the other RPCs.
+        self.watch_slots = (
+            threading.BoundedSemaphore(max_watchers)
+            if max_watchers is not None
+            else None
+        )
 
     def Submit(self, request, context):
         config = request.config if request.HasField("config") else None
@@ -29,6 +39,7 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
                 request.name,
                 request.url,
                 config,
+                submitter=request.submitter,
             )
         except Exception as err:
             logger.warning("TransferService.Submit handler error: %s", err)
@@ -39,7 +50,9 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
 
     def Read(self, request, context):
         try:
-            package_status = get_package_status(self.package_queue, request.id)
+            package_status = get_package_status(
+                self.package_queue, request.id, include_jobs=request.include_jobs
+            )
         except PackageNotFoundError:
             context.abort(code_pb2.NOT_FOUND, "Package not found")
         except Exception as err:
@@ -54,10 +67,65 @@ class TransferService(transfer_service_api.service_pb2_grpc.TransferServiceServi
             resp.jobs.extend(package_status.jobs)
         return resp
 
+    def Watch(self, request, context):
+        if self.watch_slots is None:
+            yield from self._watch(request, context)
+            return
+        if not self.watch_slots.acquire(blocking=False):
+            # A status code the client understands, it polls instead.
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+        try:
+            yield from self._watch(request, context)
+        finally:
+            self.watch_slots.release()
+
+    def _watch(self, request, context):
+        with self.package_queue.watchers.watch(request.id) as events:
+            # Wake up when the client goes away.
+            context.add_callback(lambda: events.put(None))
+
+            # Subscribed before reading the status so no events are missed.
+            package_status = self._get_package_status(request.id, context)
+            if (
+                package_status.status
+                != transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+            ):
+                yield self._package_finished_response(package_status)
+                return
+
+            while (event := events.get()) is not None:
+                if (
+                    event.type
+                    != transfer_service_api.request_response_pb2.WatchResponse.TYPE_PACKAGE_FINISHED
+                ):
+                    yield event
+                    continue
+                package_status = self._get_package_status(request.id, context)
+                yield self._package_finished_response(package_status)
+                return
+
+    def _get_package_status(self, package_id, context):
+        try:
+            return get_package_status(self.package_queue, package_id)
+        except PackageNotFoundError:
+            context.abort(code_pb2.NOT_FOUND, "Package not found")
+        except Exception as err:
+            logger.warning("TransferService.Watch handler error: %s", err)
+            context.abort(code_pb2.INTERNAL, "Unknown error")
+
+    @staticmethod
+    def _package_finished_response(package_status):
+        return transfer_service_api.request_response_pb2.WatchResponse(
+            type=transfer_service_api.request_response_pb2.WatchResponse.TYPE_PACKAGE_FINISHED,
+            status=package_status.status,
+        )
+
     def ListTasks(self, request, context):
         if not request.job_id:
             context.abort(code_pb2.INVALID_ARGUMENT, "job_id is mandatory")
         resp = transfer_service_api.request_response_pb2.ListTasksResponse()
+        # Include the tasks still queued.
+        get_bookkeeping_writer().flush()
         for item in Task.objects.filter(job_id=request.job_id):
             start_time = timestamp_pb2.Timestamp()
             start_time.FromDatetime(item.starttime)
@@ -0,0 +1,96 @@
+"""
+Package events, streamed to clients by the ``TransferService.Watch`` RPC.
+
+`PackageQueue` publishes an event when a job of a package starts or finishes
+and when the package finishes processing. Events are built from the jobs in
+memory, publishing them does not hit the database.
+"""
+
+import contextlib
+import queue
+import threading
+
+from a3m.api.transferservice import v1beta1 as transfer_service_api
+
+
+def job_to_proto(job, status=None):
+    """Encode a `Job` in memory, optionally overriding its status."""
+    message = transfer_service_api.request_response_pb2.Job(
+        id=str(job.uuid),
+        name=job.description,
+        group=job.group,
+        link_id=str(job.link.id),
+        status=job.status if status is None else status,
+    )
+    message.start_time.FromDatetime(job.created_at)
+    return message
+
+
+def job_started_event(job):
+    return transfer_service_api.request_response_pb2.WatchResponse(
+        type=transfer_service_api.request_response_pb2.WatchResponse.TYPE_JOB_STARTED,
+        job=job_to_proto(
+            job, transfer_service_api.request_response_pb2.Job.STATUS_PROCESSING
+        ),
+    )
+
+
+def job_finished_event(job, failed=False):
+    status = None
+    if failed:
+        status = transfer_service_api.request_response_pb2.Job.STATUS_FAILED
+    return transfer_service_api.request_response_pb2.WatchResponse(
+        type=transfer_service_api.request_response_pb2.WatchResponse.TYPE_JOB_FINISHED,
+        job=job_to_proto(job, status),
+    )
+
+
+def package_finished_event():
+    """The final status is looked up by the subscriber, see `TransferService`."""
+    return transfer_service_api.request_response_pb2.WatchResponse(
+        type=transfer_service_api.request_response_pb2.WatchResponse.TYPE_PACKAGE_FINISHED
+    )
+
+
+class PackageWatchers:
+    """Delivers the events of packages to the clients watching them.
+
+    Each watcher gets its own queue. Publishing never blocks, events are
+    dropped when nobody is watching the package.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watchers = {}  # package_id: set of queue.SimpleQueue
+
+    @contextlib.contextmanager
+    def watch(self, package_id):
+        """Subscribe to the events of a package until the context exits."""
+        package_id = str(package_id)
+        events = queue.SimpleQueue()
+        with self.lock:
+            self.watchers.setdefault(package_id, set()).add(events)
+        try:
+            yield events
+        finally:
+            with self.lock:
+                watchers = self.watchers[package_id]
+                watchers.discard(events)
+                if not watchers:
+                    del self.watchers[package_id]
+
+    def is_watched(self, package_id):
+        return str(package_id) in self.watchers
+
+    def publish(self, package_id, event_factory, *args):
+        """Deliver an event to the watchers of a package.
+
+        The event is only built by ``event_factory`` if the package is watched.
+        """
+        with self.lock:
+            watchers = list(self.watchers.get(str(package_id), ()))
+        if not watchers:
+            return
+        event = event_factory(*args)
+        for events in watchers:
+            events.put(event)
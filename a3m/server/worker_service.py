@@ -0,0 +1,92 @@
+import datetime
+import logging
+
+import grpc
+
+from a3m.api.workerservice import v1beta1 as worker_service_api
+
+logger = logging.getLogger(__name__)
+
+
+def lease_to_proto(lease, duration):
+    """Encode a lease of the `BatchDispatcher`, i.e. a batch of tasks."""
+    return worker_service_api.request_response_pb2.Lease(
+        id=lease.id,
+        job_name=lease.job_name,
+        tasks=[
+            worker_service_api.request_response_pb2.Task(
+                id=task["uuid"],
+                created_date=task["createdDate"],
+                arguments=task["arguments"],
+                wants_output=task["wants_output"],
+                execute=task["execute"],
+                job_id=task["jobUUID"],
+                file_uuid=task["fileUUID"],
+                file_name=task["fileName"],
+            )
+            for task in lease.payload["tasks"].values()
+        ],
+        duration=int(duration),
+    )
+
+
+def results_from_proto(results):
+    """Decode task results into the dict returned by `execute_command`."""
+    task_results = {}
+    for result in results:
+        task_result = {
+            "exitCode": result.exit_code,
+            "stdout": result.stdout,
+            "stderror": result.stderr,
+        }
+        if result.HasField("finished_time"):
+            task_result["finishedTimestamp"] = result.finished_time.ToDatetime(
+                tzinfo=datetime.timezone.utc
+            )
+        task_results[result.id] = task_result
+    return {"task_results": task_results}
+
+
+def spans_from_proto(spans):
+    """Decode trace events, see `a3m.tracing`."""
+    events = []
+    for span in spans:
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": span.start,
+            "dur": span.duration,
+            "pid": span.pid,
+            "tid": span.tid,
+        }
+        if span.args:
+            event["args"] = dict(span.args)
+        events.append(event)
+    return events
+
+
+class WorkerService(worker_service_api.service_pb2_grpc.WorkerServiceServicer):
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def LeaseBatch(self, request, context):
+        resp = worker_service_api.request_response_pb2.LeaseBatchResponse()
+        lease = self.dispatcher.lease(request.worker_id)
+        if lease is not None:
+            logger.debug("Worker %s leased %s", request.worker_id, lease.id)
+            resp.lease.CopyFrom(lease_to_proto(lease, self.dispatcher.lease_duration))
+        return resp
+
+    def Heartbeat(self, request, context):
+        if not self.dispatcher.heartbeat(request.lease_id):
+            context.abort(grpc.StatusCode.NOT_FOUND, "Lease not found")
+        return worker_service_api.request_response_pb2.HeartbeatResponse()
+
+    def CompleteBatch(self, request, context):
+        results = results_from_proto(request.results)
+        if request.spans:
+            results["spans"] = spans_from_proto(request.spans)
+        if not self.dispatcher.complete(request.lease_id, results, request.duration):
+            context.abort(grpc.StatusCode.NOT_FOUND, "Lease not found")
+        return worker_service_api.request_response_pb2.CompleteBatchResponse()
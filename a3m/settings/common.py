@@ -19,13 +19,44 @@ django_stubs_ext.monkeypatch()
 CONFIG_MAPPING = {
     "debug": {"section": "a3m", "option": "debug", "type": "boolean"},
     "batch_size": {"section": "a3m", "option": "batch_size", "type": "int"},
+    "batch_target_duration": {
+        "section": "a3m",
+        "option": "batch_target_duration",
+        "type": "float",
+    },
     "concurrent_packages": {
         "section": "a3m",
         "option": "concurrent_packages",
         "type": "int",
     },
+    "scheduling_policy": {
+        "section": "a3m",
+        "option": "scheduling_policy",
+        "type": "string",
+    },
+    "submitter_weights": {
+        "section": "a3m",
+        "option": "submitter_weights",
+        "type": "string",
+    },
     "rpc_threads": {"section": "a3m", "option": "rpc_threads", "type": "int"},
     "worker_threads": {"section": "a3m", "option": "worker_threads", "type": "int"},
+    "worker_processes": {
+        "section": "a3m",
+        "option": "worker_processes",
+        "type": "int",
+    },
+    "task_backend": {"section": "a3m", "option": "task_backend", "type": "string"},
+    "worker_lease_duration": {
+        "section": "a3m",
+        "option": "worker_lease_duration",
+        "type": "int",
+    },
+    "bookkeeping_flush_interval": {
+        "section": "a3m",
+        "option": "bookkeeping_flush_interval",
+        "type": "float",
+    },
     "shared_directory": {
         "section": "a3m",
         "option": "shared_directory",
@@ -47,6 +78,21 @@ CONFIG_MAPPING = {
         "option": "capture_client_script_output",
         "type": "boolean",
     },
+    "client_script_output_limit": {
+        "section": "a3m",
+        "option": "client_script_output_limit",
+        "type": "int",
+    },
+    "client_script_output_log": {
+        "section": "a3m",
+        "option": "client_script_output_log",
+        "type": "boolean",
+    },
+    "package_traces": {
+        "section": "a3m",
+        "option": "package_traces",
+        "type": "boolean",
+    },
     "removable_files": {
         "section": "a3m",
         "option": "removable_files",
@@ -70,6 +116,22 @@ CONFIG_MAPPING = {
     "db_password": {"section": "a3m", "option": "db_password", "type": "string"},
     "db_host": {"section": "a3m", "option": "db_host", "type": "string"},
     "db_port": {"section": "a3m", "option": "db_port", "type": "string"},
+    "db_template_directory": {
+        "section": "a3m",
+        "option": "db_template_directory",
+        "type": "string",
+    },
+    "sqlite_synchronous": {
+        "section": "a3m",
+        "option": "sqlite_synchronous",
+        "type": "string",
+    },
+    "sqlite_mmap_size": {"section": "a3m", "option": "sqlite_mmap_size", "type": "int"},
+    "sqlite_cache_size": {
+        "section": "a3m",
+        "option": "sqlite_cache_size",
+        "type": "int",
+    },
     "rpc_bind_address": {
         "section": "a3m",
         "option": "rpc_bind_address",
@@ -113,21 +175,34 @@ CONFIG_DEFAULTS = """[a3m]
 
 debug = False
 batch_size = 128
+batch_target_duration = 10
+scheduling_policy = fifo
+submitter_weights =
+task_backend = pool
+worker_lease_duration = 60
+bookkeeping_flush_interval = 1
 rpc_threads = 4
 prometheus_bind_address =
 prometheus_bind_port =
 time_zone = UTC
 capture_client_script_output = True
+client_script_output_limit = 1048576
+client_script_output_log = False
+package_traces = False
 removable_files = Thumbs.db, Icon, Icon\r, .DS_Store
 secret_key = 12345
 rpc_bind_address = 0.0.0.0:7000
 
-db_engine = django.db.backends.sqlite3
+db_engine = a3m.main.backends.sqlite3
 db_name =
 db_user =
 db_password =
 db_host =
 db_port =
+db_template_directory =
+sqlite_synchronous = normal
+sqlite_mmap_size = 268435456
+sqlite_cache_size = -65536
 
 s3_enabled = False
 s3_endpoint_url =
@@ -178,6 +253,9 @@ def _get_data_dir_defaults(config):
     if not config.get("db_name"):
         config_dict["a3m"].update({"db_name": data_dir / "db.sqlite"})
 
+    if not config.get("db_template_directory"):
+        config_dict["a3m"].update({"db_template_directory": data_dir / "templates"})
+
     # Create home directory if we're going to use it.
     if config_dict["a3m"]:
         data_dir.mkdir(parents=True, exist_ok=True)
@@ -206,6 +284,17 @@ DATABASES = {
     }
 }
 
+if DATABASES["default"]["ENGINE"] == "a3m.main.backends.sqlite3":
+    DATABASES["default"]["OPTIONS"].update(
+        {
+            "synchronous": config.get("sqlite_synchronous"),
+            "mmap_size": config.get("sqlite_mmap_size"),
+            "cache_size": config.get("sqlite_cache_size"),
+        }
+    )
+
+DB_TEMPLATE_DIRECTORY = config.get("db_template_directory")
+
 MIDDLEWARE_CLASSES = ()
 
 TEMPLATES = [{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
@@ -269,21 +358,42 @@ else:
 def concurrent_packages_default():
     """Default to 1/2 of CPU count, rounded up."""
     if "sqlite" in DATABASES["default"]["ENGINE"]:
-        # A3M-TODO: this needs to be investigated further, but having multiple
-        # writer in SQLite seems counterproductive.
+        # Client scripts hold the single writer for a whole batch, writes of
+        # other packages would time out waiting for it, see
+        # `a3m.main.backends.sqlite3`.
         return 1
     cpu_count = multiprocessing.cpu_count()
     return int(math.ceil(cpu_count / 2))
 
 
+def worker_processes_default():
+    """Default to one worker process per CPU, or none when using SQLite."""
+    if "sqlite" in DATABASES["default"]["ENGINE"]:
+        # Client scripts running in threads share the single writer of the
+        # server process, see `a3m.main.backends.sqlite3`, worker processes
+        # would compete for the database file lock.
+        return 0
+    return multiprocessing.cpu_count()
+
+
 BATCH_SIZE = config.get("batch_size")
+BATCH_TARGET_DURATION = config.get("batch_target_duration")
 CONCURRENT_PACKAGES = config.get(
     "concurrent_packages", default=concurrent_packages_default()
 )
+SCHEDULING_POLICY = config.get("scheduling_policy")
+SUBMITTER_WEIGHTS = config.get("submitter_weights")
 RPC_THREADS = config.get("rpc_threads")
 WORKER_THREADS = config.get("worker_threads", default=multiprocessing.cpu_count() + 1)
+WORKER_PROCESSES = config.get("worker_processes", default=worker_processes_default())
+TASK_BACKEND = config.get("task_backend")
+WORKER_LEASE_DURATION = config.get("worker_lease_duration")
+BOOKKEEPING_FLUSH_INTERVAL = config.get("bookkeeping_flush_interval")
 REMOVABLE_FILES = config.get("removable_files")
 CAPTURE_CLIENT_SCRIPT_OUTPUT = config.get("capture_client_script_output")
+CLIENT_SCRIPT_OUTPUT_LIMIT = config.get("client_script_output_limit")
+CLIENT_SCRIPT_OUTPUT_LOG = config.get("client_script_output_log")
+PACKAGE_TRACES = config.get("package_traces")
 DEFAULT_CHECKSUM_ALGORITHM = "sha256"
 RPC_BIND_ADDRESS = config.get("rpc_bind_address")
 
@@ -21,8 +21,12 @@ from .common import *
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "a3m.main.backends.sqlite3",
         "NAME": str(get_data_dir() / "db.sqlite"),
         "TEST": {"NAME": str(get_data_dir() / "dbtest.sqlite")},
     }
 }
+
+
+# Write job and task records synchronously.
+BOOKKEEPING_FLUSH_INTERVAL = 0
@@ -0,0 +1,259 @@
+"""
+Timing traces of the processing of packages.
+
+With ``PACKAGE_TRACES`` enabled, the engine records a span for every stage of
+a package: the time it waits in the queue, the jobs, the submission and the
+execution of batches of tasks, the writes of job records and the subprocesses
+run by client scripts. The trace of a package is written once it is done as a
+Chrome trace (``traceEvents`` JSON), which Perfetto or ``chrome://tracing``
+can open, and ``a3m-trace`` summarizes.
+
+Code records spans in the trace made current with `activate`::
+
+    with tracing.activate(package.trace):
+        with tracing.span("Flush", "db"):
+            ...
+
+`span` does nothing unless a trace is current, i.e. it is cheap to leave in
+code paths that run without tracing.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+# Categories of the spans recorded by the engine.
+QUEUE = "queue"
+JOB = "job"
+SUBMIT = "submit"
+BATCH = "batch"
+DB = "db"
+SUBPROCESS = "subprocess"
+
+
+class Trace:
+    """Spans recorded as Chrome trace complete events ("ph": "X").
+
+    Times are in microseconds since the epoch so that spans recorded by other
+    processes, e.g. workers, line up.
+    """
+
+    def __init__(self, events=None):
+        self.events = events if events is not None else []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        start_ns = time.time_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start_ns, time.time_ns(), **args)
+
+    def add_span(self, name, category, start_ns, end_ns, **args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns // 1000,
+            "dur": (end_ns - start_ns) // 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    def extend(self, events):
+        """Add events recorded elsewhere, e.g. by the client."""
+        with self.lock:
+            self.events.extend(events)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(path), prefix=".trace-", delete=False
+        ) as f:
+            json.dump(data, f)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        # Both the object and the bare array formats are valid.
+        events = data["traceEvents"] if isinstance(data, dict) else data
+        return cls([event for event in events if event.get("ph") == "X"])
+
+
+@contextlib.contextmanager
+def activate(trace):
+    """Make ``trace`` the current trace, None disables tracing."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def add_events(events):
+    """Add events recorded elsewhere to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None and events:
+        trace.extend(events)
+
+
+@contextlib.contextmanager
+def span(name, category, **args):
+    """Record a span in the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, category, **args):
+        yield
+
+
+class Span:
+    """A node of the tree of spans built by `build_tree`."""
+
+    __slots__ = ("event", "start", "end", "children", "parent")
+
+    def __init__(self, event):
+        self.event = event
+        self.start = event["ts"]
+        self.end = event["ts"] + event["dur"]
+        self.children = []
+        self.parent = None
+
+    @property
+    def name(self):
+        return self.event["name"]
+
+    @property
+    def category(self):
+        return self.event.get("cat", "")
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def self_time(self):
+        """Duration not covered by any of the children."""
+        covered, covered_until = 0, self.start
+        for child in sorted(self.children, key=lambda child: child.start):
+            start = max(child.start, covered_until)
+            end = min(child.end, self.end)
+            if end > start:
+                covered += end - start
+                covered_until = end
+        return self.duration - covered
+
+    def __repr__(self):
+        return f"Span({self.name!r}, {self.start}, {self.end})"
+
+
+def _nest(spans):
+    """Nest spans sorted by start time by containment, return the roots."""
+    roots, stack = [], []
+    for span in spans:
+        while stack and span.end > stack[-1].end:
+            stack.pop()
+        if stack:
+            span.parent = stack[-1]
+            stack[-1].children.append(span)
+        else:
+            roots.append(span)
+        stack.append(span)
+    return roots
+
+
+def build_tree(events):
+    """Return the root spans of the events of a trace.
+
+    Spans are nested by containment within each thread. Spans at the top of
+    the other threads, e.g. batches run by workers, are then attached to the
+    job they ran for, i.e. the shortest job containing them.
+    """
+    threads = {}
+    for event in sorted(events, key=lambda event: (event["ts"], -event["dur"])):
+        threads.setdefault((event.get("pid"), event.get("tid")), []).append(Span(event))
+
+    roots = []
+    for spans in threads.values():
+        roots.extend(_nest(spans))
+
+    jobs = [span for span in roots if span.category == JOB]
+    result = []
+    for span in roots:
+        parents = [
+            job
+            for job in jobs
+            if job is not span and job.start <= span.start and span.end <= job.end
+        ]
+        if span.category == JOB or not parents:
+            result.append(span)
+            continue
+        parent = min(parents, key=lambda job: job.duration)
+        span.parent = parent
+        parent.children.append(span)
+    return sorted(result, key=lambda span: span.start)
+
+
+def critical_path(roots):
+    """Return the spans that determine the duration of the trace.
+
+    Working backwards from the end, the path goes through the span that ends
+    last, then the span that ends last before it started, etc. Each span of
+    the path is followed by the critical path through its children. Items are
+    ``(depth, span)`` tuples, in order.
+    """
+    path = []
+
+    def walk(spans, end, depth):
+        segment = []
+        for span in sorted(
+            spans, key=lambda span: (span.end, span.duration), reverse=True
+        ):
+            if span.end <= end:
+                segment.append(span)
+                end = span.start
+        for span in reversed(segment):
+            path.append((depth, span))
+            walk(span.children, span.end, depth + 1)
+
+    if roots:
+        walk(roots, max(span.end for span in roots), 0)
+    return path
+
+
+def job_times(roots):
+    """Return the number, wall-clock and self time of the jobs by name.
+
+    The self time of a job is the time it did not spend running batches,
+    subprocesses or writing records, i.e. the overhead of the engine.
+    """
+    times = {}
+    pending = list(roots)
+    while pending:
+        span = pending.pop()
+        pending.extend(span.children)
+        if span.category != JOB:
+            continue
+        count, wall, self_time = times.get(span.name, (0, 0, 0))
+        times[span.name] = (count + 1, wall + span.duration, self_time + span.self_time)
+    return times
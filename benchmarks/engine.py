@@ -0,0 +1,466 @@
+"""
+Workflow engine overhead benchmark.
+
+It replays the default workflow (``workflow.json``) with every client script
+replaced by a stub, so that only the engine is measured: `PackageQueue`,
+`JobChain`, the jobs, `PoolTaskBackend` and the bookkeeping of jobs and tasks
+in the database, e.g.::
+
+    python -m benchmarks.engine --packages 2000 --files 20 \\
+        --concurrent-packages 16 --worker-threads 8 --latency 0.001
+
+The stubs do nothing but wait ``--latency`` seconds per task and exit. The
+stubs of the download and of the creation of the SIP write ``--files`` empty
+files in the package, which gives the links that run a task per file
+something to do.
+
+Results are printed as JSON:
+
+* the scheduling latency of every hop, i.e. the time from the moment a job
+  is scheduled to the moment it starts running, for the jobs of active
+  packages, and the admission latency, for the first job of packages waiting
+  for a slot,
+* the contention of the locks of the queue, the task backend and the
+  bookkeeping writer: how often acquiring them blocked and for how long,
+* the database statements made by each link, counting those made by the
+  stubbed client scripts. Records written in the background by the
+  bookkeeping writer are counted apart.
+
+Tasks run in threads (``WORKER_PROCESSES=0``) so that the stubs and the
+instrumentation apply to them.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextvars
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+
+from benchmarks.throughput import SUBMIT_ATTEMPTS
+from benchmarks.throughput import configure
+
+CLIENT_SCRIPTS = "a3m.client.clientScripts"
+
+# Exit codes of the stubs that are not zero, which takes the workflow to the
+# next link like the real scripts would, e.g. the transfer has no packages.
+EXIT_CODES = {"has_packages": 1}
+
+# Stubs that write the synthetic files of the package.
+DOWNLOAD_SCRIPT = "a3m_download_transfer"
+CREATE_SIP_SCRIPT = "create_sip_from_transfer_objects"
+
+# Database statements made outside of the jobs, by scope.
+SUBMIT_SCOPE = "(submit)"
+BOOKKEEPING_SCOPE = "(bookkeeping)"
+OTHER_SCOPE = "(other)"
+
+# Link processed by the current thread, inherited by the task threads.
+_current_link = contextvars.ContextVar("current_link", default=None)
+
+
+def write_files(directory, count):
+    objects = os.path.join(directory, "objects")
+    os.makedirs(objects, exist_ok=True)
+    for number in range(count):
+        with open(os.path.join(objects, f"file_{number}.txt"), "w"):
+            pass
+
+
+def stub_module(name, latency, files, ingest_directory):
+    """Return a client script module that only waits and exits."""
+    module = types.ModuleType(f"{CLIENT_SCRIPTS}.{name}")
+    exit_code = EXIT_CODES.get(name, 0)
+
+    def call(jobs):
+        for job in jobs:
+            if name == DOWNLOAD_SCRIPT:
+                # Arguments: transfer UUID, transfer directory, URL.
+                write_files(job.args[2], files)
+            elif name == CREATE_SIP_SCRIPT:
+                # Arguments: transfer UUID, SIP UUID.
+                write_files(os.path.join(ingest_directory, job.args[2]), files)
+            if latency:
+                time.sleep(latency)
+            job.set_status(exit_code)
+
+    module.call = call
+    return module
+
+
+def install_stubs(workflow, latency, files):
+    """Route the ``execute`` module of every link of the workflow to a stub."""
+    from django.conf import settings
+
+    ingest_directory = os.path.join(settings.PROCESSING_DIRECTORY, "ingest")
+    names = {
+        link.config["execute"]
+        for link in workflow.get_links().values()
+        if "execute" in link.config
+    }
+    # The module is looked up in ``sys.modules`` before it is imported.
+    for name in names:
+        sys.modules[f"{CLIENT_SCRIPTS}.{name}"] = stub_module(
+            name, latency, files, ingest_directory
+        )
+    return names
+
+
+class TimedLock:
+    """Wraps a lock and records how long acquiring it blocked.
+
+    Waits on a condition built on an ``RLock`` re-acquire it directly, those
+    are not recorded.
+    """
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_ns = 0
+        self.max_wait_ns = 0
+        # Used by ``threading.Condition``, see ``Condition.__init__``.
+        for name in ("_is_owned", "_release_save", "_acquire_restore"):
+            if hasattr(lock, name):
+                setattr(self, name, getattr(lock, name))
+
+    def acquire(self, blocking=True, timeout=-1):
+        wait_ns = 0
+        acquired = self._lock.acquire(False)
+        if not acquired and blocking:
+            start = time.perf_counter_ns()
+            acquired = self._lock.acquire(True, timeout)
+            wait_ns = time.perf_counter_ns() - start
+        if acquired:
+            # The lock is held, there is no need for another one.
+            self.acquisitions += 1
+            if wait_ns:
+                self.contended += 1
+                self.wait_ns += wait_ns
+                self.max_wait_ns = max(self.max_wait_ns, wait_ns)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def results(self):
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "contended_ratio": round(self.contended / max(self.acquisitions, 1), 4),
+            "wait_seconds": round(self.wait_ns / 1e9, 6),
+            "max_wait_ms": round(self.max_wait_ns / 1e6, 3),
+        }
+
+
+class ContextThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Runs the functions submitted in the context of the caller."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class LinkQueryCounter:
+    """Counts the database statements of this process by link."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        scope = _current_link.get()
+        if scope is None:
+            scope = (
+                BOOKKEEPING_SCOPE
+                if threading.current_thread().name == "bookkeeping"
+                else OTHER_SCOPE
+            )
+        with self.lock:
+            self.counts[scope] += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(self._connection_created, weak=False)
+
+    def _connection_created(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+
+def create_queue(executor, max_concurrent_packages, packages):
+    """Return a `PackageQueue` that records its scheduling latencies."""
+    from a3m.server.queues import PackageQueue
+
+    class BenchmarkQueue(PackageQueue):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.stats_lock = threading.Lock()
+            self.hops = collections.defaultdict(list)  # link id: [ns]
+            self.admissions = []  # ns
+            self.job_times = collections.defaultdict(list)  # link id: [ns]
+            self.descriptions = {}  # link id: description
+            self.started = 0
+            self.finished = 0
+            self.errors = 0
+            self.done = threading.Event()
+
+        def schedule_job(self, job):
+            job.benchmark_scheduled = (
+                time.perf_counter_ns(),
+                job.package.uuid in self.active_packages,
+            )
+            super().schedule_job(job)
+
+        def _run_job(self, job):
+            start = time.perf_counter_ns()
+            link_id = str(job.link.id)
+            scheduled, active = job.benchmark_scheduled
+            token = _current_link.set(link_id)
+            try:
+                return super()._run_job(job)
+            finally:
+                _current_link.reset(token)
+                end = time.perf_counter_ns()
+                with self.stats_lock:
+                    self.descriptions[link_id] = job.description
+                    self.job_times[link_id].append(end - start)
+                    if active:
+                        self.hops[link_id].append(start - scheduled)
+                    else:
+                        # Packages are queued before processing starts.
+                        self.admissions.append(start - max(scheduled, self.started))
+
+        def _job_completed_callback(self, job, future):
+            if future.exception() is not None:
+                # The chain stops here, the package never completes.
+                with self.stats_lock:
+                    self.errors += 1
+                self._package_done()
+            super()._job_completed_callback(job, future)
+
+        def _package_completed_callback(self, package, link_id, future):
+            super()._package_completed_callback(package, link_id, future)
+            self._package_done()
+
+        def _package_done(self):
+            with self.stats_lock:
+                self.finished += 1
+                if self.finished >= packages:
+                    self.done.set()
+
+    queue = BenchmarkQueue(
+        executor,
+        max_concurrent_packages=max_concurrent_packages,
+        max_queued_packages=max(packages, PackageQueue.MAX_QUEUED_PACKAGES),
+    )
+    queue.lock = TimedLock(queue.lock)
+    queue.job_available = threading.Condition(queue.lock)
+    return queue
+
+
+def summary(values_ns):
+    """Return the mean, percentiles and maximum of durations, in ms."""
+    if not values_ns:
+        return {"count": 0}
+    values = sorted(values_ns)
+
+    def percentile(p):
+        return round(values[min(int(len(values) * p), len(values) - 1)] / 1e6, 3)
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) / 1e6, 3),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(values[-1] / 1e6, 3),
+    }
+
+
+def run(args):
+    from django.conf import settings
+    from django.db import OperationalError
+
+    from a3m.server import shared_dirs
+    from a3m.server.bookkeeping import get_bookkeeping_writer
+    from a3m.server.db import migrate
+    from a3m.server.packages import Package
+    from a3m.server.processing import DEFAULT_PROCESSING_CONFIG
+    from a3m.server.runner import update_agents
+    from a3m.server.tasks import TaskBackend
+    from a3m.server.tasks import get_task_backend
+    from a3m.server.workflow import load_default_workflow
+
+    workflow = load_default_workflow()
+    scripts = install_stubs(workflow, args.latency, args.files)
+
+    queries = LinkQueryCounter()
+    queries.install()
+
+    shared_dirs.create()
+    migrate()
+    update_agents()
+    queries.counts.clear()
+
+    if args.batch_size:
+        TaskBackend.TASK_BATCH_SIZE = args.batch_size
+    backend = get_task_backend()
+    backend.executor = ContextThreadPoolExecutor(max_workers=1)
+    backend.executor_lock = TimedLock(backend.executor_lock)
+    writer = get_bookkeeping_writer()
+    writer.lock = TimedLock(writer.lock)
+    writer.write_lock = TimedLock(writer.write_lock)
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=args.worker_threads or settings.WORKER_THREADS
+    )
+    concurrent_packages = args.concurrent_packages or settings.CONCURRENT_PACKAGES
+    queue = create_queue(executor, concurrent_packages, args.packages)
+    worker = threading.Thread(target=queue.work)
+
+    # Every package is submitted before the queue starts processing them.
+    submit_errors = 0
+    try:
+        token = _current_link.set(SUBMIT_SCOPE)
+        try:
+            for number in range(args.packages):
+                # Submissions can fail while SQLite is busy, try again.
+                for attempt in range(SUBMIT_ATTEMPTS):
+                    try:
+                        Package.create_package(
+                            queue,
+                            executor,
+                            workflow,
+                            f"package_{number}",
+                            f"file:///synthetic/package_{number}",
+                            DEFAULT_PROCESSING_CONFIG,
+                        )
+                    except OperationalError:
+                        if attempt == SUBMIT_ATTEMPTS - 1:
+                            raise
+                        submit_errors += 1
+                        time.sleep(0.1)
+                    else:
+                        break
+        finally:
+            _current_link.reset(token)
+        executor.submit(lambda: None).result()  # Wait for the first jobs.
+
+        start = time.perf_counter()
+        queue.started = time.perf_counter_ns()
+        worker.start()
+        completed = queue.done.wait(args.timeout)
+        elapsed = time.perf_counter() - start
+    finally:
+        queue.stop()
+        if worker.is_alive():
+            worker.join()
+        executor.shutdown(wait=True)
+        writer.stop()
+        backend.shutdown(wait=True)
+
+    jobs = sum(len(times) for times in queue.job_times.values())
+    links = {}
+    for link_id, times in sorted(
+        queue.job_times.items(), key=lambda item: queries.counts[item[0]], reverse=True
+    ):
+        statements = queries.counts[link_id]
+        links[link_id] = {
+            "description": queue.descriptions[link_id],
+            "jobs": len(times),
+            "db_statements": statements,
+            "db_statements_per_job": round(statements / len(times), 2),
+            "job": summary(times),
+            "hop": summary(queue.hops[link_id]),
+        }
+
+    return {
+        "packages": args.packages,
+        "files_per_package": args.files,
+        "latency": args.latency,
+        "concurrent_packages": concurrent_packages,
+        "worker_threads": executor._max_workers,
+        "batch_size": TaskBackend.TASK_BATCH_SIZE,
+        "stubbed_scripts": len(scripts),
+        "completed": completed,
+        "finished_packages": queue.finished,
+        "submit_errors": submit_errors,
+        "job_errors": queue.errors,
+        "seconds": round(elapsed, 3),
+        "packages_per_second": round(queue.finished / elapsed, 2),
+        "jobs": jobs,
+        "jobs_per_second": round(jobs / elapsed, 2),
+        "hop": summary([ns for hops in queue.hops.values() for ns in hops]),
+        "admission": summary(queue.admissions),
+        "locks": {
+            "queue": queue.lock.results(),
+            "task_backend_executor": backend.executor_lock.results(),
+            "bookkeeping": writer.lock.results(),
+            "bookkeeping_write": writer.write_lock.results(),
+        },
+        "db_statements": sum(queries.counts.values()),
+        "db_statements_by_scope": {
+            scope: queries.counts[scope]
+            for scope in (SUBMIT_SCOPE, BOOKKEEPING_SCOPE, OTHER_SCOPE)
+        },
+        "links": links,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packages", type=int, default=200)
+    parser.add_argument("--files", type=int, default=10, help="Files per package.")
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Seconds each stubbed task takes."
+    )
+    parser.add_argument("--concurrent-packages", type=int)
+    parser.add_argument("--worker-threads", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument(
+        "--timeout", type=float, default=3600, help="Seconds to wait for packages."
+    )
+    parser.add_argument("--work-dir", help="Defaults to a temporary directory.")
+    parser.add_argument("--keep", action="store_true", help="Keep the work dir.")
+    parser.add_argument("--output", help="Write the results to a file too.")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="a3m-benchmark-")
+    configure(work_dir, traces=False)
+    os.environ["A3M_WORKER_PROCESSES"] = "0"
+
+    import django
+
+    django.setup()
+
+    try:
+        results = run(args)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    if not results["completed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark of the replacement of variables in the arguments of tasks.
+
+It expands the arguments of a link of the default workflow for a synthetic
+package of many files, first with the sequential ``str.replace`` passes used
+before `a3m.replacements` was introduced and then with the job code, e.g.::
+
+    python -m benchmarks.replacements --files 100000
+
+Both the server pass (`ClientScriptJob.replace_values`) and the client pass
+(`a3m.client.mcp.handle_batch_task`) are measured. Results are printed as JSON.
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "a3m.settings.common")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from a3m.replacements import CommandTemplate  # noqa: E402
+from a3m.server.jobs import FilesClientScriptJob  # noqa: E402
+from a3m.server.jobs.client import _escape_for_command_line  # noqa: E402
+from a3m.server.workflow import load_default_workflow  # noqa: E402
+
+# Link "Remove files without linking information" has a file per task and
+# logs its output.
+LINK_ID = "576f1f43-a130-4c15-abeb-c272ec458d33"
+
+
+class Package:
+    """Enough of `a3m.server.packages.Package` for the job."""
+
+    def __init__(self, path):
+        self.path = path
+        self.uuid = str(uuid.uuid4())
+
+    def get_replacement_mapping(self):
+        mapping = {
+            r"%tmpDirectory%": os.path.join(settings.SHARED_DIRECTORY, "tmp", ""),
+            r"%processingDirectory%": settings.PROCESSING_DIRECTORY,
+            r"%rejectedDirectory%": settings.REJECTED_DIRECTORY,
+            r"%SIPUUID%": self.uuid,
+            r"%TransferUUID%": self.uuid,
+            r"%SIPName%": "transfer",
+            r"%SIPLogsDirectory%": os.path.join(self.path, "logs", ""),
+            r"%SIPObjectsDirectory%": os.path.join(self.path, "objects", ""),
+            r"%SIPDirectory%": self.path,
+            r"%SIPDirectoryBasename%": os.path.basename(self.path),
+            r"%relativeLocation%": self.path,
+            r"%transferDirectory%": self.path,
+            r"%unitType%": "Transfer",
+            r"%URL%": "file:///transfer",
+        }
+        mapping.update({f"%config:option_{i}%": "True" for i in range(30)})
+        return mapping
+
+    def files(self, count):
+        for i in range(count):
+            location = f'%transferDirectory%objects/dir_{i % 100}/file "{i}".txt'
+            path = location.replace("%transferDirectory%", self.path)
+            yield {
+                r"%fileUUID%": str(uuid.uuid4()),
+                r"%originalLocation%": location,
+                r"%currentLocation%": location,
+                r"%fileGrpUse%": "original",
+                r"%fileDirectory%": os.path.dirname(location),
+                r"%fileName%": f'file "{i}"',
+                r"%fileExtension%": "txt",
+                r"%fileExtensionWithDot%": ".txt",
+                r"%relativeLocation%": path,
+                r"%inputFile%": path,
+                r"%fileFullName%": path,
+            }
+
+
+def sequential_replace(command, replacements):
+    if command is None:
+        return None
+    for key, replacement in replacements.items():
+        command = command.replace(key, _escape_for_command_line(replacement))
+    return command
+
+
+def client_replacements():
+    return {
+        r"%sharedPath%": settings.SHARED_DIRECTORY,
+        r"%clientAssetsDirectory%": "/assets/",
+        r"%date%": "2026-10-18T12:00:00+00:00",
+        r"%taskUUID%": str(uuid.uuid4()),
+        r"%jobCreatedDate%": "2026-10-18 12:00:00+00:00",
+    }
+
+
+def run_sequential(job, files):
+    client = client_replacements()
+    start = time.perf_counter()
+    for file_replacements in files:
+        command_replacements = job.command_replacements.copy()
+        command_replacements.update(file_replacements)
+        arguments = sequential_replace(job.arguments, command_replacements)
+        sequential_replace(job.stdout_file, command_replacements)
+        sequential_replace(job.stderr_file, command_replacements)
+        for key, value in client.items():
+            arguments = arguments.replace(key, value)
+    return time.perf_counter() - start
+
+
+def run_compiled(job, files):
+    client = client_replacements()
+    start = time.perf_counter()
+    job.escaped_replacements = {
+        key: _escape_for_command_line(value)
+        for key, value in job.command_replacements.items()
+    }
+    for file_replacements in files:
+        arguments = job.replace_values(job.arguments, file_replacements)
+        job.replace_values(job.stdout_file, file_replacements)
+        job.replace_values(job.stderr_file, file_replacements)
+        CommandTemplate(arguments).expand(client)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    package = Package("/var/archivematica/sharedDirectory/transfer-1/")
+    link = load_default_workflow().get_link(LINK_ID)
+    job = FilesClientScriptJob(None, link, package)
+    job.command_replacements = package.get_replacement_mapping()
+    files = list(package.files(args.files))
+
+    sequential = run_sequential(job, files)
+    compiled = run_compiled(job, files)
+
+    print(
+        json.dumps(
+            {
+                "files": args.files,
+                "arguments": job.arguments,
+                "sequential_seconds": round(sequential, 3),
+                "compiled_seconds": round(compiled, 3),
+                "speedup": round(sequential / compiled, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""
+End-to-end throughput benchmark.
+
+It generates synthetic transfers and runs them through an embedded server, as
+created by `a3m.server.runner.create_server`, e.g.::
+
+    python -m benchmarks.throughput --packages 4 --files 500 --depth 3 \\
+        --sizes lognormal:20000:1.5 --formats txt=4,png=2,pdf=1,bin=1
+
+Results are printed as JSON: packages per hour, files per second, the time
+spent in each link (from the package traces, see `a3m.tracing`), the number
+of database queries made by the server process and its peak RSS.
+
+Everything is written to a new working directory (``--work-dir``) with its
+own database and shared directory. With ``--stub-tools``, the stages that
+depend on external tools (normalization, policy checks, transcription,
+compression) are disabled and the remaining tools are replaced by stubs that
+do nothing, which lets it run on a bare Linux box. Use ``--baseline`` with the
+output of a previous run to fail when files per second regress.
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import resource
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+# Tools replaced with ``--stub-tools``.
+STUB_TOOLS = (
+    "7z",
+    "atool",
+    "bulk_extractor",
+    "clamdscan",
+    "convert",
+    "exiftool",
+    "ffmpeg",
+    "ffprobe",
+    "fits",
+    "identify",
+    "inkscape",
+    "jhove",
+    "mediaconch",
+    "mediainfo",
+    "tesseract",
+    "tree",
+    "unar",
+    "verapdf",
+)
+
+SUBMIT_ATTEMPTS = 5
+
+
+def parse_sizes(spec):
+    """Return a function that draws file sizes, in bytes, from ``spec``.
+
+    ``fixed:SIZE``, ``uniform:MIN:MAX`` or ``lognormal:MEDIAN:SIGMA``.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: int(values[0])
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: int(rng.uniform(*values))
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: int(median * rng.lognormvariate(0, sigma))
+    raise argparse.ArgumentTypeError(f"Invalid size distribution: {spec}")
+
+
+def parse_formats(spec):
+    """Parse weights of formats, e.g. ``txt=4,png=1``."""
+    formats = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in CONTENTS:
+            raise argparse.ArgumentTypeError(f"Unknown format: {name}")
+        formats[name] = float(weight or 1)
+    return formats
+
+
+def text_content(rng, size):
+    words = ("lorem", "ipsum", "dolor", "sit", "amet", "archive", "record")
+    text, length = [], 0
+    while length < size:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return " ".join(text)[:size].encode("ascii")
+
+
+def csv_content(rng, size):
+    rows, length = ["id,name,value"], 0
+    while length < size:
+        row = f"{len(rows)},item {rng.randrange(10**6)},{rng.random():.6f}"
+        rows.append(row)
+        length += len(row) + 1
+    return "\n".join(rows).encode("ascii")[: max(size, 14)]
+
+
+def xml_content(rng, size):
+    body = text_content(rng, max(size - 60, 1)).decode("ascii")
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<record>{body}</record>\n'.encode()
+
+
+def png_content(rng, size):
+    """Grayscale PNG of random pixels, close to ``size`` bytes."""
+
+    def chunk(kind, data):
+        crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    width = 256
+    height = max(size // (width + 1), 1)
+    rows = b"".join(b"\x00" + rng.randbytes(width) for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+def pdf_content(rng, size):
+    """Single page PDF with a text stream padded to ``size`` bytes."""
+    text = text_content(rng, max(size - 400, 1)).decode("ascii")
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    content, offsets = "%PDF-1.4\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(content))
+        content += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    content += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+    content += f"startxref\n{xref}\n%%EOF\n"
+    return content.encode("latin-1")
+
+
+def binary_content(rng, size):
+    return rng.randbytes(size)
+
+
+CONTENTS = {
+    "txt": text_content,
+    "csv": csv_content,
+    "xml": xml_content,
+    "png": png_content,
+    "pdf": pdf_content,
+    "bin": binary_content,
+}
+
+
+def generate_transfer(path, rng, files, sizes, depth, formats, fanout=4):
+    """Write a transfer of ``files`` files nested up to ``depth`` levels.
+
+    Returns the number of bytes written.
+    """
+    names, weights = zip(*formats.items())
+    total = 0
+    for number in range(files):
+        directory = path
+        for _ in range(rng.randint(0, depth)):
+            directory = os.path.join(directory, f"dir_{rng.randrange(fanout)}")
+        os.makedirs(directory, exist_ok=True)
+        extension = rng.choices(names, weights)[0]
+        content = CONTENTS[extension](rng, max(sizes(rng), 1))
+        with open(os.path.join(directory, f"file_{number}.{extension}"), "wb") as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+
+def create_stubs(directory):
+    """Install executables in place of the external tools.
+
+    They print an empty XML document, which is what the characterization
+    commands expect, and succeed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in STUB_TOOLS:
+        stub = os.path.join(directory, name)
+        with open(stub, "w") as f:
+            f.write("#!/bin/sh\necho '<?xml version=\"1.0\"?><stub/>'\n")
+        os.chmod(stub, 0o700)
+    os.environ["PATH"] = os.pathsep.join([directory, os.environ["PATH"]])
+
+
+def configure(work_dir, traces=True):
+    """Point the settings at the working directory, before Django is set up."""
+    share = os.path.join(work_dir, "share", "")
+    os.environ.update(
+        {
+            "A3M_SHARED_DIRECTORY": share,
+            "A3M_TEMP_DIR": os.path.join(share, "tmp", ""),
+            "A3M_PROCESSING_DIRECTORY": os.path.join(share, "currentlyProcessing", ""),
+            "A3M_REJECTED_DIRECTORY": os.path.join(share, "rejected", ""),
+            "A3M_DB_NAME": os.path.join(work_dir, "db.sqlite"),
+            "A3M_PACKAGE_TRACES": "true" if traces else "false",
+        }
+    )
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "a3m.settings.common")
+
+
+class QueryCounter:
+    """Counts the queries of every database connection of this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.split(None, 1)[0].upper() if sql else ""
+        with self.lock:
+            self.counts[statement] += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(self._connection_created, weak=False)
+
+    def _connection_created(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+
+def processing_config(stub_tools):
+    from a3m.api.transferservice import v1beta1 as transfer_service_api
+    from a3m.server.processing import DEFAULT_PROCESSING_CONFIG
+
+    request_response = transfer_service_api.request_response_pb2
+    config = request_response.ProcessingConfig()
+    config.CopyFrom(DEFAULT_PROCESSING_CONFIG)
+    if stub_tools:
+        config.normalize = False
+        config.transcribe_files = False
+        config.perform_policy_checks_on_originals = False
+        config.perform_policy_checks_on_preservation_derivatives = False
+        config.aip_compression_algorithm = (
+            request_response.ProcessingConfig.AIP_COMPRESSION_ALGORITHM_UNCOMPRESSED
+        )
+    return config
+
+
+def link_times(share):
+    """Aggregate the time spent in each link from the package traces."""
+    from a3m.tracing import Trace
+    from a3m.tracing import build_tree
+    from a3m.tracing import job_times
+
+    times = collections.defaultdict(lambda: [0, 0, 0])
+    traces = os.path.join(share, "logs", "traces")
+    for name in os.listdir(traces) if os.path.isdir(traces) else []:
+        roots = build_tree(Trace.load(os.path.join(traces, name)).events)
+        for link, (count, wall, self_time) in job_times(roots).items():
+            times[link][0] += count
+            times[link][1] += wall
+            times[link][2] += self_time
+    return {
+        link: {
+            "count": count,
+            "seconds": round(wall / 1e6, 3),
+            "self_seconds": round(self_time / 1e6, 3),
+        }
+        for link, (count, wall, self_time) in sorted(
+            times.items(), key=lambda item: item[1][1], reverse=True
+        )
+    }
+
+
+def run(args, work_dir):
+    import grpc
+    from django.conf import settings
+
+    from a3m.api.transferservice import v1beta1 as transfer_service_api
+    from a3m.server.rpc.client import Client
+    from a3m.server.runner import create_server
+
+    rng = random.Random(args.seed)  # noqa: S311
+    sizes = parse_sizes(args.sizes)
+    transfers, total_bytes = [], 0
+    for number in range(args.packages):
+        path = os.path.join(work_dir, "transfers", f"transfer_{number}")
+        total_bytes += generate_transfer(
+            path, rng, args.files, sizes, args.depth, args.formats
+        )
+        transfers.append(path)
+
+    queries = QueryCounter()
+    queries.install()
+
+    server = create_server(
+        "localhost:0",
+        grpc.local_server_credentials(grpc.LocalConnectionType.LOCAL_TCP),
+        args.concurrent_packages or settings.CONCURRENT_PACKAGES,
+        settings.BATCH_SIZE,
+        settings.WORKER_THREADS,
+        settings.RPC_THREADS,
+    )
+    server.start()
+    queries.counts.clear()  # Leave migrations out.
+    try:
+        with grpc.insecure_channel(f"localhost:{server.grpc_port}") as channel:
+            client = Client(channel)
+            config = processing_config(args.stub_tools)
+            start = time.perf_counter()
+            package_ids, submit_errors = [], 0
+            for path in transfers:
+                # Submissions can fail while SQLite is busy, try again.
+                for attempt in range(SUBMIT_ATTEMPTS):
+                    try:
+                        resp = client.submit(
+                            f"file://{path}", os.path.basename(path), config
+                        )
+                    except grpc.RpcError:
+                        if attempt == SUBMIT_ATTEMPTS - 1:
+                            raise
+                        submit_errors += 1
+                        time.sleep(0.1)
+                    else:
+                        package_ids.append(resp.id)
+                        break
+            statuses = collections.Counter(
+                transfer_service_api.request_response_pb2.PackageStatus.Name(
+                    client.wait_until_complete(package_id).status
+                )
+                for package_id in package_ids
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        server.stop()
+
+    files = args.packages * args.files
+    return {
+        "packages": args.packages,
+        "files_per_package": args.files,
+        "sizes": args.sizes,
+        "depth": args.depth,
+        "formats": args.formats,
+        "bytes": total_bytes,
+        "stub_tools": args.stub_tools,
+        "statuses": dict(statuses),
+        "submit_errors": submit_errors,
+        "seconds": round(elapsed, 3),
+        "packages_per_hour": round(args.packages / elapsed * 3600, 2),
+        "files_per_second": round(files / elapsed, 2),
+        "db_queries": sum(queries.counts.values()),
+        "db_queries_by_statement": dict(queries.counts.most_common()),
+        # Kilobytes on Linux.
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "peak_child_rss_bytes": (
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        ),
+        "links": link_times(settings.SHARED_DIRECTORY),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packages", type=int, default=2)
+    parser.add_argument("--files", type=int, default=100, help="Files per package.")
+    parser.add_argument(
+        "--sizes",
+        default="lognormal:20000:1",
+        help="fixed:SIZE, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA, in bytes.",
+    )
+    parser.add_argument("--depth", type=int, default=2, help="Nesting depth.")
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default="txt=4,csv=1,xml=1,png=2,pdf=1,bin=1",
+        help=f"Weights of the formats: {', '.join(CONTENTS)}.",
+    )
+    parser.add_argument("--concurrent-packages", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-tools", action="store_true")
+    parser.add_argument("--work-dir", help="Defaults to a temporary directory.")
+    parser.add_argument("--keep", action="store_true", help="Keep the work dir.")
+    parser.add_argument("--output", help="Write the results to a file too.")
+    parser.add_argument("--baseline", help="Results of a previous run.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Slowdown of files per second accepted against the baseline.",
+    )
+    args = parser.parse_args()
+    try:
+        parse_sizes(args.sizes)
+    except argparse.ArgumentTypeError as err:
+        parser.error(str(err))
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="a3m-benchmark-")
+    configure(work_dir)
+    if args.stub_tools:
+        create_stubs(os.path.join(work_dir, "bin"))
+
+    import django
+
+    django.setup()
+
+    try:
+        results = run(args, work_dir)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        minimum = baseline["files_per_second"] * (1 - args.tolerance)
+        if results["files_per_second"] < minimum:
+            print(
+                f"Regression: {results['files_per_second']} files per second, "
+                f"expected at least {minimum:.2f}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import uuid
+
+import pytest
+
+from a3m.client.clientScripts.a3m_download_transfer import call
+from a3m.client.job import Job
+from a3m.main import models
+
+
+@pytest.mark.django_db
+def test_call_records_the_size_of_the_transfer(tmp_path):
+    source = tmp_path / "source"
+    (source / "dir").mkdir(parents=True)
+    (source / "file.txt").write_bytes(b"12345")
+    (source / "dir" / "file.txt").write_bytes(b"123")
+    transfer = models.Transfer.objects.create(uuid=str(uuid.uuid4()))
+    sip = models.SIP.objects.create(uuid=str(uuid.uuid4()))
+    models.PackageState.objects.create(
+        sip=sip, transfer=transfer, name="name", url=source.as_uri(), config=b""
+    )
+    job = Job(
+        "a3m_download_transfer",
+        "uuid",
+        [transfer.uuid, str(tmp_path / "transfer"), source.as_uri()],
+    )
+
+    call([job])
+
+    assert job.get_exit_code() == 0
+    state = models.PackageState.objects.get(transfer=transfer)
+    assert (state.size, state.file_count) == (8, 2)
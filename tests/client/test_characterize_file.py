@@ -0,0 +1,121 @@
+import uuid
+
+import pytest
+
+from a3m.client.clientScripts.characterize_file import call
+from a3m.client.job import Job
+from a3m.fpr.registry import FPR
+from a3m.main.models import SIP
+from a3m.main.models import File
+from a3m.main.models import FPCommandOutput
+
+# Format version with three characterization rules writing XML.
+FORMAT_VERSION_ID = "615113fa-4d15-47de-ac52-f7962683a2f0"
+
+
+@pytest.fixture
+def sip(tmp_path):
+    return SIP.objects.create(currentpath=str(tmp_path))
+
+
+def create_file(tmp_path, sip, name):
+    path = tmp_path / name
+    path.write_text("hello world")
+    f = File.objects.create(
+        uuid=uuid.uuid4(), sip=sip, originallocation=path, currentlocation=path
+    )
+    f.fileformatversion_set.create(format_version_id=FORMAT_VERSION_ID)
+    return f
+
+
+def create_job(f, sip):
+    return Job(
+        "characterize_file", "uuid", [str(f.currentlocation), str(f.uuid), sip.uuid]
+    )
+
+
+@pytest.mark.django_db
+def test_call_resolves_rules_per_batch(mocker, tmp_path, sip):
+    files = [create_file(tmp_path, sip, f"file{i}.mov") for i in range(3)]
+    # Already characterized.
+    FPCommandOutput.objects.create(
+        file_id=files[2].uuid, rule_id=uuid.uuid4(), content="<xml/>"
+    )
+    mocker.patch(
+        "a3m.client.clientScripts.characterize_file.executeOrRun",
+        return_value=(0, "<xml/>", ""),
+    )
+    get_rules_for_files = mocker.spy(FPR, "get_rules_for_files")
+    get_file_rules = mocker.spy(FPR, "get_file_rules")
+    jobs = [create_job(f, sip) for f in files]
+
+    call(jobs)
+
+    assert [job.get_exit_code() for job in jobs] == [0, 0, 0]
+    assert get_rules_for_files.call_count == 1
+    assert get_file_rules.call_count == 0
+    assert FPCommandOutput.objects.filter(file_id=files[0].uuid).count() == 3
+    assert FPCommandOutput.objects.filter(file_id=files[1].uuid).count() == 3
+    assert FPCommandOutput.objects.filter(file_id=files[2].uuid).count() == 1
+
+
+@pytest.mark.django_db
+def test_call_looks_up_rules_by_file_if_preloading_fails(mocker, tmp_path, sip):
+    f = create_file(tmp_path, sip, "file.mov")
+    mocker.patch(
+        "a3m.client.clientScripts.characterize_file.executeOrRun",
+        return_value=(0, "<xml/>", ""),
+    )
+    mocker.patch.object(FPR, "get_rules_for_files", side_effect=ValueError)
+    get_file_rules = mocker.spy(FPR, "get_file_rules")
+    job = create_job(f, sip)
+
+    call([job])
+
+    assert job.get_exit_code() == 0
+    assert get_file_rules.call_count == 1
+    assert FPCommandOutput.objects.filter(file_id=f.uuid).count() == 3
+
+
+@pytest.mark.django_db
+def test_call_saves_outputs_of_each_file(mocker, tmp_path, sip):
+    files = [create_file(tmp_path, sip, f"file{i}.mov") for i in range(2)]
+    outputs = []
+
+    def execute_or_run(*args, **kwargs):
+        # Outputs of the previous files are saved before the next one runs.
+        outputs.append(FPCommandOutput.objects.count())
+        return 0, "<xml/>", ""
+
+    mocker.patch(
+        "a3m.client.clientScripts.characterize_file.executeOrRun",
+        side_effect=execute_or_run,
+    )
+    jobs = [create_job(f, sip) for f in files]
+
+    call(jobs)
+
+    assert [job.get_exit_code() for job in jobs] == [0, 0]
+    assert outputs == [0, 0, 0, 3, 3, 3]
+
+
+@pytest.mark.django_db
+def test_call_skips_files_characterized_meanwhile(mocker, tmp_path, sip):
+    f = create_file(tmp_path, sip, "file.mov")
+
+    def execute_or_run(*args, **kwargs):
+        FPCommandOutput.objects.create(
+            file_id=f.uuid, rule_id=uuid.uuid4(), content="<other/>"
+        )
+        return 0, "<xml/>", ""
+
+    mocker.patch(
+        "a3m.client.clientScripts.characterize_file.executeOrRun",
+        side_effect=execute_or_run,
+    )
+    job = create_job(f, sip)
+
+    call([job])
+
+    assert job.get_exit_code() == 255
+    assert not FPCommandOutput.objects.filter(file_id=f.uuid, content="<xml/>")
@@ -1,6 +1,14 @@
+import uuid
+
 import pytest
+from django.utils import timezone
 
+from a3m.client.job import Job
+from a3m.client.mcp import execute_command
+from a3m.client.mcp import fail_all_tasks
 from a3m.client.mcp import handle_batch_task
+from a3m.client.mcp import write_task_results
+from a3m.main import models
 
 
 @pytest.mark.django_db
@@ -38,3 +46,121 @@ def test_handle_batch_task_replaces_non_ascii_arguments(mocker):
     _parse_command_line.assert_called_once_with(
         "montréal some_task_uuid some montréal datetime"
     )
+
+
+def task_payload(task_uuid, job, created_date):
+    return {
+        "uuid": task_uuid,
+        "arguments": "",
+        "createdDate": created_date.isoformat(" "),
+        "wants_output": False,
+        "execute": "script",
+        "jobUUID": str(job.jobuuid),
+        "fileUUID": "",
+        "fileName": "file.txt",
+    }
+
+
+@pytest.mark.django_db
+def test_write_task_results_in_bulk(settings, django_assert_num_queries):
+    settings.CAPTURE_CLIENT_SCRIPT_OUTPUT = False
+    job = models.Job.objects.create(
+        jobuuid=uuid.uuid4(), createdtime=timezone.now(), createdtimedec=0
+    )
+    created_time = timezone.now()
+    task_uuids = [str(uuid.uuid4()) for _ in range(4)]
+    batch_payload = {
+        "tasks": {
+            task_uuid: task_payload(task_uuid, job, created_time)
+            for task_uuid in task_uuids
+        }
+    }
+    # The server has only written the first two tasks so far.
+    for task_uuid in task_uuids[:2]:
+        models.Task.objects.create(
+            taskuuid=task_uuid, job=job, filename="file.txt", createdtime=created_time
+        )
+    start_time = timezone.now()
+    jobs = [
+        Job("test_v0.0", task_uuid, [], start_time=start_time)
+        for task_uuid in task_uuids
+    ]
+    for job in jobs:
+        job.write_output("out")
+    jobs[0].set_status(1)
+    jobs[0].write_error("err")
+    end_time = timezone.now()
+
+    # Start times, results and output in a single statement.
+    with django_assert_num_queries(1):
+        write_task_results(batch_payload, jobs, end_time)
+
+    assert [
+        (
+            task.exitcode,
+            task.filename,
+            task.createdtime,
+            task.starttime,
+            task.endtime,
+            task.stdout,
+            task.stderror,
+        )
+        for task in models.Task.objects.filter(taskuuid__in=task_uuids).order_by(
+            "exitcode"
+        )
+    ] == [(0, "file.txt", created_time, start_time, end_time, "", "")] * 3 + [
+        (1, "file.txt", created_time, start_time, end_time, "out", "err")
+    ]
+
+
+@pytest.mark.django_db
+def test_fail_all_tasks_records_queued_tasks():
+    job = models.Job.objects.create(
+        jobuuid=uuid.uuid4(), createdtime=timezone.now(), createdtimedec=0
+    )
+    task_uuid = str(uuid.uuid4())
+    batch_payload = {"tasks": {task_uuid: task_payload(task_uuid, job, timezone.now())}}
+
+    results = fail_all_tasks(batch_payload, "Worker died")
+
+    assert results == {"task_results": {task_uuid: {"exitCode": 1}}}
+    task = models.Task.objects.get(taskuuid=task_uuid)
+    assert (task.job_id, task.exitcode, task.stderror) == (
+        job.jobuuid,
+        1,
+        "Worker died",
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_execute_command_records_queries_of_tasks(mocker):
+    job = models.Job.objects.create(
+        jobuuid=uuid.uuid4(), createdtime=timezone.now(), createdtimedec=0
+    )
+    task_uuids = [str(uuid.uuid4()) for _ in range(2)]
+
+    def call(jobs):
+        # Two statements for the whole batch and two for the first job.
+        models.Transfer.objects.exists()
+        models.Transfer.objects.exists()
+        with jobs[0].JobContext():
+            models.Transfer.objects.exists()
+            models.Transfer.objects.exists()
+
+    mocker.patch("importlib.import_module", return_value=mocker.Mock(call=call))
+    batch_payload = {
+        "tasks": {
+            task_uuid: task_payload(task_uuid, job, timezone.now())
+            for task_uuid in task_uuids
+        }
+    }
+
+    execute_command("script", batch_payload)
+
+    # The statements made outside of the jobs are shared.
+    tasks = models.Task.objects.filter(taskuuid__in=task_uuids)
+    assert {task.taskuuid: task.querycount for task in tasks} == {
+        task_uuids[0]: 3,
+        task_uuids[1]: 1,
+    }
+    assert all(task.querytime > 0 for task in tasks)
@@ -71,3 +71,12 @@ def test_main_detects_file_was_already_extracted_from_unpacking_event(
     result = has_packages.main(job, str(transfer.uuid))
 
     assert result == 1
+
+
+def test_main_query_budget(db, mocker, transfer, compressed_file, query_budget):
+    job = mocker.Mock(spec=Job)
+
+    # The transfer, its files, the formats of the compressed file and its
+    # unpacking events.
+    with query_budget(4):
+        has_packages.main(job, str(transfer.uuid))
@@ -1,3 +1,4 @@
+import gzip
 from uuid import uuid4
 
 from a3m.client.job import Job
@@ -31,3 +32,41 @@ def test_job_encoding():
     assert job.UUID in job_dump
     assert stderr in job_dump
     assert stdout in job_dump
+
+
+def test_job_output_is_bounded():
+    job = Job(name="somejob", uuid=str(uuid4()), args=[], output_limit=10)
+
+    job.write_output("12345")
+    job.write_output("6789")
+    assert job.get_stdout() == "123456789"
+
+    for chunk in ("abc", "def", "ghi"):
+        job.write_output(chunk)
+
+    assert job.get_stdout() == "12345\n[... 8 characters truncated ...]\nefghi"
+    assert job.get_stderr() == ""
+
+
+def test_job_output_is_logged_when_truncated(tmp_path):
+    job = Job(
+        name="somejob",
+        uuid=str(uuid4()),
+        args=[],
+        output_limit=8,
+        output_log_dir=str(tmp_path),
+    )
+
+    job.print_error("small")
+    assert list(tmp_path.iterdir()) == []
+
+    job.print_output("line 1")
+    job.print_output("line 2")
+    job.print_output("line 3")
+
+    log_path = tmp_path / f"{job.UUID}.stdout.gz"
+    assert job.get_stdout() == (
+        f"line\n[... 13 characters truncated, see {log_path} ...]\ne 3\n"
+    )
+    with gzip.open(log_path, "rt") as f:
+        assert f.read() == "line 1\nline 2\nline 3\n"
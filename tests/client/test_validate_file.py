@@ -1,7 +1,11 @@
+import uuid
+
 import pytest
 
+from a3m.client.clientScripts.validate_file import call
 from a3m.client.clientScripts.validate_file import main
 from a3m.client.job import Job
+from a3m.fpr.registry import FPR
 from a3m.main.models import SIP
 from a3m.main.models import Event
 from a3m.main.models import File
@@ -79,3 +83,61 @@ def test_main(mocker, sip, file_obj):
         ).count()
         == 1
     )
+
+
+@pytest.mark.django_db
+def test_call_preloads_rules(mocker, sip, file_obj):
+    mocker.patch(
+        "a3m.client.clientScripts.validate_file.executeOrRun",
+        return_value=(
+            0,
+            '{"eventOutcomeInformation": "pass", "eventOutcomeDetailNote": ""}',
+            "",
+        ),
+    )
+    get_file_rules = mocker.spy(FPR, "get_file_rules")
+    get_rules_for_files = mocker.spy(FPR, "get_rules_for_files")
+    jobs = [
+        Job(
+            "validate_file",
+            "uuid",
+            [file_obj.currentlocation, file_obj.uuid, sip.uuid],
+        )
+        for _ in range(2)
+    ]
+
+    call(jobs)
+
+    assert [job.get_exit_code() for job in jobs] == [0, 0]
+    get_rules_for_files.assert_called_once()
+    get_file_rules.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_call_looks_up_rules_by_file_if_preloading_fails(mocker, sip, file_obj):
+    mocker.patch(
+        "a3m.client.clientScripts.validate_file.executeOrRun",
+        return_value=(
+            0,
+            '{"eventOutcomeInformation": "pass", "eventOutcomeDetailNote": ""}',
+            "",
+        ),
+    )
+    mocker.patch.object(
+        FPR, "get_rules_for_files", side_effect=Exception("database is locked")
+    )
+    get_file_rules = mocker.spy(FPR, "get_file_rules")
+    jobs = [
+        Job(
+            "validate_file",
+            "uuid",
+            [file_obj.currentlocation, file_obj.uuid, sip.uuid],
+        ),
+        Job("validate_file", "uuid", ["missing", str(uuid.uuid4()), sip.uuid]),
+    ]
+
+    call(jobs)
+
+    # The error of the missing file is recorded by its job only.
+    assert [job.get_exit_code() for job in jobs] == [0, 1]
+    assert get_file_rules.call_count == 2
@@ -116,3 +116,13 @@ def test_replacementdict_model_constructor_file_only():
 def test_replacementdict_options():
     d = ReplacementDict({"%relativeLocation%": "bar"})
     assert d.to_gnu_options() == ["--relative-location=bar"]
+
+
+def test_replacementdict_replace_in_a_single_pass():
+    d = ReplacementDict(
+        {"%SIPDirectory%": "/sip/", "%SIPDirectoryBasename%": "sip", "%a%": "%b%"}
+    )
+    assert d.replace("%SIPDirectoryBasename% %SIPDirectory% %a%", None) == [
+        "sip /sip/ %b%",
+        None,
+    ]
@@ -0,0 +1,149 @@
+import os
+
+import pytest
+
+from a3m import inventory
+from a3m.inventory import Inventory
+from a3m.inventory import PackageSize
+from a3m.inventory import get_inventory
+from a3m.inventory import measure_path
+
+
+@pytest.fixture(autouse=True)
+def temp_directory(settings, tmp_path):
+    settings.TEMP_DIRECTORY = str(tmp_path / "tmp")
+
+
+@pytest.fixture
+def package(tmp_path):
+    package = tmp_path / "transfer"
+    (package / "objects" / "sub" / "empty").mkdir(parents=True)
+    (package / "logs").mkdir()
+    (package / "objects" / "a.txt").write_text("a")
+    (package / "objects" / "sub" / "b.txt").write_text("bb")
+    (package / "objects" / "link").symlink_to(package / "logs")
+    (package / "objects" / "broken").symlink_to(package / "missing")
+    return package
+
+
+def normalized(walk):
+    return sorted((path, sorted(dirs), sorted(files)) for path, dirs, files in walk)
+
+
+def test_walk_matches_os_walk(package):
+    result = Inventory.scan(str(package))
+
+    for top in (str(package), f"{package}/objects/", str(package / "objects" / "sub")):
+        assert normalized(result.walk(top)) == normalized(os.walk(top))
+    assert list(result.walk(str(package / "missing"))) == []
+    assert list(result.walk("/elsewhere")) == []
+
+    assert result.stat(str(package / "objects" / "sub" / "b.txt")).size == 2
+    assert result.stat(str(package / "objects" / "sub")) is None
+    assert str(package / "objects" / "sub" / "empty") in result
+    assert str(package / "objects" / "c.txt") not in result
+    assert result.exists(str(package / "objects" / "a.txt"))
+    assert not result.exists(str(package.parent / "elsewhere"))
+
+
+def test_refresh_rescans_changed_directories(mocker, package):
+    # Trust the modification times of directories changed before the scan.
+    mocker.patch.object(inventory, "RACY_INTERVAL_NS", 0)
+    result = Inventory.scan(str(package))
+    assert not result.refresh()
+
+    (package / "objects" / "sub" / "b.txt").rename(package / "objects" / "c.txt")
+    (package / "objects" / "sub" / "empty").rmdir()
+    (package / "objects" / "new" / "dir").mkdir(parents=True)
+    scan_directory = mocker.spy(result, "_scan_directory")
+
+    assert result.refresh()
+
+    assert normalized(result.walk()) == normalized(os.walk(str(package)))
+    assert sorted(call.args[0] for call in scan_directory.call_args_list) == [
+        "objects",
+        "objects/new",
+        "objects/new/dir",
+        "objects/sub",
+    ]
+
+
+def test_get_inventory_is_persisted(mocker, package):
+    first = get_inventory(str(package))
+    scan = mocker.patch.object(Inventory, "scan")
+
+    second = get_inventory(str(package))
+
+    scan.assert_not_called()
+    assert second.directories == first.directories
+
+
+def test_invalidate_files_changed_in_place(mocker, package):
+    mocker.patch.object(inventory, "RACY_INTERVAL_NS", 0)
+    path = package / "objects" / "a.txt"
+    get_inventory(str(package))
+
+    stat = os.stat(package / "objects")
+    path.write_text("abc")
+    os.utime(package / "objects", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert get_inventory(str(package)).stat(str(path)).size == 1
+
+    inventory.invalidate(str(package), str(path))
+
+    assert get_inventory(str(package)).stat(str(path)).size == 3
+
+
+def test_invalidate_without_paths_removes_the_inventory(tmp_path, package):
+    get_inventory(str(package))
+
+    inventory.invalidate(str(package))
+
+    assert os.listdir(tmp_path / "tmp" / "inventories") == []
+
+
+def test_get_inventory_checks_once_per_batch(mocker, package):
+    mocker.patch.object(inventory, "RACY_INTERVAL_NS", 0)
+    path = package / "objects" / "a.txt"
+    get_inventory(str(package))
+
+    with inventory.batch():
+        first = get_inventory(str(package))
+        refresh = mocker.spy(Inventory, "refresh")
+        (package / "objects" / "c.txt").write_text("c")
+
+        assert get_inventory(f"{package}/") is first
+        refresh.assert_not_called()
+        assert str(package / "objects" / "c.txt") not in first
+
+        path.write_text("abc")
+        inventory.invalidate(str(package), str(path))
+        assert get_inventory(str(package)).stat(str(path)).size == 3
+
+    assert str(package / "objects" / "c.txt") in get_inventory(str(package))
+    refresh.assert_called_once()
+
+
+def test_remove_stale_inventories(tmp_path, package):
+    get_inventory(str(package))
+    moved = package.rename(tmp_path / "moved")
+    get_inventory(str(moved))
+
+    inventory.remove_stale()
+
+    name = os.path.basename(inventory._inventory_path(str(moved)))
+    assert sorted(os.listdir(tmp_path / "tmp" / "inventories")) == [
+        name,
+        f"{name}.lock",
+    ]
+
+
+def test_measure_path(tmp_path):
+    (tmp_path / "file.txt").write_bytes(b"12345")
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "file.txt").write_bytes(b"123")
+
+    assert measure_path(tmp_path) == PackageSize(bytes=8, files=2)
+    assert measure_path(tmp_path / "file.txt") == PackageSize(bytes=5, files=1)
+
+    with pytest.raises(OSError):
+        measure_path(tmp_path / "missing")
@@ -0,0 +1,31 @@
+from a3m.replacements import CommandTemplate
+from a3m.replacements import compile_template
+
+
+def test_command_template_expand():
+    template = CommandTemplate(
+        '"%relativeLocation%" "%fileUUID%" "%SIPUUID%" "%date%" "50%"'
+    )
+    assert template.variables == {
+        "%relativeLocation%",
+        "%fileUUID%",
+        "%SIPUUID%",
+        "%date%",
+    }
+
+    expanded = template.expand(
+        {"%fileUUID%": "file", "%relativeLocation%": "%SIPDirectory%objects/"},
+        {"%fileUUID%": "None", "%SIPUUID%": "sip", "%SIPDirectory%": "/sip/"},
+    )
+
+    # File values win, values are not expanded and unknown variables are kept.
+    assert expanded == '"%SIPDirectory%objects/" "file" "sip" "%date%" "50%"'
+
+
+def test_command_template_without_variables():
+    assert CommandTemplate("").expand({}) == ""
+    assert CommandTemplate("--verbose").expand({"%date%": "today"}) == "--verbose"
+
+
+def test_compile_template_is_cached():
+    assert compile_template("%SIPUUID%") is compile_template("%SIPUUID%")
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import OperationalError
+from django.db import connection
+from django.db import transaction
+
+from a3m.main.backends.sqlite3.base import DatabaseWrapper
+from a3m.main.backends.sqlite3.base import write_lock
+from a3m.main.models import Identifier
+from a3m.server.db import dump
+
+
+def test_new_connection_sets_pragmas(tmp_path):
+    settings = dict(
+        connection.settings_dict,
+        NAME=str(tmp_path / "db.sqlite"),
+        OPTIONS={"timeout": 1, "synchronous": "normal", "cache_size": -1024},
+    )
+    wrapper = DatabaseWrapper(settings, alias="pragmas")
+    conn = wrapper.get_new_connection(wrapper.get_connection_params())
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        # NORMAL
+        assert conn.execute("PRAGMA synchronous").fetchone() == (1,)
+        assert conn.execute("PRAGMA cache_size").fetchone() == (-1024,)
+    finally:
+        conn.close()
+
+
+def test_memory_database_outlives_connections():
+    settings = dict(
+        connection.settings_dict, NAME="file:/test-memdb?vfs=memdb", OPTIONS={}
+    )
+    wrapper = DatabaseWrapper(settings, alias="memdb")
+    conn = wrapper.get_new_connection(wrapper.get_connection_params())
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    conn = wrapper.get_new_connection(wrapper.get_connection_params())
+    try:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+    finally:
+        conn.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dump(tmp_path):
+    Identifier.objects.create(type="a", value="1")
+    path = tmp_path / "dump.sqlite"
+
+    dump(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT type, value FROM Identifiers").fetchall() == [
+            ("a", "1")
+        ]
+    finally:
+        conn.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_hold_the_write_lock():
+    with transaction.atomic():
+        assert connection.holds_write_lock
+        assert write_lock.locked()
+        Identifier.objects.create(type="a", value="1")
+    assert not write_lock.locked()
+
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            Identifier.objects.create(type="a", value="2")
+            raise ValueError
+    assert not write_lock.locked()
+    assert not connection.holds_write_lock
+    assert Identifier.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_transactions_are_serialized():
+    errors = []
+
+    def write(thread):
+        try:
+            for i in range(10):
+                # Reads before writing, which fails with "database is locked"
+                # in deferred transactions.
+                with transaction.atomic():
+                    Identifier.objects.filter(type=thread).count()
+                    Identifier.objects.create(type=thread, value=str(i))
+        except Exception as err:
+            errors.append(err)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write, args=(str(i),)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert Identifier.objects.count() == 80
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_do_not_start_without_the_write_lock(mocker):
+    mocker.patch.dict(connection.settings_dict["OPTIONS"], {"timeout": 0.1})
+    write_lock.acquire()
+    try:
+        with pytest.raises(OperationalError, match="database is locked"):
+            with transaction.atomic():
+                Identifier.objects.create(type="a", value="1")
+        assert not connection.holds_write_lock
+    finally:
+        write_lock.release()
+    assert Identifier.objects.count() == 0
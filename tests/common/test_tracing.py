@@ -0,0 +1,105 @@
+import json
+
+from a3m import tracing
+from a3m.executeOrRunSubProcess import executeOrRun
+from a3m.tracing import Trace
+from a3m.tracing import build_tree
+from a3m.tracing import critical_path
+from a3m.tracing import job_times
+
+
+def event(name, category, start, end, tid=1):
+    return {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start,
+        "dur": end - start,
+        "pid": 1,
+        "tid": tid,
+    }
+
+
+# A package with two jobs, the second runs two batches in parallel in
+# another process.
+EVENTS = [
+    event("Queue wait", tracing.QUEUE, 0, 10, tid=9),
+    event("Job 1", tracing.JOB, 10, 30),
+    event("Flush", tracing.DB, 12, 14),
+    event("Job 2", tracing.JOB, 30, 100),
+    event("Submit batch", tracing.SUBMIT, 31, 33),
+    event("Submit batch", tracing.SUBMIT, 33, 35),
+    event("script", tracing.BATCH, 33, 60, tid=2),
+    event("script", tracing.BATCH, 35, 90, tid=3),
+    event("convert", tracing.SUBPROCESS, 40, 80, tid=3),
+]
+
+
+def test_span_records_in_current_trace():
+    trace = Trace()
+
+    with tracing.span("Ignored", tracing.DB):
+        pass
+    with tracing.activate(trace):
+        with tracing.span("Flush", tracing.DB, records=2):
+            pass
+        executeOrRun("command", ["true"])
+    with tracing.span("Ignored", tracing.DB):
+        pass
+
+    assert [(event["name"], event["cat"]) for event in trace.events] == [
+        ("Flush", tracing.DB),
+        ("true", tracing.SUBPROCESS),
+    ]
+    assert trace.events[0]["args"] == {"records": 2}
+    assert trace.events[0]["ph"] == "X"
+
+
+def test_trace_is_saved_as_chrome_trace(tmp_path):
+    path = tmp_path / "traces" / "package.json"
+    Trace(list(EVENTS)).save(str(path))
+
+    assert json.loads(path.read_text())["traceEvents"] == EVENTS
+    assert Trace.load(str(path)).events == EVENTS
+
+
+def test_build_tree_attaches_batches_to_jobs():
+    roots = build_tree(EVENTS)
+
+    assert [span.name for span in roots] == ["Queue wait", "Job 1", "Job 2"]
+    job = roots[2]
+    assert [span.name for span in job.children] == [
+        "Submit batch",
+        "Submit batch",
+        "script",
+        "script",
+    ]
+    assert job.children[3].children[0].name == "convert"
+    # Only the end of the job is not covered by its children.
+    assert job.self_time == 11
+    assert roots[1].self_time == 18
+
+
+def test_critical_path():
+    path = [
+        (depth, span.name, span.start)
+        for depth, span in critical_path(build_tree(EVENTS))
+    ]
+
+    assert path == [
+        (0, "Queue wait", 0),
+        (0, "Job 1", 10),
+        (1, "Flush", 12),
+        (0, "Job 2", 30),
+        (1, "Submit batch", 31),
+        (1, "Submit batch", 33),
+        (1, "script", 35),
+        (2, "convert", 40),
+    ]
+
+
+def test_job_times():
+    assert job_times(build_tree(EVENTS)) == {
+        "Job 1": (1, 20, 18),
+        "Job 2": (1, 70, 11),
+    }
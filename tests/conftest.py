@@ -1,7 +1,11 @@
+import contextlib
 import pathlib
 
 import pytest
 
+from a3m.common_metrics import QueryCounter
+from a3m.common_metrics import count_queries
+
 
 @pytest.fixture(autouse=True)
 def set_xml_catalog_files(monkeypatch):
@@ -13,3 +17,25 @@ def set_xml_catalog_files(monkeypatch):
             / "a3m/client/assets/catalog/catalog.xml"
         ),
     )
+
+
+@pytest.fixture
+def query_budget():
+    """Assert that a block of code makes at most a number of database statements.
+
+    Used to keep client scripts from regressing into N+1 query patterns::
+
+        with query_budget(3):
+            has_packages.main(job, transfer_uuid)
+    """
+
+    @contextlib.contextmanager
+    def check(budget):
+        with count_queries(QueryCounter(record=True)) as queries:
+            yield queries
+        assert queries.count <= budget, (
+            f"{queries.count} database statements, the budget is {budget}:\n"
+            + "\n".join(queries.statements)
+        )
+
+    return check
@@ -1,9 +1,15 @@
+import threading
+import time
+from concurrent import futures
+
 import pytest
 
 from a3m.server.jobs import Job
+from a3m.server.tasks import PoolTaskBackend
 from a3m.server.tasks import Task
 from a3m.server.tasks import TaskBackend
 from a3m.server.tasks import get_task_backend
+from a3m.server.tasks.backends.batch_sizing import BatchSizer
 
 
 class MockJob(Job):
@@ -85,3 +91,131 @@ def test_multiple_batches(simple_job, simple_task, mocker):
     assert results[1].exit_code == 0
     assert results[2].done is True
     assert results[2].exit_code == 0
+
+
+def test_results_follow_submission_order(simple_job, mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.bulk_log")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.write_output")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 1)
+    mocker.patch.object(
+        PoolTaskBackend,
+        "_create_executor",
+        lambda self: futures.ThreadPoolExecutor(max_workers=3),
+    )
+
+    def execute_command(task_name: str, batch_payload):
+        # Batches submitted first take longer to complete.
+        (task,) = batch_payload["tasks"].values()
+        time.sleep(0.05 * (3 - int(task["arguments"])))
+        return {
+            "task_results": {
+                task_id: {"exitCode": 0} for task_id in batch_payload["tasks"]
+            }
+        }
+
+    mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.execute_command",
+        side_effect=execute_command,
+    )
+
+    backend = PoolTaskBackend(worker_processes=3)
+    tasks = [
+        Task("command", str(item), None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(3)
+    ]
+    for task in tasks:
+        backend.submit_task(simple_job, task)
+
+    results = list(backend.wait_for_results(simple_job))
+    assert [task.uuid for task in results] == [task.uuid for task in tasks]
+    backend.shutdown()
+
+
+def test_worker_processes(mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+
+    backend = PoolTaskBackend(worker_processes=0)
+    assert isinstance(backend.executor, futures.ThreadPoolExecutor)
+    assert backend.executor._max_workers == 1
+    backend.shutdown()
+
+    backend = PoolTaskBackend(worker_processes=4)
+    assert isinstance(backend.executor, futures.ProcessPoolExecutor)
+    assert backend.executor._max_workers == 4
+    backend.shutdown()
+
+
+def test_batches_are_submitted_when_full(simple_job, mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.bulk_log")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.write_output")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 2)
+    release = threading.Event()
+
+    def execute_command(task_name: str, batch_payload):
+        release.wait(5)
+        return {
+            "task_results": {
+                task_id: {"exitCode": 0} for task_id in batch_payload["tasks"]
+            }
+        }
+
+    execute_command = mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.execute_command",
+        side_effect=execute_command,
+    )
+
+    backend = PoolTaskBackend(worker_processes=0, max_in_flight_batches=1)
+    tasks = [
+        Task("command", str(item), None, None, {r"%relativeLocation%": "testfile"})
+        for item in range(5)
+    ]
+
+    # The first batch is submitted before we wait for results.
+    for task in tasks[:2]:
+        backend.submit_task(simple_job, task)
+    assert len(backend.pending_jobs[simple_job.uuid]) == 1
+
+    # Filling the second batch blocks until the first one is processed.
+    submitter = threading.Thread(
+        target=lambda: [backend.submit_task(simple_job, task) for task in tasks[2:]]
+    )
+    submitter.start()
+    submitter.join(0.1)
+    assert submitter.is_alive()
+
+    release.set()
+    submitter.join(5)
+    assert not submitter.is_alive()
+
+    results = list(backend.wait_for_results(simple_job))
+    assert execute_command.call_count == 3
+    assert [task.uuid for task in results] == [task.uuid for task in tasks]
+    backend.shutdown()
+
+
+def test_batch_sizer():
+    sizer = BatchSizer(target_duration=10)
+
+    # Start with the default size until we know how long tasks take.
+    assert sizer.get_size("fast_v0.0", 128) == 128
+
+    sizer.observe("fast_v0.0", duration=1, task_count=128)
+    sizer.observe("slow_v0.0", duration=120, task_count=4)
+
+    # Fast scripts are capped, slow scripts are split in small batches.
+    assert sizer.get_size("fast_v0.0", 128) == 128 * BatchSizer.MAX_SIZE_FACTOR
+    assert sizer.get_size("slow_v0.0", 128) == 1
+
+    # The moving average follows new observations.
+    for _ in range(10):
+        sizer.observe("slow_v0.0", duration=1, task_count=4)
+    assert 1 < sizer.get_size("slow_v0.0", 128) < 128
+
+
+def test_batch_sizer_disabled():
+    sizer = BatchSizer(target_duration=0)
+    sizer.observe("fast_v0.0", duration=1, task_count=128)
+
+    assert sizer.get_size("fast_v0.0", 128) == 128
@@ -0,0 +1,203 @@
+import uuid
+
+import pytest
+from django.db import OperationalError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from a3m.common_metrics import QueryCounter
+from a3m.main import models
+from a3m.server.bookkeeping import BookkeepingWriter
+
+
+def job_model(**kwargs):
+    return models.Job(
+        jobuuid=uuid.uuid4(),
+        createdtime=timezone.now(),
+        createdtimedec=0,
+        currentstep=models.Job.STATUS_EXECUTING_COMMANDS,
+        **kwargs,
+    )
+
+
+def task_model(job, **kwargs):
+    return models.Task(
+        taskuuid=str(uuid.uuid4()), job=job, createdtime=timezone.now(), **kwargs
+    )
+
+
+@pytest.fixture
+def writer():
+    # Flushed by hand, the background thread is never given the chance.
+    writer = BookkeepingWriter(flush_interval=3600)
+    yield writer
+    writer.stop()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_buffers_records_until_flushed(writer):
+    jobs = [job_model(), job_model()]
+    writer.create_job(jobs[0])
+    writer.create_job(jobs[1])
+    writer.create_tasks([task_model(jobs[0]), task_model(jobs[0])])
+    writer.update_job_status(jobs[0].jobuuid, models.Job.STATUS_COMPLETED_SUCCESSFULLY)
+    writer.update_job_status(jobs[1].jobuuid, models.Job.STATUS_FAILED)
+    writer.update_job_status(jobs[1].jobuuid, models.Job.STATUS_COMPLETED_SUCCESSFULLY)
+
+    assert not models.Job.objects.exists()
+
+    with CaptureQueriesContext(connection) as context:
+        writer.flush()
+
+    # Jobs, tasks and a single update for both jobs, in a transaction.
+    statements = [query["sql"].split()[0] for query in context.captured_queries]
+    assert statements[-5:] == ["BEGIN", "INSERT", "INSERT", "UPDATE", "COMMIT"]
+
+    assert models.Task.objects.filter(job=jobs[0]).count() == 2
+    assert set(models.Job.objects.values_list("currentstep", flat=True)) == {
+        models.Job.STATUS_COMPLETED_SUCCESSFULLY
+    }
+
+    with CaptureQueriesContext(connection) as context:
+        writer.flush()
+    assert not context.captured_queries
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_keeps_tasks_recorded_by_client_scripts(writer):
+    job = job_model()
+    task = task_model(job)
+    writer.create_job(job)
+    writer.flush()
+    models.Task.objects.create(
+        taskuuid=task.taskuuid, job=job, createdtime=task.createdtime, exitcode=0
+    )
+
+    writer.create_tasks([task])
+    writer.flush()
+
+    assert models.Task.objects.get(taskuuid=task.taskuuid).exitcode == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_records_queries_of_jobs(writer):
+    job = job_model()
+    queries = QueryCounter()
+    queries.count, queries.duration = 7, 0.5
+    writer.create_job(job)
+    writer.update_job_status(
+        job.jobuuid, models.Job.STATUS_COMPLETED_SUCCESSFULLY, queries=queries
+    )
+
+    writer.flush()
+
+    job.refresh_from_db()
+    assert (job.currentstep, job.querycount, job.querytime) == (
+        models.Job.STATUS_COMPLETED_SUCCESSFULLY,
+        7,
+        0.5,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_stop_flushes_pending_records():
+    writer = BookkeepingWriter(flush_interval=3600)
+    writer.create_job(job_model())
+
+    thread = writer.thread
+
+    writer.stop()
+
+    assert not thread.is_alive()
+    assert models.Job.objects.count() == 1
+
+    # Records queued after the shutdown are written right away.
+    writer.create_job(job_model())
+
+    assert models.Job.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_without_interval_writes_synchronously():
+    writer = BookkeepingWriter(flush_interval=0)
+    job = job_model()
+
+    writer.create_job(job)
+    assert writer.thread is None
+    assert models.Job.objects.filter(jobuuid=job.jobuuid).exists()
+
+    writer.update_job_status(job.jobuuid, models.Job.STATUS_FAILED)
+    job.refresh_from_db()
+    assert job.currentstep == models.Job.STATUS_FAILED
+
+
+def fail_writes(mocker, count):
+    mocker.patch("a3m.databaseFunctions.time.sleep")
+    write = BookkeepingWriter._write
+    errors = [OperationalError("database is locked")] * count
+
+    def _write(*args):
+        if errors:
+            raise errors.pop()
+        return write(*args)
+
+    mocker.patch.object(BookkeepingWriter, "_write", side_effect=_write)
+
+
+def package_state_model():
+    transfer = models.Transfer.objects.create(uuid=uuid.uuid4())
+    sip = models.SIP.objects.create(uuid=uuid.uuid4())
+    return models.PackageState.objects.create(
+        sip=sip, transfer=transfer, name="name", url="url", config=b"", stage="TRANSFER"
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_coalesces_package_states(writer):
+    states = [package_state_model(), package_state_model()]
+    link_ids = [uuid.uuid4(), uuid.uuid4()]
+    writer.update_package_state(states[0].sip_id, "TRANSFER", link_ids[0])
+    writer.update_package_state(states[0].sip_id, "INGEST", link_ids[1])
+    writer.update_package_state(states[1].sip_id, "TRANSFER", link_ids[0])
+    writer.delete_package_state(states[1].sip_id)
+
+    assert models.PackageState.objects.filter(link_id__isnull=True).count() == 2
+
+    writer.flush()
+
+    assert list(models.PackageState.objects.values_list("stage", "link_id")) == [
+        ("INGEST", link_ids[1])
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_retries_failed_writes(mocker, writer):
+    fail_writes(mocker, 1)
+    job = job_model()
+    writer.create_job(job)
+    writer.create_tasks([task_model(job)])
+
+    writer.flush()
+
+    assert models.Task.objects.filter(job=job).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_queues_records_again_when_writes_fail(mocker, writer):
+    fail_writes(mocker, BookkeepingWriter.WRITE_RETRIES + 1)
+    job = job_model()
+    writer.create_job(job)
+    writer.create_tasks([task_model(job)])
+    writer.update_job_status(job.jobuuid, models.Job.STATUS_FAILED)
+
+    with pytest.raises(OperationalError):
+        writer.flush()
+    assert not models.Job.objects.exists()
+
+    writer.update_job_status(job.jobuuid, models.Job.STATUS_COMPLETED_SUCCESSFULLY)
+    writer.flush()
+
+    job.refresh_from_db()
+    assert job.currentstep == models.Job.STATUS_COMPLETED_SUCCESSFULLY
+    assert models.Task.objects.filter(job=job).count() == 1
@@ -0,0 +1,91 @@
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+
+from a3m.server.db import migrate
+from a3m.server.db import migration_hash
+
+
+def test_migration_hash_is_keyed_by_the_migration_graph():
+    loader = MigrationLoader(None)
+    expected = migration_hash(loader)
+
+    assert migration_hash(MigrationLoader(None)) == expected
+
+    key = max(loader.graph.nodes)
+    loader.graph.add_node(("main", "9999_test"), loader.graph.nodes[key])
+    assert migration_hash(loader) != expected
+
+
+def test_migration_hash_covers_migration_data_files(tmp_path, monkeypatch):
+    (tmp_path / "0001_initial.py").write_text("")
+    data = tmp_path / "initial-data.json"
+    data.write_text("[]")
+    module = types.ModuleType("test_migrations.0001_initial")
+    module.__file__ = str(tmp_path / "0001_initial.py")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    migration = types.SimpleNamespace(__module__=module.__name__)
+    loader = types.SimpleNamespace(
+        graph=types.SimpleNamespace(nodes={("test", "0001_initial"): migration})
+    )
+    expected = migration_hash(loader)
+
+    data.write_text('[{"model": "main.agent"}]')
+
+    assert migration_hash(loader) != expected
+
+
+MIGRATE_SCRIPT = """
+import os
+import sys
+from unittest import mock
+
+from a3m.cli.client import ephemeral
+
+ephemeral.configure(sys.argv[1])
+os.environ["DJANGO_SETTINGS_MODULE"] = "a3m.settings.common"
+
+import django
+
+django.setup()
+
+from a3m.main import models
+from a3m.server import db
+
+templates = os.path.join(sys.argv[1], "templates")
+if sys.argv[2] == "restore":
+    with mock.patch.object(
+        db.MigrationExecutor, "migrate", side_effect=AssertionError("migrated")
+    ):
+        db.migrate(templates)
+else:
+    db.migrate(templates)
+
+assert len(os.listdir(templates)) == 1
+# Loaded by the migrations.
+assert models.MetadataAppliesToType.objects.count() == 3
+"""
+
+
+def test_migrate_creates_and_restores_templates(tmp_path):
+    for action in ("create", "restore"):
+        subprocess.run(
+            [sys.executable, "-c", MIGRATE_SCRIPT, str(tmp_path), action],
+            cwd=Path(__file__).parents[2],
+            check=True,
+            timeout=120,
+        )
+
+
+@pytest.mark.django_db
+def test_migrate_does_not_save_templates_of_existing_databases(tmp_path):
+    assert connection.introspection.table_names()
+
+    migrate(tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
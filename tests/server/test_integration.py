@@ -112,7 +112,7 @@ def test_workflow_integration(
     job = next(first_job_chain)
     package_queue.schedule_job(job)
 
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     assert len(package_queue.active_packages) == 1
     assert package.uuid in package_queue.active_packages
 
@@ -130,7 +130,7 @@ def test_workflow_integration(
     )
 
     # Next job in chain should be queued
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     # Process the second job (FilesClientScriptJob)
@@ -146,7 +146,7 @@ def test_workflow_integration(
         assert task.arguments == '"{}"'.format(replacement[r"%fileUUID%"])
 
     # Next job in chain should be queued
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     # Process the third job (DirectoryClientScriptJob)
@@ -157,7 +157,7 @@ def test_workflow_integration(
     assert job.exit_code == 0
 
     # Next job in chain should be queued
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     # Process the fourth job (DirectoryClientScriptJob)
@@ -168,7 +168,7 @@ def test_workflow_integration(
     assert job.exit_code == 0
 
     # Next job in chain should be queued
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     # Process the fifth job (NextLinkDecisionJob)
@@ -179,7 +179,7 @@ def test_workflow_integration(
     assert job.exit_code == 0
 
     # Next job in chain should be queued
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     # Process the sixth job (UpdateContextDecisionJob)
@@ -188,7 +188,7 @@ def test_workflow_integration(
 
     # Out job chain should have been redirected to the final link
     assert job.job_chain.current_link.id == "f8e4c1ee-3e43-4caa-a664-f6b6bd8f156e"
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
     job = future.result()
 
     assert isinstance(job, DirectoryClientScriptJob)
@@ -201,4 +201,4 @@ def test_workflow_integration(
     assert job.exit_code == 0
 
     # Workflow is over; we're done
-    assert package_queue.job_queue.qsize() == 0
+    assert len(package_queue.job_queue) == 0
@@ -1,15 +1,35 @@
 import concurrent.futures
+import json
 import os
+import subprocess
+import sys
 import threading
 import uuid
 from pathlib import Path
 
 import pytest
+from django.utils import timezone
 
+from a3m.api.transferservice.v1beta1.request_response_pb2 import (
+    PACKAGE_STATUS_FAILED as FAILED,
+)
+from a3m.api.transferservice.v1beta1.request_response_pb2 import (
+    PACKAGE_STATUS_PROCESSING as PROCESSING,
+)
 from a3m.api.transferservice.v1beta1.request_response_pb2 import ProcessingConfig
+from a3m.inventory import PackageSize
 from a3m.main import models
+from a3m.server.jobs import FilesClientScriptJob
+from a3m.server.jobs import Job
+from a3m.server.jobs import JobChain
 from a3m.server.packages import Package
+from a3m.server.packages import PackageNotFoundError
+from a3m.server.packages import PackageStatus
+from a3m.server.packages import PackageStatusIndex
+from a3m.server.packages import Stage
+from a3m.server.packages import get_package_status
 from a3m.server.queues import PackageQueue
+from a3m.server.tasks import Task
 from a3m.server.workflow import load as load_workflow
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
@@ -184,3 +204,312 @@ def test_package_files_with_non_ascii_names(tmp_path, package):
     assert result[0]["%fileUUID%"] == str(kwargs["uuid"])
     assert result[0]["%currentLocation%"] == kwargs["currentlocation"]
     assert result[0]["%fileGrpUse%"] == kwargs["filegrpuse"]
+
+
+def create_package_state(**kwargs):
+    transfer = models.Transfer.objects.create(
+        uuid=str(uuid.uuid4()), currentlocation="/tmp/transfer/"
+    )
+    sip = models.SIP.objects.create(uuid=str(uuid.uuid4()), currentpath="/tmp/sip/")
+    return models.PackageState.objects.create(
+        sip=sip,
+        transfer=transfer,
+        name="name",
+        url="file:///tmp/foobar.gz",
+        config=ProcessingConfig(extract_packages=True).SerializeToString(),
+        stage=Stage.TRANSFER.name,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_package_context_is_cached(django_assert_num_queries):
+    state = create_package_state()
+    package = Package(
+        state.name, state.url, ProcessingConfig(), state.transfer, state.sip
+    )
+
+    def update_context(variables):
+        models.UnitVariable.objects.update_variable(
+            package.unit_variable_type,
+            package.subid,
+            models.UnitVariable.objects.PACKAGE_CONTEXT,
+            json.dumps(variables),
+        )
+
+    update_context({r"%AIPFilename%": "aip"})
+
+    assert package.context[r"%AIPFilename%"] == "aip"
+    with django_assert_num_queries(0):
+        assert package.context[r"%AIPFilename%"] == "aip"
+
+    update_context({r"%AIPFilename%": "aip", r"%SIPType%": "standard"})
+    assert r"%SIPType%" not in package.context
+
+    package.invalidate_context()
+    assert dict(package.context) == {
+        r"%AIPFilename%": "aip",
+        r"%SIPType%": "standard",
+    }
+    assert (
+        models.UnitVariable.objects.filter(
+            unituuid=package.subid, variable=models.UnitVariable.objects.PACKAGE_CONTEXT
+        ).count()
+        == 1
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_workflow_state_follows_job_chain(workflow):
+    state = create_package_state()
+    package = Package(
+        state.name, state.url, ProcessingConfig(), state.transfer, state.sip
+    )
+
+    job_chain = JobChain(package, workflow, workflow.get_initiator())
+    next(job_chain)
+    state.refresh_from_db()
+    assert str(state.link_id) == workflow.get_initiator().id
+    assert state.stage == Stage.TRANSFER.name
+
+    package.start_ingest()
+    job_chain.next_link = workflow.get_link("f8e4c1ee-3e43-4caa-a664-f6b6bd8f156e")
+    next(job_chain)
+    state.refresh_from_db()
+    assert str(state.link_id) == "f8e4c1ee-3e43-4caa-a664-f6b6bd8f156e"
+    assert state.stage == Stage.INGEST.name
+
+    # The state is gone once the chain is completed.
+    with pytest.raises(StopIteration):
+        next(job_chain)
+    assert not models.PackageState.objects.filter(pk=state.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_measure_prefers_the_recorded_size(tmp_path, django_assert_num_queries):
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"12345")
+    state = create_package_state()
+    package = Package(
+        state.name, source.as_uri(), ProcessingConfig(), state.transfer, state.sip
+    )
+
+    # Before the download, the source is measured.
+    package.measure()
+    assert package.estimated_size == PackageSize(bytes=5, files=1)
+
+    models.PackageState.objects.filter(pk=state.pk).update(size=100, file_count=3)
+    package.measure()
+    assert package.estimated_size == PackageSize(bytes=100, files=3)
+
+    with django_assert_num_queries(0):
+        package.measure()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_measure_leaves_remote_sources_unknown():
+    state = create_package_state()
+    package = Package(
+        state.name,
+        "https://example.com/transfer.zip",
+        ProcessingConfig(),
+        state.transfer,
+        state.sip,
+    )
+
+    package.measure()
+
+    assert package.estimated_size is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_resume_packages(mocker, package_queue, workflow):
+    files_link_id = "47bf2a2c-8d72-4f36-96d0-53b53a2bbc3f"
+    state = create_package_state(submitter="lab", link_id=files_link_id)
+
+    # The job was interrupted after processing one of the files.
+    interrupted_job = models.Job.objects.create(
+        sipuuid=state.transfer.pk,
+        microservicechainlink=files_link_id,
+        createdtime=timezone.now(),
+        currentstep=Job.STATUS_EXECUTING_COMMANDS,
+    )
+    completed_file_uuid = str(uuid.uuid4())
+    for file_uuid, exit_code in (
+        (completed_file_uuid, 0),
+        (str(uuid.uuid4()), None),
+        ("None", 0),
+    ):
+        models.Task.objects.create(
+            taskuuid=str(uuid.uuid4()),
+            job=interrupted_job,
+            createdtime=timezone.now(),
+            fileuuid=file_uuid,
+            exitcode=exit_code,
+        )
+    Job.cleanup_old_db_entries()
+    Task.cleanup_old_db_entries()
+
+    packages = Package.resume_packages(package_queue, workflow)
+
+    assert len(packages) == 1
+    package = packages[0]
+    assert package.uuid == state.sip.pk
+    assert package.submitter == "lab"
+    assert package.config.extract_packages
+    assert package.stage is Stage.TRANSFER
+    assert package.uuid in package_queue.active_packages
+
+    job = package_queue.job_queue[0]
+    assert isinstance(job, FilesClientScriptJob)
+    assert job.link.id == files_link_id
+    assert job.interrupted_job_uuid == interrupted_job.pk
+    assert job.get_completed_file_uuids() == {completed_file_uuid}
+
+    # Only the files that were not processed are submitted.
+    mocker.patch.object(
+        package,
+        "files",
+        return_value=[
+            {r"%fileUUID%": completed_file_uuid, r"%relativeLocation%": "a"},
+            {r"%fileUUID%": str(uuid.uuid4()), r"%relativeLocation%": "b"},
+            {r"%fileUUID%": "None", r"%relativeLocation%": "c"},
+        ],
+    )
+    job.task_backend = mocker.Mock()
+    job.submit_tasks()
+    submitted = [call.args[1] for call in job.task_backend.submit_task.call_args_list]
+    assert [task.context[r"%relativeLocation%"] for task in submitted] == ["b", "c"]
+
+
+def test_package_status_index(mocker):
+    statuses = PackageStatusIndex(max_finished=1)
+    package_id = uuid.uuid4()
+    assert statuses.get(package_id) is None
+
+    statuses.package_queued(package_id)
+    assert statuses.get(str(package_id)) == PackageStatus(status=PROCESSING)
+
+    job = mocker.Mock(description="Verify checksums", group="Verify transfer")
+    statuses.job_started(package_id, job)
+    assert statuses.get(package_id) == PackageStatus(
+        status=PROCESSING, job="Verify checksums"
+    )
+
+    job = mocker.Mock(description="Move to the failed directory", group="Failed")
+    statuses.job_started(package_id, job)
+    statuses.package_finished(package_id)
+    assert statuses.get(package_id) == PackageStatus(status=FAILED, job="Failed")
+
+    # Only the most recent finished packages are remembered.
+    statuses.add_finished(uuid.uuid4(), PackageStatus(status=FAILED))
+    assert statuses.get(package_id) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_package_status(package, package_queue, django_assert_num_queries):
+    # Packages processed by the server are read from memory.
+    with django_assert_num_queries(0):
+        package_status = get_package_status(package_queue, str(package.uuid))
+    assert package_status.status == PROCESSING
+
+    # Others are looked up once.
+    sip = models.SIP.objects.create(uuid=str(uuid.uuid4()), currentpath="/tmp/sip/")
+    models.Job.objects.create(
+        sipuuid=sip.pk,
+        jobtype="Move to the failed directory",
+        microservicegroup="Failed SIP",
+        microservicechainlink=uuid.uuid4(),
+        createdtime=timezone.now(),
+        createdtimedec=0,
+        currentstep=Job.STATUS_COMPLETED_SUCCESSFULLY,
+    )
+    package_status = get_package_status(package_queue, sip.pk)
+    assert package_status == PackageStatus(status=FAILED, job="Failed SIP")
+    with django_assert_num_queries(0):
+        assert get_package_status(package_queue, sip.pk) == package_status
+
+    # The job history is loaded on request.
+    package_status = get_package_status(package_queue, sip.pk, include_jobs=True)
+    assert [job.name for job in package_status.jobs] == ["Move to the failed directory"]
+
+    with pytest.raises(PackageNotFoundError):
+        get_package_status(package_queue, str(uuid.uuid4()))
+
+
+EPHEMERAL_FILES_SCRIPT = """
+import os
+import sys
+import threading
+import uuid
+
+from a3m.cli.client import ephemeral
+
+ephemeral.configure(sys.argv[1])
+os.environ["A3M_DB_TEMPLATE_DIRECTORY"] = sys.argv[1]
+os.environ["DJANGO_SETTINGS_MODULE"] = "a3m.settings.common"
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.db import transaction
+
+from a3m.main import models
+from a3m.server.db import migrate
+from a3m.server.packages import Package
+
+migrate()
+
+path = os.path.join(sys.argv[1], "transfer", "")
+os.makedirs(os.path.join(path, "objects"))
+transfer = models.Transfer.objects.create(uuid=uuid.uuid4(), currentlocation=path)
+sip = models.SIP.objects.create(uuid=uuid.uuid4(), currentpath=path)
+files = []
+for i in range({count}):
+    open(os.path.join(path, "objects", str(i)), "w").close()
+    files.append(
+        models.File(
+            uuid=uuid.uuid4(),
+            currentlocation=f"%transferDirectory%objects/{{i}}",
+            transfer=transfer,
+        )
+    )
+models.File.objects.bulk_create(files)
+package = Package("name", "url", None, transfer, sip)
+
+errors = []
+
+
+def write():
+    try:
+        with transaction.atomic():
+            models.Identifier.objects.create(type="test", value="1")
+    except Exception as err:
+        errors.append(err)
+    finally:
+        connection.close()
+
+
+# Tasks are run while the files of the package are being listed.
+for count, _ in enumerate(package.files("objects"), 1):
+    if count % 1000 == 0:
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+
+assert count == {count}, count
+assert errors == [], errors
+"""
+
+
+def test_package_files_do_not_block_writes_in_ephemeral_mode(tmp_path):
+    # More files than two chunks of a queryset iterator.
+    script = EPHEMERAL_FILES_SCRIPT.format(count=4100)
+    subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path)],
+        cwd=Path(__file__).parents[2],
+        check=True,
+        timeout=120,
+    )
@@ -6,7 +6,9 @@ import uuid
 
 import pytest
 
+from a3m.api.transferservice.v1beta1.request_response_pb2 import Job as JobMessage
 from a3m.api.transferservice.v1beta1.request_response_pb2 import ProcessingConfig
+from a3m.api.transferservice.v1beta1.request_response_pb2 import WatchResponse
 from a3m.server.jobs import Job
 from a3m.server.packages import Package
 from a3m.server.queues import PackageQueue
@@ -94,7 +96,7 @@ def test_schedule_job(package_queue, package, workflow_link, mocker):
 
     package_queue.schedule_job(test_job)
 
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
 
     package_queue.process_one_job(timeout=0.1)
 
@@ -103,7 +105,7 @@ def test_schedule_job(package_queue, package, workflow_link, mocker):
 
     assert test_job.job_ran.is_set()
     assert package.uuid in package_queue.active_packages
-    assert package_queue.queue.qsize() == 0
+    assert len(package_queue.queue) == 0
 
 
 def test_active_transfer_limit(
@@ -114,12 +116,12 @@ def test_active_transfer_limit(
 
     package_queue.schedule_job(test_job1)
 
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
 
     # Since job 2 is part of a new package, it's delayed
     package_queue.schedule_job(test_job2)
 
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
 
     package_queue.process_one_job(timeout=0.1)
 
@@ -128,7 +130,7 @@ def test_active_transfer_limit(
 
     assert package.uuid in package_queue.active_packages
     assert package_2.uuid not in package_queue.active_packages
-    assert package_queue.queue.qsize() == 1
+    assert len(package_queue.queue) == 1
 
 
 def test_activate_and_deactivate_package(package_queue, package):
@@ -141,7 +143,7 @@ def test_activate_and_deactivate_package(package_queue, package):
     assert package.uuid not in package_queue.active_packages
 
 
-def test_queue_next_job_raises_full(
+def test_queue_next_job_respects_active_limit(
     package_queue, package, package_2, workflow_link, mocker
 ):
     test_job1 = MockJob(mocker.Mock(), workflow_link, package)
@@ -150,7 +152,85 @@ def test_queue_next_job_raises_full(
     package_queue.schedule_job(test_job1)
     package_queue.schedule_job(test_job2)
 
-    assert package_queue.job_queue.qsize() == 1
+    assert len(package_queue.job_queue) == 1
+
+    package_queue.queue_next_job()
+
+    assert len(package_queue.job_queue) == 1
+    assert package_2.uuid not in package_queue.active_packages
+    assert len(package_queue.queue) == 1
+
+
+def test_schedule_job_raises_full(
+    package_queue, package, package_2, workflow_link, mocker
+):
+    package_3 = Package(
+        "package-3",
+        "file:///tmp/foobar-3.gz",
+        ProcessingConfig(),
+        FakeUnit("mno"),
+        FakeUnit("pqr"),
+    )
+
+    package_queue.schedule_job(MockJob(mocker.Mock(), workflow_link, package))
+    package_queue.schedule_job(MockJob(mocker.Mock(), workflow_link, package_2))
 
     with pytest.raises(queue.Full):
-        package_queue.queue_next_job()
+        package_queue.schedule_job(MockJob(mocker.Mock(), workflow_link, package_3))
+
+
+def test_completed_package_releases_queued_package(
+    package_queue, package, package_2, workflow_link, mocker
+):
+    test_job1 = MockJob(mocker.Mock(), workflow_link, package)
+    test_job2 = MockJob(mocker.Mock(), workflow_link, package_2)
+
+    package_queue.schedule_job(test_job1)
+    package_queue.schedule_job(test_job2)
+
+    future = concurrent.futures.Future()
+    future.set_result(None)
+    package_queue._package_completed_callback(package, workflow_link.id, future)
+
+    assert package.uuid not in package_queue.active_packages
+    assert package_2.uuid in package_queue.active_packages
+    assert list(package_queue.job_queue) == [test_job1, test_job2]
+    assert len(package_queue.queue) == 0
+
+
+def test_work_wakes_up_on_new_jobs(package_queue, package, workflow_link, mocker):
+    worker = threading.Thread(target=package_queue.work)
+    worker.start()
+
+    test_job = MockJob(mocker.Mock(), workflow_link, package)
+    package_queue.schedule_job(test_job)
+
+    assert test_job.job_ran.wait(1.0)
+
+    package_queue.stop()
+    worker.join(1.0)
+    assert not worker.is_alive()
+
+
+def test_watchers_receive_package_events(package_queue, package, workflow_link, mocker):
+    test_job = MockJob(mocker.Mock(), workflow_link, package)
+
+    with package_queue.watchers.watch(package.uuid) as events:
+        package_queue.schedule_job(test_job)
+        package_queue.process_one_job(timeout=0.1)
+
+        started = events.get(timeout=1)
+        assert started.type == WatchResponse.TYPE_JOB_STARTED
+        assert started.job.id == str(test_job.uuid)
+        assert started.job.name == "A Test link"
+        assert started.job.status == JobMessage.STATUS_PROCESSING
+        finished = events.get(timeout=1)
+        assert finished.type == WatchResponse.TYPE_JOB_FINISHED
+        assert finished.job.link_id == str(workflow_link.id)
+
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        package_queue._package_completed_callback(package, workflow_link.id, future)
+        assert events.get(timeout=1).type == WatchResponse.TYPE_PACKAGE_FINISHED
+
+    assert not package_queue.watchers.is_watched(package.uuid)
@@ -0,0 +1,264 @@
+import concurrent.futures
+import datetime
+import threading
+
+import grpc
+import pytest
+
+from a3m import tracing
+from a3m.api.workerservice import v1beta1 as worker_service_api
+from a3m.client.worker import Worker
+from a3m.server.jobs import Job
+from a3m.server.tasks import RemoteTaskBackend
+from a3m.server.tasks import Task
+from a3m.server.tasks import TaskBackend
+from a3m.server.tasks.backends.pool_backend import PoolTaskBatch
+from a3m.server.tasks.backends.pool_backend import run_batch
+from a3m.server.tasks.backends.remote_backend import BatchDispatcher
+from a3m.server.tasks.backends.remote_backend import BatchLost
+from a3m.server.worker_service import WorkerService
+
+PAYLOAD = {
+    "tasks": {
+        "7b0ad5a2-3c32-4c9d-8d0b-5a2f2b6c4c11": {
+            "uuid": "7b0ad5a2-3c32-4c9d-8d0b-5a2f2b6c4c11",
+            "createdDate": "2026-10-18 10:00:00+00:00",
+            "arguments": '"a" "b"',
+            "wants_output": True,
+            "execute": "test_v0.0",
+        }
+    }
+}
+
+
+class MockJob(Job):
+    def __init__(self, *args, **kwargs):
+        self.name = kwargs.pop("name", "")
+        super().__init__(*args, **kwargs)
+
+    def run(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch(
+        "a3m.server.tasks.backends.remote_backend.time.monotonic", return_value=0
+    )
+    return clock
+
+
+def test_dispatcher_lease_and_complete(clock):
+    dispatcher = BatchDispatcher(lease_duration=60)
+    assert dispatcher.lease("worker-1") is None
+
+    future = dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+    lease = dispatcher.lease("worker-1")
+    assert lease.job_name == "test_v0.0"
+    assert lease.payload == PAYLOAD
+    assert future.running()
+    assert dispatcher.lease("worker-2") is None
+
+    # Heartbeats keep the lease alive.
+    clock.return_value = 50
+    assert dispatcher.heartbeat(lease.id)
+    clock.return_value = 100
+    assert dispatcher.lease("worker-2") is None
+
+    assert dispatcher.complete(lease.id, {"task_results": {}}, 1.5)
+    assert future.result() == ({"task_results": {}}, 1.5)
+    assert not dispatcher.complete(lease.id, {"task_results": {}}, 1.5)
+
+
+def test_dispatcher_redispatches_expired_leases(clock):
+    dispatcher = BatchDispatcher(lease_duration=60)
+    future = dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+
+    first_lease_id = dispatcher.lease("worker-1").id
+    clock.return_value = 61
+    lease = dispatcher.lease("worker-2")
+    assert lease.id != first_lease_id
+    assert lease.attempts == 2
+
+    # Late heartbeats and results of the first worker are rejected.
+    assert not dispatcher.heartbeat(first_lease_id)
+    assert not dispatcher.complete(first_lease_id, {"task_results": {}}, 1)
+    assert not future.done()
+
+    # We give up after a few attempts.
+    clock.return_value = 122
+    assert dispatcher.lease("worker-3").attempts == BatchDispatcher.MAX_ATTEMPTS
+    clock.return_value = 183
+    assert dispatcher.lease("worker-4") is None
+    with pytest.raises(BatchLost):
+        future.result()
+
+
+def test_dispatcher_shutdown_cancels_batches(clock):
+    dispatcher = BatchDispatcher(lease_duration=60)
+    leased = dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+    pending = dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+    dispatcher.lease("worker-1")
+
+    dispatcher.shutdown(wait=False)
+
+    assert pending.cancelled()
+    with pytest.raises(concurrent.futures.CancelledError):
+        leased.result()
+    with pytest.raises(RuntimeError):
+        dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+    with pytest.raises(ValueError):
+        BatchDispatcher(60).submit(print, "test_v0.0", PAYLOAD)
+
+
+def test_lost_batches_fail_their_tasks(mocker):
+    fail_all_tasks = mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.fail_all_tasks",
+        return_value={"task_results": {}},
+    )
+    batch = PoolTaskBatch(1)
+    batch.payload = PAYLOAD
+    batch.future = concurrent.futures.Future()
+    batch.future.set_exception(BatchLost())
+
+    assert batch.result() == {"task_results": {}}
+    fail_all_tasks.assert_called_once()
+
+
+def test_dispatcher_expires_leases_without_workers(mocker):
+    mocker.patch.object(BatchDispatcher, "MAX_ATTEMPTS", 1)
+    dispatcher = BatchDispatcher(lease_duration=0.05)
+    future = dispatcher.submit(run_batch, "test_v0.0", PAYLOAD)
+    dispatcher.lease("worker-1")
+
+    # No worker asks for work again.
+    assert isinstance(future.exception(timeout=5), BatchLost)
+    dispatcher.shutdown()
+    assert not dispatcher.expiry_thread.is_alive()
+
+
+def test_cancelled_batches_fail_their_tasks(mocker):
+    fail_all_tasks = mocker.patch(
+        "a3m.server.tasks.backends.pool_backend.fail_all_tasks",
+        return_value={"task_results": {}},
+    )
+    batch = PoolTaskBatch(1)
+    batch.payload = PAYLOAD
+    batch.future = concurrent.futures.Future()
+    batch.future.cancel()
+
+    assert batch.result() == {"task_results": {}}
+    fail_all_tasks.assert_called_once()
+
+
+@pytest.fixture
+def remote_backend(mocker):
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.bulk_log")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.Task.write_output")
+    mocker.patch("a3m.server.tasks.backends.pool_backend.init_counter_labels")
+    mocker.patch.object(TaskBackend, "TASK_BATCH_SIZE", 2)
+    backend = RemoteTaskBackend(lease_duration=60, batch_target_duration=0)
+    yield backend
+    backend.shutdown()
+
+
+@pytest.fixture
+def worker_channel(remote_backend):
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=2))
+    worker_service_api.service_pb2_grpc.add_WorkerServiceServicer_to_server(
+        WorkerService(remote_backend.dispatcher), server
+    )
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+        yield channel
+    server.stop(None)
+
+
+def test_remote_workers(mocker, remote_backend, worker_channel):
+    finished_timestamp = datetime.datetime(2026, 10, 18, tzinfo=datetime.timezone.utc)
+    workers_seen = set()
+
+    def execute_command(task_name, batch_payload):
+        assert task_name == "test_v0.0"
+        workers_seen.add(threading.current_thread().name)
+        return {
+            "task_results": {
+                task_id: {
+                    "exitCode": int(task["arguments"]) % 2,
+                    "finishedTimestamp": finished_timestamp,
+                    "stdout": "out",
+                    "stderror": "err",
+                }
+                for task_id, task in batch_payload["tasks"].items()
+            },
+            "spans": [
+                {
+                    "name": task_name,
+                    "cat": tracing.BATCH,
+                    "ph": "X",
+                    "ts": 1,
+                    "dur": 2,
+                    "pid": 3,
+                    "tid": 4,
+                    "args": {"tasks": len(batch_payload["tasks"])},
+                }
+            ],
+        }
+
+    mocker.patch("a3m.client.worker.execute_command", side_effect=execute_command)
+
+    job = MockJob(mocker.Mock(), mocker.Mock(), mocker.Mock(), name="test_v0.0")
+    for item in range(5):
+        task = Task(
+            "test_v0.0",
+            str(item),
+            None,
+            None,
+            {r"%relativeLocation%": "testfile"},
+            wants_output=True,
+        )
+        remote_backend.submit_task(job, task)
+
+    workers = [
+        Worker(worker_channel, worker_id=f"worker-{i}", poll_interval=0.01)
+        for i in range(2)
+    ]
+    threads = [
+        threading.Thread(target=worker.work, name=worker.worker_id)
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    trace = tracing.Trace()
+    try:
+        with tracing.activate(trace):
+            results = list(remote_backend.wait_for_results(job))
+    finally:
+        for worker in workers:
+            worker.stop()
+        for thread in threads:
+            thread.join()
+
+    assert [task.arguments for task in results] == ["0", "1", "2", "3", "4"]
+    assert [task.exit_code for task in results] == [0, 1, 0, 1, 0]
+    assert all(task.done for task in results)
+    assert results[0].stdout == "out"
+    assert results[0].finished_timestamp == finished_timestamp
+    assert workers_seen <= {"worker-0", "worker-1"}
+
+    # Spans of the batches are added to the trace of the package.
+    batches = [event for event in trace.events if event["cat"] == tracing.BATCH]
+    assert batches
+    assert batches[0]["ts"] == 1
+    assert batches[0]["args"]["tasks"].isdigit()
+
+
+def test_heartbeat_of_unknown_lease(remote_backend, worker_channel):
+    stub = worker_service_api.service_pb2_grpc.WorkerServiceStub(worker_channel)
+    request = worker_service_api.request_response_pb2.HeartbeatRequest(
+        worker_id="worker-1", lease_id="unknown"
+    )
+    with pytest.raises(grpc.RpcError) as excinfo:
+        stub.Heartbeat(request)
+    assert excinfo.value.code() == grpc.StatusCode.NOT_FOUND
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from a3m.inventory import PackageSize
+from a3m.server.scheduling import FairSharePolicy
+from a3m.server.scheduling import FIFOPolicy
+from a3m.server.scheduling import ShortestFirstPolicy
+from a3m.server.scheduling import get_scheduling_policy
+from a3m.server.scheduling import parse_weights
+
+
+def make_job(name, submitter="", estimated_size=None):
+    package = SimpleNamespace(submitter=submitter, estimated_size=estimated_size)
+    return SimpleNamespace(name=name, package=package)
+
+
+def drain(policy):
+    names = []
+    while (job := policy.pop()) is not None:
+        names.append(job.name)
+    return names
+
+
+def test_fifo_policy():
+    policy = FIFOPolicy()
+    for name in ("a", "b", "c"):
+        policy.push(make_job(name))
+
+    assert len(policy) == 3
+    assert drain(policy) == ["a", "b", "c"]
+    assert len(policy) == 0
+
+
+def test_shortest_first_policy():
+    policy = ShortestFirstPolicy()
+    policy.push(make_job("unknown"))
+    policy.push(make_job("large", estimated_size=PackageSize(bytes=10**9, files=1)))
+    policy.push(make_job("many", estimated_size=PackageSize(bytes=1, files=10_000)))
+    policy.push(make_job("small", estimated_size=PackageSize(bytes=10, files=1)))
+    policy.push(make_job("small-2", estimated_size=PackageSize(bytes=10, files=1)))
+
+    assert drain(policy) == ["small", "small-2", "large", "many", "unknown"]
+
+
+def test_shortest_first_policy_does_not_starve_large_packages():
+    policy = ShortestFirstPolicy(max_wait=60)
+    with mock.patch("time.monotonic", return_value=0):
+        policy.push(make_job("large", estimated_size=PackageSize(bytes=10**9)))
+    with mock.patch("time.monotonic", return_value=30):
+        policy.push(make_job("small", estimated_size=PackageSize(bytes=10)))
+    with mock.patch("time.monotonic", return_value=60):
+        assert drain(policy) == ["large", "small"]
+
+
+def test_fair_share_policy():
+    policy = FairSharePolicy({"archive": 2})
+    for i in range(6):
+        policy.push(make_job(f"archive-{i}", submitter="archive"))
+    for i in range(3):
+        policy.push(make_job(f"lab-{i}", submitter="lab"))
+
+    # The archive gets twice as many slots until it runs out of packages.
+    assert drain(policy) == [
+        "archive-0",
+        "lab-0",
+        "archive-1",
+        "archive-2",
+        "lab-1",
+        "archive-3",
+        "archive-4",
+        "lab-2",
+        "archive-5",
+    ]
+
+
+def test_fair_share_policy_idle_submitters_do_not_accumulate_credit():
+    policy = FairSharePolicy()
+    for i in range(3):
+        policy.push(make_job(f"busy-{i}", submitter="busy"))
+    assert drain(policy) == ["busy-0", "busy-1", "busy-2"]
+
+    for i in range(3, 5):
+        policy.push(make_job(f"busy-{i}", submitter="busy"))
+    for i in range(2):
+        policy.push(make_job(f"idle-{i}", submitter="idle"))
+
+    # Otherwise, the idle submitter would get the next two slots.
+    assert drain(policy) == ["idle-0", "busy-3", "idle-1", "busy-4"]
+
+
+def test_parse_weights():
+    assert parse_weights("") == {}
+    assert parse_weights("archive:3, lab:0.5") == {"archive": 3.0, "lab": 0.5}
+
+    with pytest.raises(ValueError):
+        parse_weights("archive:many")
+    with pytest.raises(ValueError):
+        parse_weights("archive:0")
+
+
+def test_get_scheduling_policy(settings):
+    settings.SUBMITTER_WEIGHTS = "archive:3"
+
+    assert isinstance(get_scheduling_policy(), FIFOPolicy)
+    assert isinstance(get_scheduling_policy("shortest"), ShortestFirstPolicy)
+    assert get_scheduling_policy("fair").weights == {"archive": 3.0}
+
+    with pytest.raises(ValueError):
+        get_scheduling_policy("random")
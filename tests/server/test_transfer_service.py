@@ -0,0 +1,181 @@
+import concurrent.futures
+import time
+import uuid
+
+import grpc
+import pytest
+import tenacity
+
+from a3m.api.transferservice import v1beta1 as transfer_service_api
+from a3m.server.jobs import Job
+from a3m.server.packages import PackageNotFoundError
+from a3m.server.packages import PackageStatus
+from a3m.server.queues import PackageQueue
+from a3m.server.rpc.client import Client
+from a3m.server.transfer_service import TransferService
+from a3m.server.watchers import job_started_event
+from a3m.server.watchers import package_finished_event
+from a3m.server.workflow import Link
+
+PROCESSING = PackageStatus(
+    status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_PROCESSING
+)
+COMPLETE = PackageStatus(
+    status=transfer_service_api.request_response_pb2.PACKAGE_STATUS_COMPLETE
+)
+
+
+class PollingTransferService(TransferService):
+    """A server that predates the Watch RPC."""
+
+    Watch = transfer_service_api.service_pb2_grpc.TransferServiceServicer.Watch
+
+
+@pytest.fixture
+def package_queue():
+    return PackageQueue(None, scheduling_policy=object())
+
+
+@pytest.fixture
+def serve(package_queue):
+    servers = []
+
+    def serve(service_class=TransferService, **kwargs):
+        server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=2))
+        transfer_service_api.service_pb2_grpc.add_TransferServiceServicer_to_server(
+            service_class(None, package_queue, None, **kwargs), server
+        )
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        servers.append(server)
+        return Client(grpc.insecure_channel(f"127.0.0.1:{port}"))
+
+    yield serve
+
+    for server in servers:
+        server.stop(None)
+
+
+class MockJob(Job):
+    def run(self, *args, **kwargs):
+        pass
+
+
+def test_wait_until_complete_watches_package(mocker, package_queue, serve):
+    package_id = str(uuid.uuid4())
+    link = Link(
+        uuid.uuid4(),
+        {
+            "config": {"@manager": "linkTaskManagerDirectory"},
+            "description": {"en": "A Test link"},
+            "exit_codes": {},
+            "fallback_job_status": "Failed",
+            "group": {"en": "Testing"},
+        },
+        object(),
+    )
+    job = MockJob(mocker.Mock(), link, mocker.Mock())
+    calls = []
+
+    def get_package_status(queue, package_id, include_jobs=False):
+        calls.append(package_id)
+        if len(calls) > 1:
+            return COMPLETE
+        # The stream is subscribed by now, it gets the events published next.
+        assert queue.watchers.is_watched(package_id)
+        queue.watchers.publish(package_id, job_started_event, job)
+        queue.watchers.publish(package_id, package_finished_event)
+        return PROCESSING
+
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status",
+        side_effect=get_package_status,
+    )
+    client = serve()
+
+    events = []
+    resp = client.wait_until_complete(package_id, event_cb=events.append)
+
+    assert resp.status == COMPLETE.status
+    assert [event.type for event in events] == [
+        transfer_service_api.request_response_pb2.WatchResponse.TYPE_JOB_STARTED,
+        transfer_service_api.request_response_pb2.WatchResponse.TYPE_PACKAGE_FINISHED,
+    ]
+    assert events[0].job.id == str(job.uuid)
+    assert events[0].job.name == "A Test link"
+    assert events[1].status == COMPLETE.status
+    assert len(calls) == 3  # Watch, once the package finished and Read.
+    assert not package_queue.watchers.is_watched(package_id)
+
+
+def test_watch_finished_package(mocker, serve):
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status", return_value=COMPLETE
+    )
+    client = serve()
+
+    events = list(client.watch(str(uuid.uuid4())))
+
+    assert len(events) == 1
+    assert events[0].status == COMPLETE.status
+
+
+def test_watch_unknown_package(mocker, serve):
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status",
+        side_effect=PackageNotFoundError,
+    )
+    client = serve()
+
+    with pytest.raises(grpc.RpcError):
+        list(client.watch(str(uuid.uuid4())))
+
+
+def test_wait_until_complete_falls_back_to_polling(mocker, serve):
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status", return_value=COMPLETE
+    )
+    client = serve(PollingTransferService)
+
+    resp = client.wait_until_complete(str(uuid.uuid4()))
+
+    assert resp.status == COMPLETE.status
+
+
+def test_watchers_leave_threads_to_other_calls(mocker, package_queue, serve):
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status", return_value=PROCESSING
+    )
+    client = serve(max_watchers=1)
+    package_id = str(uuid.uuid4())
+
+    watch = client.watch(package_id)
+    try:
+        while not package_queue.watchers.is_watched(package_id):
+            time.sleep(0.01)
+
+        # More watches than threads of the server.
+        for _ in range(3):
+            with pytest.raises(grpc.RpcError) as excinfo:
+                next(client.watch(package_id))
+            assert excinfo.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+        assert client.read(package_id).status == PROCESSING.status
+    finally:
+        watch.cancel()
+
+
+def test_wait_until_complete_polls_when_watchers_are_exhausted(mocker, serve):
+    mocker.patch(
+        "a3m.server.transfer_service.get_package_status",
+        side_effect=[PROCESSING, COMPLETE, COMPLETE],
+    )
+    client = serve(max_watchers=0)
+    spins = []
+
+    resp = client.wait_until_complete(str(uuid.uuid4()), spin_cb=spins.append)
+
+    assert resp.status == COMPLETE.status
+    # Called with the retry state, as before the Watch RPC.
+    assert len(spins) == 1
+    assert isinstance(spins[0], tenacity.RetryCallState)
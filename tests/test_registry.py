@@ -1,3 +1,4 @@
+import marshal
 import uuid
 from importlib.resources import files
 
@@ -6,6 +7,7 @@ import pytest
 from a3m.fpr.registry import JSONBackend
 from a3m.fpr.registry import Registry
 from a3m.fpr.registry import RulePurpose
+from a3m.fpr.registry import load_backend
 from a3m.main.models import File
 
 
@@ -77,3 +79,127 @@ def test_registry_integrity(registry):
             assert (
                 rule.format.enabled and rule.format.id not in backend.replaced_versions
             ), f"Rule in service {rule.id} is using a FormatVersion not in service: {rule.format} ({rule.format.description})."
+
+
+def test_registry_indexes_match_sequential_search(registry):
+    """The lookup indexes must agree with a scan of all the objects."""
+    backend: JSONBackend = registry.backend
+
+    for version in backend.versions.values():
+        expected = next(
+            (
+                candidate
+                for candidate in backend.versions.values()
+                if candidate.pronom_id == version.pronom_id
+                and candidate.enabled
+                and candidate.id not in backend.replaced_versions
+            ),
+            None,
+        )
+        assert registry.get_format_version_by_puid(version.pronom_id) is expected
+
+        for purpose in RulePurpose:
+            expected_rules = [
+                rule
+                for rule in backend.rules.values()
+                if rule.format.id == version.id
+                and rule.purpose == purpose
+                and rule.enabled
+                and rule.id not in backend.replaced_rules
+            ]
+            assert registry.get_rules(version.id, purpose) == expected_rules
+
+    assert registry.get_format_version_by_puid("fmt/unknown") is None
+    with pytest.raises(ValueError):
+        registry.get_rules(uuid.uuid4(), RulePurpose.PRESERVATION)
+
+
+def test_load_backend_from_snapshot(tmp_path, mocker):
+    blob = files("a3m.fpr.migrations").joinpath("initial-data.json").read_bytes()
+
+    backend = load_backend(blob, str(tmp_path))
+    snapshots = list((tmp_path / "fpr").iterdir())
+    assert len(snapshots) == 1
+    assert (tmp_path / "fpr").stat().st_mode & 0o777 == 0o700
+
+    # The snapshot is used instead of parsing the JSON dump again.
+    json_backend = mocker.patch("a3m.fpr.registry.JSONBackend.__init__")
+    snapshot_backend = load_backend(blob, str(tmp_path))
+    json_backend.assert_not_called()
+    assert snapshot_backend.snapshot() == backend.snapshot()
+    version = snapshot_backend.get_format_version_by_puid("fmt/3")
+    assert version.id == uuid.UUID("082f3282-8331-4da4-b452-632b17e90d66")
+    assert not hasattr(version, "__dict__")
+
+    # Unreadable snapshots are rebuilt.
+    snapshots[0].write_bytes(b"garbage")
+    mocker.stopall()
+    load_backend(blob, str(tmp_path))
+    assert snapshots[0].read_bytes() != b"garbage"
+
+
+def test_load_backend_checks_snapshots_before_loading_them(tmp_path, mocker):
+    blob = files("a3m.fpr.migrations").joinpath("initial-data.json").read_bytes()
+    load_backend(blob, str(tmp_path))
+    (snapshot,) = (tmp_path / "fpr").iterdir()
+    content = snapshot.read_bytes()
+    snapshot.write_bytes(content[:-1] + bytes([content[-1] ^ 1]))
+
+    loads = mocker.spy(marshal, "loads")
+    load_backend(blob, str(tmp_path))
+
+    loads.assert_not_called()
+    assert snapshot.read_bytes() == content
+
+
+def test_load_backend_ignores_snapshots_in_shared_directories(tmp_path, mocker):
+    blob = files("a3m.fpr.migrations").joinpath("initial-data.json").read_bytes()
+    load_backend(blob, str(tmp_path))
+    (tmp_path / "fpr").chmod(0o777)
+
+    loads = mocker.spy(marshal, "loads")
+    backend = load_backend(blob, str(tmp_path))
+
+    loads.assert_not_called()
+    assert backend.get_format_version_by_puid("fmt/3") is not None
+
+
+def test_registry_loads_default_backend_lazily(mocker):
+    get_default_backend = mocker.patch(
+        "a3m.fpr.registry.get_default_backend", return_value=mocker.sentinel.backend
+    )
+    registry = Registry()
+    get_default_backend.assert_not_called()
+
+    assert registry.backend is mocker.sentinel.backend
+    assert registry.backend is mocker.sentinel.backend
+    get_default_backend.assert_called_once()
+
+
+def test_registry_get_rules_for_files(db, registry, django_assert_num_queries):
+    thumbnail = create_file_with_version_id(
+        "082f3282-8331-4da4-b452-632b17e90d66"
+    )  # fmt/3
+    unidentified = File.objects.create(uuid=uuid.uuid4())
+    missing = uuid.uuid4()
+
+    with django_assert_num_queries(1):
+        result = registry.get_rules_for_files(
+            [thumbnail.uuid, str(unidentified.uuid), missing], RulePurpose.THUMBNAIL
+        )
+
+    assert result == {
+        str(thumbnail.uuid): registry.get_file_rules(
+            thumbnail.uuid, RulePurpose.THUMBNAIL
+        ),
+        str(unidentified.uuid): [],
+    }
+    assert len(result[str(thumbnail.uuid)]) == 1
+
+    # Fallback rules are used like in get_file_rules.
+    result = registry.get_rules_for_files(
+        [thumbnail.uuid], RulePurpose.ACCESS, fallback=True
+    )
+    assert result[str(thumbnail.uuid)] == registry.get_file_rules(
+        thumbnail, RulePurpose.ACCESS, fallback=True
+    )